@@ -0,0 +1,194 @@
+"""Keystroke replay benchmark for ExpanderEngine.
+
+Drives ExpanderEngine._on_key_event headless with fake keyboard output,
+clipboard and foreground-app backends, and reports per-event latency
+percentiles, expansion latency, allocations and memory per library size.
+
+Run from the repository root:
+    python benchmarks/bench_engine.py                         # synthetic typing, 10..100k snippets
+    python benchmarks/bench_engine.py --sizes 10 1000000
+    python benchmarks/bench_engine.py --record keys.jsonl     # replay recorded events
+    python benchmarks/bench_engine.py --max-p99-us 50         # exit 1 on a hot-path regression
+
+Recorded streams are JSON lines as produced by keyboard.KeyboardEvent.to_json()
+(only "event_type" and "name" are used).
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List, Optional
+
+# Keep the app's config module away from the real profile directory
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="quickkeys-bench-")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from textexpander.core.app_detector import ForegroundCache, StaticForegroundBackend  # noqa: E402
+from textexpander.core.clipboard import ClipboardGuard, MemoryClipboardBackend  # noqa: E402
+from textexpander.core.expander import ExpanderEngine  # noqa: E402
+from textexpander.core.injector import InjectionPlan, RecordingBackend  # noqa: E402
+from textexpander.core.platforms.fake import KEY_NAMES, FakeKeyEvent  # noqa: E402
+from textexpander.core.settings import Settings  # noqa: E402
+from textexpander.core.snippets import SnippetRepository  # noqa: E402
+
+WORDS = ["the", "quick", "brown", "fox", "meeting", "tomorrow", "please", "review",
+         "attached", "invoice", "thanks", "regards", "schedule", "project", "update"]
+
+class TimedRecordingBackend(RecordingBackend):
+    """Records plans plus the time each one was emitted."""
+
+    def __init__(self):
+        super().__init__()
+        self.emitted_at: List[float] = []
+
+    def emit(self, plan: InjectionPlan):
+        super().emit(plan)
+        self.emitted_at.append(time.perf_counter())
+
+def synthetic_library(size: int, seed: int = 7):
+    rnd = random.Random(seed)
+    data = {}
+    while len(data) < size:
+        t = "".join(rnd.choices(string.ascii_lowercase + string.digits, k=rnd.randint(2, 10)))
+        data[t] = " ".join(rnd.choices(WORDS, k=rnd.randint(2, 20))) + ("{cursor}!" if rnd.random() < 0.2 else "")
+    return data
+
+def key_events(text: str):
+    for ch in text:
+        name = KEY_NAMES.get(ch, ch)
+        yield FakeKeyEvent(name, "down")
+        yield FakeKeyEvent(name, "up")
+
+def synthetic_stream(triggers: List[str], words: int, seed: int = 11) -> List[FakeKeyEvent]:
+    """Prose with a trigger every ~10 words and an occasional typo fixed with backspace."""
+    rnd = random.Random(seed)
+    parts = []
+    for i in range(words):
+        if triggers and rnd.random() < 0.1:
+            parts.append("/" + rnd.choice(triggers) + " ")
+        else:
+            w = rnd.choice(WORDS)
+            if rnd.random() < 0.05:
+                w = w + "x\b"
+            parts.append(w + rnd.choice(" " * 8 + ".\n"))
+    return list(key_events("".join(parts)))
+
+def recorded_stream(path: Path) -> List[FakeKeyEvent]:
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rec = json.loads(line)
+                events.append(FakeKeyEvent(rec["name"], rec["event_type"]))
+    return events
+
+def make_engine(library):
+    output = TimedRecordingBackend()
+    clipboard = ClipboardGuard(MemoryClipboardBackend("user clipboard"), restore_delay=0)
+    foreground = ForegroundCache(StaticForegroundBackend("notepad.exe", "Untitled - Notepad", hwnd=1, pid=1))
+    engine = ExpanderEngine(Settings(), SnippetRepository(library), output=output,
+                            clipboard=clipboard, foreground=foreground)
+    engine.start_worker()
+    return engine, output
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100.0 * len(sorted_values)))]
+
+def run_size(size: int, events: Optional[List[FakeKeyEvent]], words: int):
+    library = synthetic_library(size)
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    engine, output = make_engine(library)
+    build_s = time.perf_counter() - t0
+    engine_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del library
+
+    if events is None:
+        events = synthetic_stream(list(engine.repo.triggers())[:1000], words)
+
+    # Pass 1: timing. After a swallowed (expanding) event, wait for the worker so the
+    # expansion latency is hook -> emitted, and the next key is not held as a replay.
+    on_key = engine._on_key_event
+    lat: List[float] = []
+    exp_lat: List[float] = []
+    perf = time.perf_counter
+    for ev in events:
+        t = perf()
+        passed = on_key(ev)
+        lat.append(perf() - t)
+        if passed is False:
+            engine.wait_idle()
+            if output.emitted_at:
+                exp_lat.append(output.emitted_at[-1] - t)
+    engine.wait_idle()
+
+    # Pass 2: allocations on the hook path
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for ev in events:
+        if on_key(ev) is False:
+            engine.wait_idle()
+    engine.wait_idle()
+    after = tracemalloc.take_snapshot()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    alloc_count = sum(max(0, s.count_diff) for s in stats)
+
+    lat.sort()
+    exp_lat.sort()
+    us = 1e6
+    return {
+        "snippets": size,
+        "events": len(events),
+        "expansions": len(exp_lat),
+        "build_ms": round(build_s * 1000, 1),
+        "engine_mb": round(engine_bytes / 2**20, 2),
+        "event_p50_us": round(percentile(lat, 50) * us, 2),
+        "event_p99_us": round(percentile(lat, 99) * us, 2),
+        "event_max_us": round(lat[-1] * us, 2) if lat else 0.0,
+        "expand_p50_us": round(percentile(exp_lat, 50) * us, 1),
+        "expand_p99_us": round(percentile(exp_lat, 99) * us, 1),
+        "live_blocks_after_replay": alloc_count,
+        "replay_peak_kb": round(peak / 1024, 1),
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100_000])
+    ap.add_argument("--words", type=int, default=20_000, help="length of the synthetic stream")
+    ap.add_argument("--record", type=Path, help="replay a recorded JSON-lines event stream")
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    ap.add_argument("--max-p99-us", type=float, help="fail if any per-event p99 exceeds this")
+    args = ap.parse_args()
+
+    events = recorded_stream(args.record) if args.record else None
+    results = [run_size(n, events, args.words) for n in args.sizes]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        cols = list(results[0])
+        print("  ".join(f"{c:>14}" for c in cols))
+        for r in results:
+            print("  ".join(f"{r[c]:>14}" for c in cols))
+
+    if args.max_p99_us is not None:
+        worst = max(r["event_p99_us"] for r in results)
+        if worst > args.max_p99_us:
+            print(f"FAIL: per-event p99 {worst}us > {args.max_p99_us}us", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
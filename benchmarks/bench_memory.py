@@ -0,0 +1,89 @@
+"""Memory benchmark: resident size of a loaded snippet library.
+
+Each run is a fresh interpreter over a synthetic library on disk. It loads
+the repository like the app, builds the engine's snapshot from its
+detached copy and the manager's table model rows, then reports the
+process's resident memory. "dict" forces the plain-dict representation,
+"packed" the memory-mapped PackedSnippets (the default above
+PACK_MIN_SNIPPETS snippets); packed runs reuse the pack a warm-up run wrote.
+
+Run from the repository root:
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --sizes 100000 500000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def rss_mb() -> float:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        with open("/proc/self/status") as f:  # Linux without psutil
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1e3
+    return float("nan")
+
+def child(mode: str):
+    sys.path.insert(0, str(ROOT))
+    from textexpander.core import packed  # noqa: E402
+    from textexpander.core.settings import Settings  # noqa: E402
+    from textexpander.core.snapshot import EngineSnapshot  # noqa: E402
+    from textexpander.core.snippets import open_repository  # noqa: E402
+
+    if mode == "dict":
+        packed.PACK_MIN_SNIPPETS = 1 << 62
+    base = rss_mb()
+    repo = open_repository("json")
+    loaded = rss_mb()
+    snap = EngineSnapshot.build(Settings(), repo.detached())
+    engine = rss_mb()
+    rows = list(repo.mapping())  # what SnippetTableModel keeps
+    print(json.dumps({"repository": loaded - base, "engine": engine - loaded,
+                      "model": rss_mb() - engine, "total": rss_mb() - base,
+                      "packed": isinstance(repo.mapping(), packed.PackedSnippets)}))
+    del snap, rows
+
+def prepare(appdata: Path, size: int):
+    sys.path.insert(0, str(ROOT / "benchmarks"))
+    from bench_engine import synthetic_library
+    d = appdata / "TextExpanderPy"
+    d.mkdir(parents=True, exist_ok=True)
+    (d / "snippets.json").write_text(json.dumps(synthetic_library(size)), encoding="utf-8")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    cols = ["size", "mode", "repository", "engine", "model", "total"]
+    print("  ".join(f"{c:>12}" for c in cols) + "   (MB resident)")
+    for size in args.sizes:
+        appdata = Path(tempfile.mkdtemp(prefix="quickkeys-memory-"))
+        prepare(appdata, size)
+        env = dict(os.environ, APPDATA=str(appdata))
+        for mode in ("dict", "packed"):
+            if mode == "packed":
+                # writing the pack is a one-off after each change; measure a normal start
+                subprocess.run([sys.executable, __file__, "--child", mode], env=env, check=True, capture_output=True)
+            out = subprocess.run([sys.executable, __file__, "--child", mode], env=env, check=True,
+                                 capture_output=True, text=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            label = mode if mode == "dict" or r["packed"] else "dict*"
+            row = [size, label] + [f"{r[c]:.1f}" for c in cols[2:]]
+            print("  ".join(f"{v:>12}" for v in row))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Snippet search benchmark: trigram index vs. the old linear scan.
+
+Run from the repository root:  python benchmarks/bench_search.py [--size 100000]
+"""
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from textexpander.core.search import SnippetSearchIndex  # noqa: E402
+
+WORDS = ["regards", "meeting", "invoice", "address", "project", "schedule", "contract",
+         "thanks", "please", "review", "attached", "customer", "support", "update"]
+
+def synthetic_library(size: int, seed: int = 1):
+    rnd = random.Random(seed)
+    data = {}
+    while len(data) < size:
+        trigger = "".join(rnd.choices(string.ascii_lowercase + string.digits, k=rnd.randint(3, 8)))
+        body = " ".join(rnd.choices(WORDS, k=rnd.randint(4, 16))) + f" #{len(data)}"
+        data[trigger] = body
+    return data
+
+def linear_search(data, text):
+    text = text.strip().lower()
+    if len(text) < 3:  # the index matches queries shorter than a trigram against triggers only
+        return {k: v for k, v in data.items() if text in k.lower()}
+    return {k: v for k, v in data.items() if text in k.lower() or text in v.lower()}
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0, result
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    data = synthetic_library(args.size)
+    t0 = time.perf_counter()
+    index = SnippetSearchIndex(data)
+    print(f"library: {len(data)} snippets, index build {time.perf_counter() - t0:.2f}s")
+
+    sample = list(data)[len(data) // 2]
+    queries = [sample, sample[:3], "invoice", "#4242", "zzzq", "ab"]
+    print(f"{'query':>12} {'hits':>7} {'linear ms':>10} {'index ms':>9} {'first page ms':>14}")
+    for q in queries:
+        lin_ms, lin = timed(lambda: linear_search(data, q), args.repeat)
+        idx_ms, hits = timed(lambda: index.search(q), args.repeat)
+        page_ms, _ = timed(lambda: index.search(q, limit=200), args.repeat)
+        assert set(hits) == set(lin), q
+        print(f"{q!r:>12} {len(hits):>7} {lin_ms:>10.2f} {idx_ms:>9.3f} {page_ms:>14.3f}")
+
+    t0 = time.perf_counter()
+    index.add("zz_new", "freshly edited snippet")
+    index.remove(sample)
+    print(f"incremental edit: {(time.perf_counter() - t0) * 1000:.3f} ms")
+
+if __name__ == "__main__":
+    main()
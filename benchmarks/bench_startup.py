@@ -0,0 +1,93 @@
+"""Startup benchmark: time from interpreter start to the first expansion.
+
+Each run is a fresh interpreter over a synthetic library on disk. It loads
+settings and snippets exactly like the app, builds the engine with fake
+output/clipboard/foreground backends, then types "/<trigger> " and reports
+the engine's startup milestones (StartupTimer marks, ms since start).
+
+Run from the repository root:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --sizes 1000 100000 --backends json sqlite
+"""
+import time
+_STARTED = time.perf_counter()
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+PACK_MIN_SNIPPETS = 5000  # as in textexpander.core.packed: bigger libraries are packed on first load
+
+def child(size: int, backend: str):
+    sys.path.insert(0, str(ROOT))
+    # (not bench_engine: importing it points APPDATA at a scratch dir)
+    from textexpander.core.app_detector import ForegroundCache, StaticForegroundBackend  # noqa: E402
+    from textexpander.core.clipboard import ClipboardGuard, MemoryClipboardBackend  # noqa: E402
+    from textexpander.core.expander import ExpanderEngine  # noqa: E402
+    from textexpander.core.injector import RecordingBackend  # noqa: E402
+    from textexpander.core.metrics import StartupTimer  # noqa: E402
+    from textexpander.core.platforms.fake import FakeKeyEvent  # noqa: E402
+    from textexpander.core.settings import Settings  # noqa: E402
+    from textexpander.core.snippets import open_repository  # noqa: E402
+
+    startup = StartupTimer(_STARTED)
+    startup.mark("imports")
+    settings = Settings.load()
+    repo = open_repository(backend)
+    startup.mark("repository")
+    engine = ExpanderEngine(settings, repo, output=RecordingBackend(),
+                            clipboard=ClipboardGuard(MemoryClipboardBackend(), restore_delay=0),
+                            foreground=ForegroundCache(StaticForegroundBackend("notepad.exe", "Notepad", 1, 1)),
+                            startup=startup)
+    engine.start_worker()
+    startup.mark("hook_live")  # where run() would install the keyboard hook
+    for name in ("/", "s", "i", "g", "space"):
+        for kind in ("down", "up"):
+            if engine._on_key_event(FakeKeyEvent(name, kind)) is False:
+                engine.wait_idle()
+    assert "first_expansion" in startup.marks, "no expansion happened"
+    print(json.dumps(startup.marks))
+
+def prepare(appdata: Path, size: int):
+    sys.path.insert(0, str(ROOT / "benchmarks"))
+    from bench_engine import synthetic_library
+    data = synthetic_library(size)
+    data["sig"] = "Best regards{cursor}"
+    d = appdata / "TextExpanderPy"
+    d.mkdir(parents=True, exist_ok=True)
+    (d / "snippets.json").write_text(json.dumps(data), encoding="utf-8")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10, 10_000, 100_000])
+    ap.add_argument("--backends", nargs="+", default=["json", "sqlite"], choices=["json", "sqlite"])
+    ap.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        child(int(args.child[0]), args.child[1])
+        return
+
+    cols = ["size", "backend", "imports", "repository", "engine_ready", "hook_live", "first_expansion"]
+    print("  ".join(f"{c:>15}" for c in cols))
+    for size in args.sizes:
+        appdata = Path(tempfile.mkdtemp(prefix="quickkeys-startup-"))
+        prepare(appdata, size)
+        for backend in args.backends:
+            # the one-time JSON migration / library pack is not startup cost; do it up front
+            if backend == "sqlite" or size >= PACK_MIN_SNIPPETS:
+                subprocess.run([sys.executable, __file__, "--child", str(size), backend],
+                               env=dict(os.environ, APPDATA=str(appdata)), check=True, capture_output=True)
+            out = subprocess.run([sys.executable, __file__, "--child", str(size), backend],
+                                 env=dict(os.environ, APPDATA=str(appdata)), check=True,
+                                 capture_output=True, text=True).stdout
+            marks = json.loads(out.strip().splitlines()[-1])
+            row = [size, backend] + [marks.get(c, "") for c in cols[2:]]
+            print("  ".join(f"{v:>15}" for v in row))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# config.py creates the app data directories on import: point it at a scratch dir before anything imports it
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="quickkeys-tests-")
+os.environ["QUICKKEYS_PLATFORM"] = "fake"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest  # noqa: E402
+
+@pytest.fixture
+def make_engine():
+    """An ExpanderEngine on the fake platform, with the fake keyboard hooked up as run() would."""
+    from textexpander.core.expander import ExpanderEngine
+    from textexpander.core.platforms.fake import FakePlatform
+    from textexpander.core.settings import Settings
+    from textexpander.core.snippets import SnippetRepository
+    from textexpander.core.usage import UsageStore
+
+    engines = []
+
+    def make(snippets, settings=None, app=("notepad.exe", "Untitled - Notepad"), start_worker=True):
+        platform = FakePlatform(*app)
+        repo = snippets if isinstance(snippets, SnippetRepository) else SnippetRepository(snippets)
+        engine = ExpanderEngine(settings or Settings(), repo,
+                                platform=platform, usage=UsageStore())
+        platform.keys.hook(engine._on_key_event)
+        engine.start_foreground_tracking()
+        if start_worker:
+            engine.start_worker()
+        engines.append(engine)
+        return engine, platform
+
+    yield make
+    for engine in engines:
+        engine.stop()
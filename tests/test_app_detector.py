@@ -0,0 +1,66 @@
+from textexpander.core.app_detector import ForegroundCache, StaticForegroundBackend
+
+def test_cache_serves_repeat_queries_without_os_calls():
+    backend = StaticForegroundBackend("notepad.exe", "Untitled", hwnd=1, pid=10)
+    cache = ForegroundCache(backend, ttl=60)
+    assert cache.get() == ("notepad.exe", "Untitled")
+    calls = backend.calls
+    for _ in range(100):
+        assert cache.get() == ("notepad.exe", "Untitled")
+    assert backend.calls == calls
+    stats = cache.stats()
+    assert stats["hits"] == 100 and stats["misses"] == 1
+    assert stats["hit_rate"] > 0.99
+
+def test_refresh_rereads_title_but_not_process_name():
+    backend = StaticForegroundBackend("chrome.exe", "News", hwnd=1, pid=10)
+    cache = ForegroundCache(backend, ttl=0)
+    cache.get()
+    backend.title = "Login"
+    backend.name = "renamed.exe"  # same window and PID: the memoized name stands
+    assert cache.get() == ("chrome.exe", "Login")
+
+def test_invalidate_forces_a_refresh():
+    backend = StaticForegroundBackend("a.exe", "A", hwnd=1, pid=1)
+    cache = ForegroundCache(backend, ttl=60)
+    cache.get()
+    backend.hwnd, backend.pid, backend.name, backend.title = 2, 2, "b.exe", "B"
+    assert cache.get() == ("a.exe", "A")
+    cache.invalidate()
+    assert cache.get() == ("b.exe", "B")
+
+def test_pushed_context_replaces_polling_until_detached():
+    backend = StaticForegroundBackend("a.exe", "A", hwnd=1, pid=1)
+    cache = ForegroundCache(backend, ttl=0)
+    cache.push("outlook.exe", "Inbox")
+    calls = backend.calls
+    assert cache.get() == ("outlook.exe", "Inbox")
+    assert backend.calls == calls
+    assert cache.stats()["mode"] == "events"
+    cache.detach()
+    assert cache.get() == ("a.exe", "A")
+    assert cache.stats()["mode"] == "polling"
+
+def test_reused_pid_is_not_taken_for_the_old_process():
+    backend = StaticForegroundBackend("keepass.exe", "Vault", hwnd=1, pid=10)
+    cache = ForegroundCache(backend, ttl=0)
+    assert cache.get()[0] == "keepass.exe"
+    # keepass exits and a new process gets PID 10
+    backend.hwnd, backend.name, backend.started = 2, "notepad.exe", 123.0
+    assert cache.get()[0] == "notepad.exe"
+
+def test_same_process_in_another_window_uses_the_memo():
+    backend = StaticForegroundBackend("word.exe", "Doc1", hwnd=1, pid=10)
+    cache = ForegroundCache(backend, ttl=0)
+    cache.get()
+    backend.hwnd, backend.name = 2, "not-looked-up.exe"  # same PID and creation time
+    assert cache.get()[0] == "word.exe"
+    assert cache.stats()["cached_pids"] == 1
+
+def test_detach_does_not_keep_the_pushed_process_name():
+    backend = StaticForegroundBackend("notepad.exe", "A", hwnd=1, pid=10)
+    cache = ForegroundCache(backend, ttl=0)
+    cache.get()
+    cache.push("outlook.exe", "Inbox")
+    cache.detach()
+    assert cache.get() == ("notepad.exe", "A")
@@ -0,0 +1,85 @@
+import json
+from datetime import datetime, timedelta
+
+from textexpander.core.backups import BackupStore, diff_snippets, get_backup_store
+from textexpander.core.journal import SnippetJournal
+from textexpander.core.persistence import get_persistence
+from textexpander.core.snippets import SnippetRepository
+from textexpander.core.storage import write_json_atomic
+
+def snippets(**kw) -> bytes:
+    return json.dumps(kw).encode("utf-8")
+
+def objects(root):
+    return sorted(p.name for p in (root / "objects").glob("*.gz"))
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = BackupStore(tmp_path)
+    assert store.add_bytes("snippets", snippets(a="1"), when=1000.0) is not None
+    assert store.add_bytes("snippets", snippets(a="1"), when=1001.0) is None  # same as the newest
+    store.add_bytes("snippets", snippets(a="2"), when=1002.0)
+    store.add_bytes("snippets", snippets(a="1"), when=1003.0)  # back to an older version
+    assert [store.read(e.id)["a"] for e in store.list("snippets")] == ["1", "2", "1"]
+    assert len(objects(tmp_path)) == 2
+
+def test_retention_keeps_recent_saves_then_one_per_hour_day_and_week(tmp_path):
+    store = BackupStore(tmp_path)
+    start = datetime(2024, 1, 1, 12)  # a Monday, so ISO weeks start on days 0, 7, 14, ...
+    for day in range(40):
+        store.add_bytes("snippets", snippets(day=str(day)), when=(start + timedelta(days=day)).timestamp())
+    kept = sorted(int(store.read(e.id)["day"]) for e in store.list("snippets"))
+    # the 24 newest fill the hourly buckets (and cover the last 10 and 14 days);
+    # older weeks keep their newest save: Sunday of week 1 (day 6) and of week 2 (day 13)
+    assert kept == [6, 13] + list(range(16, 40))
+    # objects no entry refers to any more are deleted with their entries
+    assert len(objects(tmp_path)) == len(kept)
+
+def test_retention_is_per_file(tmp_path):
+    store = BackupStore(tmp_path)
+    for i in range(30):
+        store.add_bytes("snippets", snippets(i=str(i)), when=1000.0 + i)
+    store.add_bytes("settings", snippets(s="x"), when=900.0)
+    assert len(store.list("snippets")) == 10
+    assert len(store.list("settings")) == 1
+
+def test_legacy_copies_are_folded_in_and_deleted(tmp_path):
+    legacy = tmp_path / "snippets_20240301_093000.json"
+    legacy.write_bytes(snippets(a="old"))
+    (tmp_path / "notes.json").write_text("{}", encoding="utf-8")  # not a backup copy
+    store = BackupStore(tmp_path)
+    assert store.migrate_legacy() == 1
+    assert not legacy.exists() and (tmp_path / "notes.json").exists()
+    (entry,) = store.list("snippets")
+    assert entry.saved_at == datetime(2024, 3, 1, 9, 30)
+    assert store.read(entry.id) == {"a": "old"}
+
+def test_diff_snippets():
+    diff = diff_snippets({"a": "1", "b": "2", "c": "3"}, {"a": "1", "b": "two", "d": "4"})
+    assert (diff.added, diff.removed, diff.changed) == (["d"], ["c"], ["b"])
+    assert diff.summary() == "1 added, 1 removed, 1 changed"
+
+def test_unreadable_index_is_rebuilt_from_the_objects(tmp_path):
+    store = BackupStore(tmp_path)
+    store.add_bytes("snippets", snippets(a="1"), when=1000.0)
+    store.add_bytes("snippets", snippets(a="2"), when=2000.0)
+    (tmp_path / "index.json").write_text('[{"id": "snipp', encoding="utf-8")
+
+    store = BackupStore(tmp_path)
+    entries = store.list("snippets")
+    assert len(entries) == 2
+    assert sorted(store.read(e.id)["a"] for e in entries) == ["1", "2"]
+    assert all(e.size == len(snippets(a="1")) for e in entries)
+    assert len(BackupStore(tmp_path).list()) == 2  # the rebuilt index was written back
+
+def test_a_plain_save_leaves_a_restorable_version(tmp_path):
+    snapshot = tmp_path / "snippets.json"
+    write_json_atomic(snapshot, {"a": "1"})
+    repo = SnippetRepository(SnippetJournal(snapshot).load(), SnippetJournal(snapshot))
+    store = get_backup_store()
+    before = len(store.list("snippets"))
+    repo.set("b", "2")
+    repo.save()
+    get_persistence().flush()
+    entries = store.list("snippets")
+    assert len(entries) == before + 1
+    assert store.read(entries[0].id) == {"a": "1"}  # the version the save replaced
@@ -0,0 +1,46 @@
+from textexpander.core.clipboard import ClipboardGuard, MemoryClipboardBackend
+
+def paste_cycle(guard, text):
+    guard.save()
+    guard.copy(text)
+
+def test_restore_puts_the_users_text_back():
+    backend = MemoryClipboardBackend("mine")
+    guard = ClipboardGuard(backend, restore_delay=60)
+    paste_cycle(guard, "snippet")
+    guard.schedule_restore()
+    assert guard.user_text() == "mine"
+    guard.flush()
+    assert backend.text == "mine"
+
+def test_back_to_back_expansions_skip_the_second_save():
+    backend = MemoryClipboardBackend("mine")
+    guard = ClipboardGuard(backend, restore_delay=60)
+    paste_cycle(guard, "one")
+    guard.schedule_restore()
+    paste_cycle(guard, "two")
+    guard.schedule_restore()
+    guard.flush()
+    assert backend.text == "mine"
+    assert guard.stats()["skipped_saves"] == 1
+
+def test_copy_made_while_a_restore_is_pending_is_kept():
+    backend = MemoryClipboardBackend("old")
+    guard = ClipboardGuard(backend, restore_delay=60)
+    paste_cycle(guard, "one")
+    guard.schedule_restore()
+    backend.copy("new")  # the user copies before the restore ran
+    paste_cycle(guard, "two")
+    guard.schedule_restore()
+    guard.flush()
+    assert backend.text == "new"
+
+def test_copy_made_after_the_paste_wins_over_the_restore():
+    backend = MemoryClipboardBackend("old")
+    guard = ClipboardGuard(backend, restore_delay=60)
+    paste_cycle(guard, "one")
+    guard.schedule_restore()
+    backend.copy("new")
+    guard.flush()
+    assert backend.text == "new"
+    assert guard.stats()["abandoned_restores"] == 1
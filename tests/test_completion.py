@@ -0,0 +1,59 @@
+import random
+
+from textexpander.core.completion import CompletionIndex, Frecency
+from textexpander.core.matcher import TriggerTrie
+
+NOW = 1_700_000_000.0
+
+def test_each_node_keeps_its_top_k():
+    triggers = [f"s{i:02d}" for i in range(20)] + ["t1"]
+    index = CompletionIndex(TriggerTrie(triggers), k=3)
+    assert index.suggest("/s") == ["s00", "s01", "s02"]
+    assert index.suggest("/s1") == ["s10", "s11", "s12"]
+    assert index.suggest("/s1", limit=1) == ["s10"]
+    assert index.suggest("/") == ["t1", "s00", "s01"]
+    assert index.suggest("/x") == [] and index.suggest("s") == []  # off the trie, or without the prefix
+    assert all(len(lst) <= 3 for lst in index.top)
+
+def test_ties_break_on_length_then_name():
+    index = CompletionIndex(TriggerTrie(["sigb", "siga", "sig", "sign"]))
+    assert index.suggest("/si") == ["sig", "siga", "sigb", "sign"]
+
+def test_frecency_outranks_length():
+    frecency = Frecency()
+    frecency.bump("signature", NOW)
+    index = CompletionIndex(TriggerTrie(["sig", "signature"]), frecency)
+    assert index.suggest("/s") == ["signature", "sig"]
+
+def test_recent_use_beats_an_old_one():
+    frecency = Frecency()
+    frecency.bump("a1", NOW - 60 * 86400)
+    frecency.bump("a1", NOW - 60 * 86400)
+    frecency.bump("a2", NOW)
+    assert frecency.get("a2") > frecency.get("a1") > frecency.get("never")
+
+def test_record_use_reranks_the_path_and_matches_a_rebuild():
+    rnd = random.Random(7)
+    triggers = sorted({"".join(rnd.choices("abc", k=rnd.randint(1, 4))) for _ in range(60)})
+    index = CompletionIndex(TriggerTrie(triggers), k=4)
+    for i in range(200):
+        index.record_use(rnd.choice(triggers), when=NOW + i)
+        if i % 25 == 0:
+            fresh = CompletionIndex(index.trie, index.frecency, k=4)
+            assert index.top == fresh.top
+    fresh = CompletionIndex(index.trie, index.frecency, k=4)
+    assert index.top == fresh.top
+
+def test_rerank_swaps_lists_instead_of_mutating_them():
+    index = CompletionIndex(TriggerTrie(["aa", "ab", "ac"]), k=2)
+    before = index.suggest("/a")
+    held = index.top[index.trie.step(index.trie.step(0, "/"), "a")]
+    index.record_use("ac", when=NOW)
+    assert index.suggest("/a") == ["ac", "aa"]
+    assert held == before == ["aa", "ab"]  # a reader holding the old list still sees it whole
+
+def test_bare_triggers_are_completed_without_the_prefix():
+    index = CompletionIndex(TriggerTrie(["sig", "sign"], require_prefix=False))
+    assert index.suggest("si") == index.suggest("/si") == ["sig", "sign"]
+    index.record_use("sign", when=NOW)
+    assert index.suggest("si") == index.suggest("/si") == ["sign", "sig"]
@@ -0,0 +1,136 @@
+from textexpander.core.injector import InjectionPlan, RecordingBackend
+from textexpander.core.matcher import TriggerMatcher, TriggerTrie, cached_trie
+from textexpander.core.platforms.fake import KEY_NAMES
+from textexpander.core.templates import TemplateCache
+
+def typed(trie, text):
+    m = TriggerMatcher(trie)
+    for ch in text:
+        if ch == "\b":
+            m.backspace()
+        else:
+            m.feed(ch)
+    return m
+
+# ---- Matcher
+def test_matcher_finds_prefixed_triggers_only():
+    trie = TriggerTrie(["sig", "si", "addr"])
+    assert typed(trie, "/sig").match == "sig"
+    assert typed(trie, "/si").match == "si"
+    assert typed(trie, "sig").match is None
+    assert typed(trie, "/sigx").match is None
+
+def test_matcher_bare_triggers_when_prefix_optional():
+    trie = TriggerTrie(["sig"], require_prefix=False)
+    assert typed(trie, "sig").match == "sig"
+    assert typed(trie, "/sig").match == "sig"
+
+def test_backspace_corrects_typos():
+    trie = TriggerTrie(["sig"])
+    m = typed(trie, "/sx\big")
+    assert m.match == "sig"
+    assert m.depth == 4
+    # chars past the trie are counted, so the same number of backspaces returns to it
+    m = typed(trie, "/sigzzz\b\b\b")
+    assert m.match == "sig"
+
+def test_cached_trie_is_loaded_back_under_the_same_stamp(tmp_path):
+    built = []
+
+    def build():
+        built.append(1)
+        return TriggerTrie(["sig", "si", "adresse", "ça"], prefix=";")
+
+    first = cached_trie(tmp_path, "lib:1", build, prefix=";")
+    again = cached_trie(tmp_path, "lib:1", build, prefix=";")
+    assert len(built) == 1
+    assert (again.first, again.terminal, again.labels, list(again.triggers), again.max_depth) == \
+        (first.first, first.terminal, first.labels, list(first.triggers), first.max_depth)
+    assert typed(again, ";ça").match == "ça" and typed(again, ";si").match == "si"
+    cached_trie(tmp_path, "lib:2", build, prefix=";")  # a new stamp rebuilds and replaces the file
+    assert len(built) == 2 and len(list(tmp_path.glob("trie-*.trie"))) == 1
+
+def test_damaged_trie_cache_is_rebuilt(tmp_path):
+    cached_trie(tmp_path, "lib:1", lambda: TriggerTrie(["sig"]))
+    (path,) = tmp_path.glob("trie-*.trie")
+    path.write_bytes(path.read_bytes()[:-3])
+    trie = cached_trie(tmp_path, "lib:1", lambda: TriggerTrie(["sig"]))
+    assert typed(trie, "/sig").match == "sig"
+
+# ---- Injection plans
+def test_plan_for_key():
+    assert InjectionPlan.for_key("a") == InjectionPlan(text="a")
+    assert InjectionPlan.for_key("space") == InjectionPlan(text=" ")
+    assert InjectionPlan.for_key("enter") == InjectionPlan(keys=("enter",))
+
+def test_expansion_is_one_plan_and_reemits_the_boundary(make_engine):
+    engine, platform = make_engine({"hi": "hello world"})
+    platform.keys.type("/hi")
+    assert platform.keys.press("space") is False  # the boundary is swallowed and typed by the plan
+    engine.wait_idle()
+    assert platform.recorder.plans == [InjectionPlan(deletes=3, text="hello world ")]
+
+def test_cursor_parks_the_caret_and_drops_the_boundary(make_engine):
+    engine, platform = make_engine({"sig": "Regards,{cursor} Ben"})
+    platform.keys.type("/sig ")
+    engine.wait_idle()
+    assert platform.recorder.plans == [InjectionPlan(deletes=4, text="Regards, Ben", caret_left=4)]
+
+def test_bad_date_format_stays_literal():
+    cache = TemplateCache({"d": "on {date:%Y\ud800}{cursor}!"})
+    assert cache.render("d") == ("on {date:%Y\ud800}", "!")
+    assert "bad date format" in cache.check()["d"]
+
+def test_typo_corrected_trigger_deletes_what_is_on_screen(make_engine):
+    engine, platform = make_engine({"sig": "Regards"})
+    platform.keys.type("/sx\big ")
+    engine.wait_idle()
+    assert platform.recorder.plans == [InjectionPlan(deletes=4, text="Regards ")]
+
+def test_keys_typed_during_a_pending_expansion_are_replayed_after_it(make_engine):
+    engine, platform = make_engine({"hi": "hello"}, start_worker=False)
+    platform.keys.type("/hi ")
+    # the expansion is queued but not typed yet: these keys are held, not passed through
+    assert platform.keys.press("o") is False
+    assert platform.keys.press("k") is False
+    engine.start_worker()
+    engine.wait_idle()
+    assert platform.recorder.plans == [
+        InjectionPlan(deletes=3, text="hello "), InjectionPlan(text="o"), InjectionPlan(text="k")]
+
+class EchoingBackend(RecordingBackend):
+    """Plays each plan back through the fake hook, as a real backend's keys would come back."""
+
+    def __init__(self, keys, racing=""):
+        super().__init__()
+        self.keys = keys
+        self.racing = racing  # typed by the user while the first plan goes out
+        self.passed = []
+
+    def echoes(self, plan):
+        return ["backspace"] * plan.deletes + [KEY_NAMES.get(ch, ch) for ch in plan.text]
+
+    def emit(self, plan):
+        super().emit(plan)
+        racing, self.racing = self.racing, ""
+        self.passed += [self.keys.press(KEY_NAMES.get(ch, ch)) for ch in racing]
+        self.passed += [self.keys.press(name) for name in self.echoes(plan)]
+
+def test_keys_typed_during_an_injection_are_held_and_replayed_after_it(make_engine):
+    engine, platform = make_engine({"hi": "hello"}, start_worker=False)
+    engine.output = backend = EchoingBackend(platform.keys, racing="xy")
+    platform.keys.type("/hi ")
+    engine.start_worker()
+    engine.wait_idle()
+    assert platform.recorder.plans == []
+    assert backend.plans == [InjectionPlan(deletes=3, text="hello "), InjectionPlan(text="x"), InjectionPlan(text="y")]
+    # the user's "x" and "y" were swallowed; every echo of our own output went through, and only once
+    assert backend.passed == [False, False] + [True] * 9 + [True] + [True]
+
+def test_disabled_engine_passes_everything_through(make_engine):
+    engine, platform = make_engine({"hi": "hello"})
+    engine.toggle_enabled()
+    platform.keys.type("/hi ")
+    engine.wait_idle()
+    assert platform.recorder.plans == []
+    assert platform.keys.swallowed == 0
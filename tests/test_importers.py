@@ -0,0 +1,103 @@
+import io
+import json
+
+import pytest
+
+from textexpander.core import importers
+from textexpander.core.importers import (OVERWRITE, RENAME, SKIP, import_into, iter_csv_pairs,
+                                         iter_espanso_pairs, iter_json_pairs)
+
+def test_csv_header_after_blank_lines_is_not_a_snippet():
+    f = io.StringIO("\n\nText,Abbreviation\nhello there,hi\n")
+    assert list(iter_csv_pairs(f)) == [("hi", "hello there")]
+
+# ---- JSON streaming
+OBJECT = {"sig": "Best regards,\n\"Ada\"", "é→": "ünïcødé ✓", "n": 12345, "ws": "  spaced  "}
+RECORDS = [{"trigger": "sig", "expansion": "Regards"}, {"Abbreviation": "addr", "Content": "1 Main St"},
+           {"shortcut": "num", "text": 9876543}]
+
+@pytest.mark.parametrize("chunk", [1, 2, 3, 5, 7, 64 * 1024])
+def test_json_object_is_streamed_across_chunk_boundaries(monkeypatch, chunk):
+    monkeypatch.setattr(importers, "_CHUNK", chunk)
+    text = json.dumps(OBJECT, ensure_ascii=False, indent=2)
+    assert list(iter_json_pairs(io.StringIO(text))) == list(OBJECT.items())
+
+@pytest.mark.parametrize("chunk", [1, 3, 4, 64 * 1024])
+def test_json_list_of_records_is_streamed_across_chunk_boundaries(monkeypatch, chunk):
+    monkeypatch.setattr(importers, "_CHUNK", chunk)
+    pairs = list(iter_json_pairs(io.StringIO(json.dumps(RECORDS))))
+    assert pairs == [("sig", "Regards"), ("addr", "1 Main St"), ("num", 9876543)]
+
+@pytest.mark.parametrize("text", ["{}", " [ ] ", "\n{\n}\n"])
+def test_empty_json_imports(text):
+    assert list(iter_json_pairs(io.StringIO(text))) == []
+
+@pytest.mark.parametrize("text", ['"just a string"', '{"a": "b"', '{"a" "b"}', '[1, 2]', '{"a": "b",}'])
+def test_malformed_json_is_rejected(monkeypatch, text):
+    monkeypatch.setattr(importers, "_CHUNK", 2)
+    with pytest.raises(ValueError):
+        list(iter_json_pairs(io.StringIO(text)))
+
+# ---- espanso
+ESPANSO = """\
+matches:
+  - trigger: ":sig"
+    replace: |
+      Best regards,
+        Ada
+
+  - trigger: ':fold'
+    replace: >
+      one
+      two
+  - trigger: plain
+    replace: just text # a comment
+  - trigger: ":q"
+    replace: "line\\none"
+"""
+
+def test_espanso_block_and_quoted_scalars():
+    assert list(iter_espanso_pairs(io.StringIO(ESPANSO))) == [
+        ("sig", "Best regards,\n  Ada"),
+        ("fold", "one two"),
+        ("plain", "just text"),
+        ("q", "line\none"),
+    ]
+
+def test_espanso_block_at_end_of_file():
+    text = "matches:\n  - trigger: ':end'\n    replace: |\n      last\n      lines\n\n"
+    assert list(iter_espanso_pairs(io.StringIO(text))) == [("end", "last\nlines")]
+
+# ---- Conflicts
+@pytest.fixture
+def export(tmp_path):
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps([{"trigger": "sig", "expansion": "new sig"},
+                                {"trigger": "fresh", "expansion": "f1"},
+                                {"trigger": "fresh", "expansion": "f2"},
+                                {"trigger": "bad trigger", "expansion": "x"}]), encoding="utf-8")
+    return path
+
+EXISTING = {"sig": "old sig", "sig_2": "taken"}
+
+def test_skip_keeps_existing_and_first_rows(export):
+    res = import_into(export, EXISTING, SKIP)
+    assert res.entries == {"fresh": "f1"}
+    assert (res.added, res.skipped, res.invalid) == (1, 2, ["bad trigger"])
+
+def test_overwrite_takes_the_last_row(export):
+    res = import_into(export, EXISTING, OVERWRITE)
+    assert res.entries == {"sig": "new sig", "fresh": "f2"}
+    assert (res.added, res.overwritten) == (1, 1)
+    assert res.summary() == "1 added, 1 overwritten, 1 invalid"
+
+def test_rename_picks_free_names(export):
+    res = import_into(export, EXISTING, RENAME)
+    assert res.entries == {"sig_3": "new sig", "fresh": "f1", "fresh_2": "f2"}
+    assert (res.added, res.renamed) == (1, 2)
+
+def test_unknown_policy_and_format(export, tmp_path):
+    with pytest.raises(ValueError):
+        import_into(export, {}, "merge")
+    with pytest.raises(ValueError):
+        import_into(tmp_path / "notes.txt", {})
@@ -0,0 +1,24 @@
+import json
+
+from textexpander.core.journal import SnippetJournal
+
+def test_journal_round_trip(tmp_path):
+    snapshot = tmp_path / "snippets.json"
+    snapshot.write_text(json.dumps({"a": "1", "b": "2"}), encoding="utf-8")
+    journal = SnippetJournal(snapshot, tmp_path / "snippets.journal", compact_bytes=1)
+    journal.append([("set", "c", "3"), ("del", "a", None), ("set", "b", "two")])
+    expected = {"b": "two", "c": "3"}
+    assert journal.load() == expected
+    assert journal.needs_compaction()
+    journal.compact()
+    assert not journal.path.exists() and not journal.rotated_path.exists()
+    assert json.loads(snapshot.read_text(encoding="utf-8")) == expected
+    assert SnippetJournal(snapshot, tmp_path / "snippets.journal").load() == expected
+
+def test_torn_journal_line_is_skipped(tmp_path):
+    snapshot = tmp_path / "snippets.json"
+    journal = SnippetJournal(snapshot, tmp_path / "snippets.journal")
+    journal.append([("set", "a", "1")])
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"op": "set", "k": "b"')  # crash mid-append
+    assert journal.load() == {"a": "1"}
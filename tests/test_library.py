@@ -0,0 +1,78 @@
+import json
+
+from textexpander.core.library import PERSONAL, Layer, LayeredLibrary, load_layer
+from textexpander.core.settings import Settings
+
+def stack(default=None, team=None, personal=None, team_apps=()):
+    return [Layer("default", default or {}), Layer("team", team or {}, frozenset(team_apps)),
+            Layer(PERSONAL, personal or {})]
+
+def test_personal_beats_team_beats_default():
+    lib = LayeredLibrary(stack(default={"a": "default", "b": "default", "c": "default"},
+                               team={"b": "team", "c": "team"},
+                               personal={"c": "personal"}))
+    assert [lib.get(t) for t in "abc"] == ["default", "team", "personal"]
+    assert [lib.owner(t) for t in "abc"] == [0, 1, 2]
+    assert dict(lib.view().items()) == {"a": "default", "b": "team", "c": "personal"}
+    assert lib.get("zz") is None and lib.owner("zz") is None
+
+def test_app_scoped_layer_only_counts_in_its_apps():
+    lib = LayeredLibrary(stack(default={"sig": "default sig"},
+                               team={"sig": "team sig", "tk": "ticket"},
+                               personal={"me": "mine"}, team_apps=["outlook.exe"]))
+    assert lib.get("sig", "outlook.exe") == "team sig"
+    assert lib.get("sig", "notepad.exe") == "default sig"
+    assert lib.get("tk", "outlook.exe") == "ticket"
+    assert lib.get("tk", "notepad.exe") is None
+    assert "tk" not in lib.view("notepad.exe")
+    assert sorted(lib.view("notepad.exe")) == ["me", "sig"]
+    assert sorted(lib.triggers()) == ["me", "sig", "tk"]  # every trigger, in any app
+
+def test_updated_reindexes_only_added_and_dropped_triggers():
+    default = Layer("default", {"a": "1", "b": "1"})
+    lib = LayeredLibrary([default, Layer("team", {"b": "2"}), Layer(PERSONAL, {"c": "3"})])
+
+    # an edited expansion moves no entry: the index is shared as is
+    edited = lib.updated([default, lib.layers[1], Layer(PERSONAL, {"c": "33"})])
+    assert edited._index is lib._index and not edited.triggers_changed
+    assert edited.get("c") == "33"
+
+    # the team layer drops "b" (the default shows through again) and adds "d"
+    team = lib.updated([default, Layer("team", {"d": "4"}), lib.layers[2]])
+    assert team.triggers_changed
+    assert [team.get(t) for t in "abcd"] == ["1", "1", "3", "4"]
+    assert team._index == LayeredLibrary(team.layers)._index  # same as indexing from scratch
+    assert lib.get("b") == "2" and "d" not in lib.triggers()  # the old library is untouched
+
+    # a trigger that disappears from every layer leaves the index
+    gone = team.updated([default, Layer("team", {}), team.layers[2]])
+    assert "d" not in gone.triggers() and gone.triggers_changed
+
+def test_updated_reindexes_a_layer_whose_apps_change():
+    team = Layer("team", {"sig": "team"})
+    lib = LayeredLibrary([Layer("default", {"sig": "default"}), team, Layer(PERSONAL, {})])
+    scoped = lib.updated([lib.layers[0], Layer("team", team.snippets, frozenset({"outlook.exe"})),
+                          lib.layers[2]])
+    assert scoped.get("sig", "outlook.exe") == "team"
+    assert scoped.get("sig", "notepad.exe") == "default"
+    assert scoped._index == LayeredLibrary(scoped.layers)._index
+
+def test_unreadable_library_gives_an_empty_layer(tmp_path):
+    layer = load_layer({"path": str(tmp_path / "missing.json"), "apps": ["Outlook.exe "]})
+    assert layer.snippets == {} and layer.error == "file not found"
+    assert layer.apps == frozenset({"outlook.exe"}) and layer.name == "missing"
+
+def test_app_scoped_triggers_do_not_expand_in_other_apps(make_engine, tmp_path):
+    team = tmp_path / "team.json"
+    team.write_text(json.dumps({"tk": "ticket text"}), encoding="utf-8")
+    settings = Settings(libraries=[{"name": "team", "path": str(team), "apps": ["outlook.exe"]}])
+    engine, platform = make_engine({"hi": "hello"}, settings=settings)
+
+    platform.keys.type("/tk ")
+    engine.wait_idle()
+    assert platform.recorder.plans == []  # notepad is outside the library's scope
+
+    platform.tracker.switch("outlook.exe", "Inbox - Outlook")
+    platform.keys.type("/tk ")
+    engine.wait_idle()
+    assert [p.text for p in platform.recorder.plans] == ["ticket text "]
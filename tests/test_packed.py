@@ -0,0 +1,107 @@
+import json
+import zlib
+
+import pytest
+
+from textexpander.core.packed import PackedSnippets, cached_pack
+from textexpander.core.snippets import SnippetRepository
+
+LIBRARY = {";sig": "Best regards,\nAda", ";addr": "1 Main St", "btw": "by the way"}
+
+def test_round_trip_keeps_values_and_insertion_order(tmp_path):
+    packed = PackedSnippets.write(tmp_path / "lib.pack", LIBRARY.items())
+    assert list(packed) == list(LIBRARY)
+    assert dict(packed.items()) == LIBRARY
+    assert list(packed.values()) == list(LIBRARY.values())
+    assert packed.keys()[1] == ";addr"
+    assert PackedSnippets.open(tmp_path / "lib.pack") == LIBRARY
+
+def test_missing_keys():
+    packed = PackedSnippets.from_items(LIBRARY.items())
+    assert ";nope" not in packed and packed.get(";nope") is None
+    assert ";si" not in packed and ";sig2" not in packed  # prefixes and extensions of real keys
+    assert 42 not in packed and packed.get(42, "x") == "x"
+    with pytest.raises(KeyError):
+        packed[";nope"]
+    with pytest.raises(IndexError):
+        packed.keys()[3]
+
+def test_hash_collisions_probe_to_the_right_entry():
+    # three keys landing in the same slot of the smallest (8-slot) table
+    keys, i = [], 0
+    while len(keys) < 3:
+        k = f"k{i}"
+        if zlib.crc32(k.encode("utf-8")) & 7 == 0:
+            keys.append(k)
+        i += 1
+    packed = PackedSnippets.from_items((k, k.upper()) for k in keys)
+    assert [packed[k] for k in keys] == [k.upper() for k in keys]
+    absent = next(f"x{j}" for j in range(10000) if zlib.crc32(f"x{j}".encode("utf-8")) & 7 == 0)
+    assert absent not in packed
+
+def test_non_ascii_triggers_and_expansions():
+    data = {"çà": "déjà vu", "→ok": "✓ 完了", ";emoji": "🙂" * 3, ";e\u0301": "combining"}
+    packed = PackedSnippets.from_items(data.items())
+    assert dict(packed.items()) == data
+    assert packed["→ok"] == "✓ 完了"
+    assert ";\u00e9" not in packed  # the precomposed form is a different key; nothing is normalised
+
+def test_empty_library():
+    packed = PackedSnippets.from_items([])
+    assert len(packed) == 0 and list(packed) == [] and dict(packed.items()) == {}
+    assert "a" not in packed
+
+def test_damaged_packs_are_rejected():
+    buf = PackedSnippets.pack(LIBRARY.items())
+    with pytest.raises(ValueError):
+        PackedSnippets(buf[:40])
+    with pytest.raises(ValueError):
+        PackedSnippets(b"NOTAPACK" + buf[8:])
+
+def test_edits_copy_the_pack_instead_of_changing_it():
+    packed = PackedSnippets.from_items(LIBRARY.items())
+    repo = SnippetRepository(packed)
+    engine = repo.detached()
+    assert engine.mapping() is packed  # shared, not copied
+
+    repo.set(";new", "fresh")
+    repo.set(";sig", "Cheers")
+    repo.delete("btw")
+    assert repo.mapping() == {";sig": "Cheers", ";addr": "1 Main St", ";new": "fresh"}
+    assert dict(packed.items()) == LIBRARY
+    assert engine.mapping() is packed and engine.get(";sig") == "Best regards,\nAda"
+
+def test_deleting_a_missing_key_keeps_the_pack():
+    packed = PackedSnippets.from_items(LIBRARY.items())
+    repo = SnippetRepository(packed)
+    repo.delete(";nope")
+    assert repo.mapping() is packed
+
+def test_cached_pack_reuses_a_pack_and_never_overwrites_a_mapped_one(tmp_path):
+    source = tmp_path / "lib.json"
+    cache = tmp_path / "cache"
+    source.write_text(json.dumps(LIBRARY), encoding="utf-8")
+    loads = []
+
+    def load():
+        loads.append(1)
+        return json.loads(source.read_text(encoding="utf-8"))
+
+    first = cached_pack([source], cache, load, min_size=1)
+    assert isinstance(first, PackedSnippets) and loads == [1]
+    again = cached_pack([source], cache, load, min_size=1)
+    assert again == LIBRARY and loads == [1]  # mapped from the cache, not parsed again
+    old_files = sorted(cache.glob("*.pack"))
+
+    source.write_text(json.dumps({**LIBRARY, ";new": "fresh"}), encoding="utf-8")
+    changed = cached_pack([source], cache, load, min_size=1)
+    assert changed[";new"] == "fresh" and loads == [1, 1]
+    new_files = sorted(cache.glob("*.pack"))
+    assert len(new_files) == 1 and new_files != old_files  # written next to the old pack, not over it
+    assert dict(first.items()) == LIBRARY  # the old mapping still reads what it was built from
+
+def test_small_libraries_stay_plain_dicts(tmp_path):
+    source = tmp_path / "lib.json"
+    source.write_text("{}", encoding="utf-8")
+    assert cached_pack([source], tmp_path / "cache", lambda: dict(LIBRARY), min_size=10) == LIBRARY
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,41 @@
+import threading
+import time
+
+from textexpander.core.persistence import PersistenceService
+
+def test_jobs_for_a_key_coalesce_and_run_once():
+    svc = PersistenceService(debounce=60)
+    runs = []
+    for i in range(5):
+        svc.submit("k", lambda i=i: runs.append(i))
+    assert svc.pending("k")
+    svc.flush()
+    assert runs == [4] and not svc.pending("k")
+    svc.stop()
+
+class SlowToLock:
+    """A lock the writer thread takes only after a pause, to widen any window before it."""
+
+    def __init__(self, lock, thread):
+        self._lock = lock
+        self._thread = thread
+
+    def __enter__(self):
+        if threading.current_thread() is self._thread:
+            time.sleep(0.05)
+        return self._lock.__enter__()
+
+    def __exit__(self, *exc):
+        return self._lock.__exit__(*exc)
+
+def test_a_flush_racing_the_writer_never_lets_an_older_job_win():
+    svc = PersistenceService(debounce=0)
+    svc._run_lock = SlowToLock(svc._run_lock, svc._thread)
+    writes = []
+    svc.submit("k", lambda: writes.append("v1"))
+    time.sleep(0.02)  # the writer has picked v1 up and is on its way to run it
+    svc.submit("k", lambda: writes.append("v2"))
+    svc.flush()
+    time.sleep(0.1)
+    svc.stop()
+    assert writes[-1] == "v2"
@@ -0,0 +1,13 @@
+# ---- Foreground events
+def test_tracker_pushes_the_foreground_into_the_engine(make_engine):
+    engine, platform = make_engine({"hi": "hello"})
+    platform.tracker.switch("outlook.exe", "Inbox")
+    assert engine.foreground.get() == ("outlook.exe", "Inbox")
+    assert engine.foreground.stats()["mode"] == "events"
+
+def test_fake_platform_stops_cleanly(make_engine):
+    engine, platform = make_engine({"hi": "hello"})
+    engine.stop()
+    assert engine.foreground.stats()["mode"] == "polling"
+    platform.tracker.switch("keepass.exe", "")  # no longer delivered
+    assert engine.foreground.get()[0] != "keepass.exe"
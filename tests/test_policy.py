@@ -0,0 +1,29 @@
+from textexpander.core.injector import InjectionPlan
+from textexpander.core.settings import Settings
+
+def test_blacklisted_app_gets_no_expansions(make_engine):
+    engine, platform = make_engine({"hi": "hello"})
+    platform.tracker.switch("keepass.exe", "Database")
+    platform.keys.type("/hi ")
+    engine.wait_idle()
+    assert platform.recorder.plans == []
+    platform.tracker.switch("notepad.exe", "Untitled")
+    platform.keys.type("/hi ")
+    engine.wait_idle()
+    assert platform.recorder.plans == [InjectionPlan(deletes=3, text="hello ")]
+
+def test_blocked_title_and_rules(make_engine):
+    settings = Settings(blocked_title_patterns=["(?i)password", "login"],
+                        app_rules=[{"app": "putty.exe", "title": "prod", "allow": False},
+                                   {"app": "*", "title": "login test", "allow": True}])
+    engine, platform = make_engine({"hi": "hello"}, settings=settings)
+    for app, title, expands in [("chrome.exe", "Change Password", False),
+                                ("chrome.exe", "Login - Bank", False),
+                                ("chrome.exe", "Login test page", True),
+                                ("putty.exe", "PROD-db01", False),
+                                ("putty.exe", "dev-db01", True)]:
+        platform.tracker.switch(app, title)
+        platform.recorder.plans.clear()
+        platform.keys.type("/hi ")
+        engine.wait_idle()
+        assert bool(platform.recorder.plans) is expands, (app, title)
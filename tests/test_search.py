@@ -0,0 +1,67 @@
+from textexpander.core.search import SnippetSearchIndex
+from textexpander.core.snippets import SnippetRepository
+
+LIBRARY = {
+    "addr": "1 Main Street",
+    "address2": "Suite 200",
+    "myaddr": "PO Box 7",
+    "sig": "Best regards, see my address below",
+    "ty": "Thank you",
+}
+
+def test_ranking_is_trigger_prefix_then_trigger_substring_then_body():
+    index = SnippetSearchIndex(LIBRARY)
+    # prefix matches shortest first, then "myaddr", then the expansion that mentions it
+    assert index.search("addr") == ["addr", "address2", "myaddr", "sig"]
+    assert index.search("ADDR", limit=2) == ["addr", "address2"]
+    assert index.search("regards") == ["sig"]
+    assert index.search("nothing here") == []
+
+def test_short_queries_match_triggers_only():
+    index = SnippetSearchIndex(LIBRARY)
+    assert index.search("ty") == ["ty"]  # not the "ty" inside "Suite" or "Thank you"
+    assert index.search("y") == ["myaddr", "ty"]  # substring matches keep library order
+    assert index.search("") == list(LIBRARY)
+
+def test_incremental_add_and_remove():
+    index = SnippetSearchIndex(LIBRARY)
+    index.add("invoice", "Please find the invoice attached")
+    assert index.search("invoice") == ["invoice"]
+    index.add("sig", "Cheers")  # replacing an entry drops what it used to say
+    assert index.search("regards") == []
+    assert index.search("cheers") == ["sig"]
+    index.remove("addr")
+    index.remove("not there")
+    assert index.search("addr") == ["address2", "myaddr"]
+    assert len(index) == 5
+
+def test_update_applies_the_difference_between_versions():
+    index = SnippetSearchIndex(LIBRARY)
+    new = dict(LIBRARY, ty="Thanks a lot", extra="street food")
+    del new["addr"]
+    index.update(LIBRARY, new)
+    assert sorted(index.search("street")) == ["extra"]
+    assert index.search("thanks") == ["ty"]
+    assert len(index) == len(new)
+
+def test_tombstones_are_dropped_by_a_rebuild():
+    index = SnippetSearchIndex({f"t{i}": f"body {i}" for i in range(2000)})
+    for i in range(1024):
+        index.remove(f"t{i}")
+    assert len(index._entries) == 2000  # tombstoned, not yet dropped
+    index.remove("t1024")  # now over the floor of 1024, and more than the 975 live entries
+    assert len(index._entries) == len(index) == 975
+    assert index.search("t1999") == ["t1999"]
+    assert index.search("body 1024") == []
+    assert index.search("body 1025") == ["t1025"]
+
+def test_repository_index_follows_set_and_delete():
+    repo = SnippetRepository(LIBRARY)
+    assert list(repo.search("addr")) == ["addr", "address2", "myaddr", "sig"]  # builds the index
+    repo.set("addrx", "new address")
+    repo.delete("myaddr")
+    repo.set("sig", "Cheers")
+    assert repo.search("addr") == {"addr": "1 Main Street", "address2": "Suite 200", "addrx": "new address"}
+    repo.set_all({"ty": "Thank you", "zz": "main course"})
+    assert list(repo.search("main")) == ["zz"]
+    assert list(repo.search("addr")) == []
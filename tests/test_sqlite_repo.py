@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from textexpander.core.journal import SnippetJournal
+from textexpander.core.persistence import get_persistence
+from textexpander.core.sqlite_repo import SqliteSnippetRepository
+
+@pytest.fixture
+def repo(tmp_path):
+    snapshot = tmp_path / "snippets.json"
+    snapshot.write_text(json.dumps({"sig": "Best regards", "addr": "1 Main St", "inv": "Invoice attached"}),
+                        encoding="utf-8")
+    SnippetJournal(snapshot, tmp_path / "snippets.journal").append([("set", "ty", "Thank you"), ("del", "addr", None)])
+    repo = SqliteSnippetRepository(tmp_path / "snippets.db")
+    repo.migrate_from_json(snapshot, tmp_path / "snippets.journal")
+    return repo
+
+def saved(repo):
+    repo.save()
+    get_persistence().flush()
+
+def test_migration_replays_the_journal(repo):
+    assert repo.all() == {"sig": "Best regards", "inv": "Invoice attached", "ty": "Thank you"}
+    assert repo._meta("migrated").endswith("snippets.json")
+
+def test_unsaved_edits_are_overlaid_on_every_read(repo):
+    repo.set("new", "fresh")
+    repo.set("sig", "Cheers")
+    repo.delete("inv")
+    assert repo.get("new") == "fresh" and repo.get("sig") == "Cheers" and repo.get("inv") is None
+    assert len(repo) == 3
+    assert sorted(repo.triggers()) == ["new", "sig", "ty"]
+    assert dict(repo.mapping().items()) == {"sig": "Cheers", "ty": "Thank you", "new": "fresh"}
+    assert list(repo.search("fres")) == ["new"]
+    assert "inv" not in repo.search("invoice")
+    # the database is untouched until the writer runs
+    assert SqliteSnippetRepository(repo.path)._meta("generation") == "1"
+
+def test_save_commits_changed_rows_and_delete(repo):
+    repo.set("new", "fresh")
+    repo.delete("inv")
+    repo.delete("missing")  # not there: nothing to save
+    saved(repo)
+    other = repo.detached()
+    assert other.all() == {"sig": "Best regards", "ty": "Thank you", "new": "fresh"}
+    assert other._meta("generation") == "2"
+    assert not other.search("invoice")
+
+def test_set_all_records_only_the_differences(repo):
+    repo.set("draft", "unsaved")
+    repo.set_all({"sig": "Best regards", "ty": "Thanks!", "new": "fresh", "draft": "unsaved"})
+    assert repo._pending == {"draft": "unsaved", "ty": "Thanks!", "new": "fresh", "inv": None}
+    saved(repo)
+    assert repo.all() == {"sig": "Best regards", "ty": "Thanks!", "new": "fresh", "draft": "unsaved"}
+
+@pytest.mark.parametrize("fts", [True, False])
+def test_search_ranks_trigger_prefix_then_substring_then_text(repo, fts):
+    repo._fts = repo._fts and fts  # False: the LIKE scan, as without FTS5
+    repo.set_all({"inv": "Invoice attached", "xinv": "other", "memo": "see the invoice",
+                  "sig": "Best regards"})
+    saved(repo)
+    assert list(repo.search("inv")) == ["inv", "xinv", "memo"]
+    assert list(repo.search("INVOICE")) == ["inv", "memo"]
+    assert list(repo.search("in")) == ["inv", "xinv", "memo"]  # 2 chars: below the trigram size
+    assert list(repo.search("inv", limit=2)) == ["inv", "xinv"]
+
+def test_stamp_names_the_committed_contents(repo):
+    stamp = repo.stamp()
+    assert stamp == repo.detached().stamp()
+    repo.set("new", "fresh")
+    assert repo.stamp() is None  # unsaved edits: the contents have no name yet
+    saved(repo)
+    assert repo.stamp() not in (None, stamp)
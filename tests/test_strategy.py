@@ -0,0 +1,31 @@
+from textexpander.core.strategy import AUTO, PASTE, TYPE, ExpansionStrategy
+
+def feed(strategy, paste_s, typed_s_per_char, rounds=50):
+    for _ in range(rounds):
+        strategy.record(TYPE, 20, 20 * typed_s_per_char)
+        strategy.record(PASTE, 300, paste_s)
+
+def test_short_ascii_is_typed_and_the_rest_pasted():
+    s = ExpansionStrategy()
+    assert s.choose("hello") == TYPE
+    assert s.choose("x" * 49) == PASTE
+    assert s.choose("two\nlines") == PASTE
+    assert s.choose("café") == PASTE
+    assert s.choose("x" * 200, TYPE) == TYPE
+
+def test_queued_input_timings_keep_the_threshold_near_the_default():
+    # SendInput returns once events are queued: a few µs per char against a ~2 ms clipboard round trip
+    s = ExpansionStrategy()
+    feed(s, paste_s=0.002, typed_s_per_char=0.000003)
+    assert s.threshold == 96
+    assert s.choose("x" * 200, AUTO) == PASTE
+
+def test_slow_typing_lowers_the_threshold_within_the_band():
+    s = ExpansionStrategy()
+    feed(s, paste_s=0.005, typed_s_per_char=0.001)  # e.g. a backend that waits per key
+    assert s.threshold == 24
+
+def test_balanced_costs_land_inside_the_band():
+    s = ExpansionStrategy()
+    feed(s, paste_s=0.004, typed_s_per_char=0.0001)
+    assert s.threshold == 40
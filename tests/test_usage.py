@@ -0,0 +1,60 @@
+import json
+
+from textexpander.core.persistence import PersistenceService
+from textexpander.core.settings import Settings
+from textexpander.core.usage import MAX_APPS_PER_TRIGGER, UsageStore
+
+def test_offline_library_keeps_its_usage_history(make_engine, tmp_path):
+    team = tmp_path / "team.json"
+    team.write_text(json.dumps({"tm": "team text"}), encoding="utf-8")
+    settings = Settings(libraries=[{"name": "team", "path": str(team)}])
+    engine, platform = make_engine({"hi": "hello"}, settings=settings)
+    engine.usage.record("tm", "outlook.exe")
+    engine.usage.record("gone", "outlook.exe")
+
+    team.unlink()  # the share goes offline
+    engine.reload_libraries()
+    assert engine.library.layers[0].error
+    assert engine.usage.count("tm") == 1 and engine.usage.count("gone") == 1
+
+    team.write_text(json.dumps({"tm": "team text"}), encoding="utf-8")
+    engine.reload_libraries()
+    assert engine.usage.count("tm") == 1
+    assert engine.usage.count("gone") == 0  # in no library that loaded: pruned
+
+def test_per_app_counts_are_capped_and_the_least_used_slot_is_reused():
+    store = UsageStore()
+    for i in range(MAX_APPS_PER_TRIGGER):
+        for _ in range(i + 1):
+            store.record("sig", f"app{i}.exe", when=1000.0)
+    store.record("sig", "new.exe", when=2000.0)
+    apps = store.apps("sig")
+    assert len(apps) == MAX_APPS_PER_TRIGGER
+    assert "app0.exe" not in apps
+    assert apps["new.exe"] == 2  # took over app0's single use, plus its own
+    assert sum(apps.values()) == store.count("sig")
+
+def test_usage_file_round_trip(tmp_path):
+    path = tmp_path / "usage.json"
+    writer = PersistenceService(debounce=0)
+    store = UsageStore(path, writer)
+    store.record("sig", "outlook.exe", when=1000.0)
+    store.record("sig", "", when=2000.0)
+    store.record("ty", "notepad.exe", when=1500.0)
+    writer.flush()
+    writer.stop()
+
+    loaded = UsageStore.load(path)
+    assert loaded.counts() == {"sig": 2, "ty": 1}
+    assert loaded.last_used("sig") == 2000.0
+    assert loaded.apps("sig") == {"outlook.exe": 1} and loaded.apps("ty") == {"notepad.exe": 1}
+    assert loaded.frecency.scores == store.frecency.scores
+    assert loaded.unused(["sig", "ty", "addr"]) == ["addr"]
+
+def test_damaged_usage_records_are_skipped(tmp_path):
+    path = tmp_path / "usage.json"
+    path.write_text(json.dumps({"version": 1, "usage": {"ok": [3, 10.0, 1.5, {}], "bad": [1, "x"]}}),
+                    encoding="utf-8")
+    assert UsageStore.load(path).counts() == {"ok": 3}
+    path.write_text("{not json", encoding="utf-8")
+    assert UsageStore.load(path).counts() == {}
@@ -0,0 +1,79 @@
+import json
+import time
+
+from textexpander.core.config import SETTINGS_FILE, SNIPPETS_FILE, SNIPPETS_JOURNAL
+from textexpander.core.injector import InjectionPlan
+from textexpander.core.persistence import get_persistence
+from textexpander.core.settings import Settings
+from textexpander.core.snippets import SnippetRepository
+from textexpander.core.storage import write_json_atomic
+from textexpander.core.watcher import FileWatcher
+
+def test_watcher_tells_our_own_writes_apart(tmp_path):
+    path = tmp_path / "settings.json"
+    write_json_atomic(path, {"a": 1})
+    calls = []
+    watcher = FileWatcher([path], lambda: calls.append("disk"), interval=0.01, debounce=0.01,
+                          own_callback=lambda: calls.append("own"))
+
+    def wait_for(n):
+        deadline = time.monotonic() + 2
+        while len(calls) < n and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    watcher.start()
+    try:
+        write_json_atomic(path, {"a": 2})
+        wait_for(1)
+        assert calls == ["own"]
+        path.write_text('{"a": 3, "edited": true}', encoding="utf-8")  # another program
+        wait_for(2)
+        assert calls == ["own", "disk"]
+    finally:
+        watcher.stop()
+
+def test_hot_reload_picks_up_settings_and_snippets(make_engine):
+    writer = get_persistence()
+    writer.flush()  # nothing queued by earlier tests may land on top of the files below
+    for p in (SNIPPETS_JOURNAL, SNIPPETS_FILE):
+        if p.exists():
+            p.unlink()
+    SNIPPETS_FILE.write_text(json.dumps({"old": "before"}), encoding="utf-8")
+    SETTINGS_FILE.write_text(json.dumps({"trigger_prefix": ";"}), encoding="utf-8")
+
+    ui_repo = SnippetRepository.load_or_create()
+    engine, platform = make_engine(ui_repo)
+
+    # a manager-window save goes through the journal; a reload must see it even before the writer ran
+    ui_repo.set("new", "fresh")
+    ui_repo.save()
+    engine.reload_all()
+    assert engine.settings.trigger_prefix == ";"
+    platform.keys.type(";new ")
+    engine.wait_idle()
+    assert platform.recorder.plans == [InjectionPlan(deletes=4, text="fresh ")]
+    assert "new" in SnippetRepository.load_or_create().mapping()
+
+def test_manager_edits_are_published_without_a_disk_read(make_engine):
+    ui_settings = Settings(trigger_prefix=";")
+    ui_repo = SnippetRepository({"old": "before"})
+    engine, platform = make_engine(ui_repo, settings=ui_settings)
+    ui_repo.set("new", "fresh")
+    ui_settings.trigger_prefix = "!"
+    engine.publish_shared()
+    platform.keys.type("!new ")
+    engine.wait_idle()
+    assert platform.recorder.plans == [InjectionPlan(deletes=4, text="fresh ")]
+
+def test_unreadable_settings_keep_the_current_ones_and_the_file(make_engine):
+    get_persistence().flush()
+    SETTINGS_FILE.write_text(json.dumps({"trigger_prefix": ";", "blacklist_process_names": ["x.exe"]}),
+                             encoding="utf-8")
+    engine, platform = make_engine({"hi": "hello"}, settings=Settings.load())
+    truncated = '{"trigger_prefix": ";", "blacklist_pro'
+    SETTINGS_FILE.write_text(truncated, encoding="utf-8")  # caught mid-save by another program
+    engine.reload_all()
+    get_persistence().flush()
+    assert engine.settings.trigger_prefix == ";"
+    assert engine.settings.blacklist_process_names == ["x.exe"]
+    assert SETTINGS_FILE.read_text(encoding="utf-8") == truncated
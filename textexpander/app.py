@@ -1,36 +1,92 @@
+import time
+_STARTED = time.perf_counter()  # as close to process start as this package gets
+
 import sys
+import argparse
 import threading
-from PyQt6 import QtWidgets
 from .core.settings import Settings
-from .core.snippets import SnippetRepository
+from .core.snippets import open_repository
 from .core.expander import ExpanderEngine
-from .core.logger import get_logger
-from .tray import create_tray
-from .ui.main_window import SnippetManagerWindow
+from .core.logger import get_logger, stop_logging
+from .core.persistence import get_persistence
+from .core.metrics import StartupTimer
+from .core.usage import UsageStore
+from .core.config import USAGE_FILE
+
+class LazyManager:
+    """Builds the Snippet Manager window the first time it is asked for."""
+
+    def __init__(self, settings, repo, engine, logger):
+        self._args = (settings, repo, engine, logger)
+        self._engine = engine
+        self._window = None
+
+    def get(self):
+        if self._window is None:
+            from .ui.main_window import SnippetManagerWindow  # psutil & co. load with it
+            self._window = SnippetManagerWindow(*self._args)
+            self._engine.startup.mark("manager_built")
+        return self._window
+
+    def open(self):
+        built = self._window is not None
+        w = self.get()
+        if built:
+            w.reload_models()  # a new window has just read the repository
+        w.show()
+        w.raise_()
+        w.activateWindow()
+
+def parse_args(argv):
+    ap = argparse.ArgumentParser(prog="TextExpanderPy")
+    ap.add_argument("--start-minimized", action="store_true",
+                    help="start in the tray without opening the Snippet Manager")
+    # Qt consumes its own options (e.g. -style); leave them alone
+    args, _ = ap.parse_known_args(argv[1:])
+    return args
 
 def run_app():
-    app = QtWidgets.QApplication(sys.argv)
-    app.setApplicationName("TextExpanderPy")
-    # Keep running in tray even if all windows are closed
-    app.setQuitOnLastWindowClosed(False)
+    args = parse_args(sys.argv)
+    startup = StartupTimer(_STARTED)
 
     logger = get_logger()
+    # Settings/snippet writes happen on a background thread; drain them before exiting
+    persistence = get_persistence()
+    persistence.logger = logger
     settings = Settings.load()
-    repo = SnippetRepository.load_or_create()
+    repo = open_repository(settings.storage_backend)
 
-    # Expander runs in background thread
-    engine = ExpanderEngine(settings=settings, repository=repo, logger=logger)
+    # Engine first: the keyboard hook goes live before any UI is built
+    engine = ExpanderEngine(settings=settings, repository=repo, logger=logger,
+                            usage=UsageStore.load(USAGE_FILE), startup=startup)
     t = threading.Thread(target=engine.run, daemon=True)
     t.start()
 
-    # Manager window (created on demand from tray)
-    manager = SnippetManagerWindow(settings, repo, engine, logger)
-    # Show main window on startup
-    manager.show()
-    manager.raise_()
-    manager.activateWindow()
+    from PyQt6 import QtCore, QtWidgets
+    from .tray import create_tray
+    from .ui.completion_popup import CompletionPopup
+
+    app = QtWidgets.QApplication(sys.argv)
+    app.setApplicationName("TextExpanderPy")
+    # Keep running in tray even if all windows are closed
+    app.setQuitOnLastWindowClosed(False)
+    # engine first: it runs a pending clipboard restore and may still queue writes
+    app.aboutToQuit.connect(engine.stop)
+    app.aboutToQuit.connect(persistence.stop)
+    app.aboutToQuit.connect(stop_logging)
 
+    # Manager window is created on first open (tray, or right away unless --start-minimized)
+    manager = LazyManager(settings, repo, engine, logger)
     tray = create_tray(app, manager, engine, settings)
     tray.show()
+    startup.mark("tray_shown")
+
+    # Suggestions while typing a trigger (shown only when enabled in settings)
+    popup = CompletionPopup(engine)
+    popup.attach()
+
+    if not args.start_minimized:
+        # after the event loop is running, so the tray paints first
+        QtCore.QTimer.singleShot(0, manager.open)
 
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
@@ -1,27 +1,216 @@
-import ctypes
-import ctypes.wintypes as wt
-import psutil
+import time
+import threading
+from typing import Dict, Tuple
 
-user32 = ctypes.windll.user32
-kernel32 = ctypes.windll.kernel32
+class ForegroundBackend:
+    """OS access used by ForegroundCache; subclass per platform."""
 
-def get_foreground_window_title() -> str:
-    hwnd = user32.GetForegroundWindow()
-    if not hwnd:
+    def foreground_window(self) -> int:
+        return 0
+
+    def window_pid(self, hwnd: int) -> int:
+        return 0
+
+    def window_title(self, hwnd: int) -> str:
         return ""
-    length = user32.GetWindowTextLengthW(hwnd) + 1
-    buf = ctypes.create_unicode_buffer(length)
-    user32.GetWindowTextW(hwnd, buf, length)
-    return buf.value or ""
 
-def get_foreground_process_name() -> str:
-    hwnd = user32.GetForegroundWindow()
-    if not hwnd:
+    def process_name(self, pid: int) -> str:
         return ""
-    pid = wt.DWORD()
-    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
-    try:
-        p = psutil.Process(pid.value)
-        return (p.name() or "").lower()
-    except Exception:
-        return ""
\ No newline at end of file
+
+    def process_started(self, pid: int) -> float:
+        """Creation time of `pid`; tells a reused PID from the process that had it before."""
+        return 0.0
+
+class Win32ForegroundBackend(ForegroundBackend):
+    def __init__(self):
+        import ctypes
+        import ctypes.wintypes as wt
+        import psutil
+        self._ctypes = ctypes
+        self._wt = wt
+        self._psutil = psutil
+        self._user32 = ctypes.windll.user32
+
+    def foreground_window(self) -> int:
+        return self._user32.GetForegroundWindow() or 0
+
+    def window_pid(self, hwnd: int) -> int:
+        pid = self._wt.DWORD()
+        self._user32.GetWindowThreadProcessId(hwnd, self._ctypes.byref(pid))
+        return pid.value
+
+    def window_title(self, hwnd: int) -> str:
+        length = self._user32.GetWindowTextLengthW(hwnd) + 1
+        buf = self._ctypes.create_unicode_buffer(length)
+        self._user32.GetWindowTextW(hwnd, buf, length)
+        return buf.value or ""
+
+    def process_name(self, pid: int) -> str:
+        try:
+            return (self._psutil.Process(pid).name() or "").lower()
+        except Exception:
+            return ""
+
+    def process_started(self, pid: int) -> float:
+        try:
+            return self._psutil.Process(pid).create_time()
+        except Exception:
+            return 0.0
+
+class StaticForegroundBackend(ForegroundBackend):
+    """Reports a fixed window; used on non-Windows hosts and in headless runs."""
+
+    def __init__(self, process_name: str = "", title: str = "", hwnd: int = 0, pid: int = 0):
+        self.hwnd = hwnd
+        self.pid = pid
+        self.name = process_name
+        self.title = title
+        self.started = 0.0
+        self.calls = 0
+
+    def foreground_window(self) -> int:
+        self.calls += 1
+        return self.hwnd
+
+    def window_pid(self, hwnd: int) -> int:
+        self.calls += 1
+        return self.pid
+
+    def window_title(self, hwnd: int) -> str:
+        self.calls += 1
+        return self.title
+
+    def process_name(self, pid: int) -> str:
+        self.calls += 1
+        return self.name
+
+    def process_started(self, pid: int) -> float:
+        self.calls += 1
+        return self.started
+
+class ProcessNames:
+    """PID -> lowercased process name, memoized per (PID, creation time).
+
+    Keying on the creation time too means a PID the OS handed to a new
+    process is looked up again instead of inheriting the old name (which
+    would e.g. let a blacklist decision stick to the wrong app).
+    """
+
+    MAX_PIDS = 256
+
+    def __init__(self, backend: ForegroundBackend):
+        self.backend = backend
+        self._names: Dict[Tuple[int, float], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def get(self, pid: int) -> str:
+        key = (pid, self.backend.process_started(pid))
+        name = self._names.get(key)
+        if name is None:
+            if len(self._names) >= self.MAX_PIDS:
+                self._names.clear()
+            name = self._names[key] = self.backend.process_name(pid)
+        return name
+
+class ForegroundCache:
+    """Foreground (process name, title) with a short TTL.
+
+    Within `ttl` seconds of the last refresh no OS call is made at all.
+    After that, one foreground-window query decides whether the cached
+    window is still in front; the title is re-read (it changes when a
+    browser switches to a login page) but the process is only resolved
+    when another window comes to the front, through a name memo keyed by
+    PID and creation time.
+
+    When a platform tracker is subscribed to foreground changes it calls
+    push() instead, and get() stops touching the OS until detach().
+    """
+
+    def __init__(self, backend: ForegroundBackend, ttl: float = 0.25):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._expires = 0.0
+        self._hwnd = 0
+        self._pid = 0
+        self._context: Tuple[str, str] = ("", "")
+        self._names = ProcessNames(backend)
+        self._pushed = False
+        self.hits = 0
+        self.misses = 0
+        self.events = 0
+
+    def get(self) -> Tuple[str, str]:
+        if self._pushed:
+            self.hits += 1
+            return self._context
+        now = time.monotonic()
+        if now < self._expires:
+            self.hits += 1
+            return self._context
+        with self._lock:
+            self.misses += 1
+            b = self.backend
+            hwnd = b.foreground_window()
+            if not hwnd:
+                self._hwnd, self._pid, self._context = 0, 0, ("", "")
+            else:
+                if hwnd == self._hwnd:
+                    name = self._context[0]  # same window, same process
+                else:
+                    self._pid = b.window_pid(hwnd)
+                    name = self._names.get(self._pid)
+                self._hwnd = hwnd
+                self._context = (name, b.window_title(hwnd))
+            self._expires = now + self.ttl
+            return self._context
+
+    def push(self, process_name: str, title: str):
+        """Foreground changed (from an event subscription); get() serves this until detach()."""
+        self._context = (process_name, title)
+        self._pushed = True
+        self.events += 1
+
+    def detach(self):
+        """Back to polling, e.g. after the tracker stopped."""
+        self._pushed = False
+        self._expires = 0.0
+        self._hwnd = 0  # the pushed context may belong to another window
+
+    def invalidate(self):
+        self._expires = 0.0
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "cached_pids": len(self._names),
+            "events": self.events,
+            "mode": "events" if self._pushed else "polling",
+        }
+
+def _default_backend() -> ForegroundBackend:
+    from .platforms import get_platform
+    return get_platform().foreground_backend()
+
+_cache = None
+
+def get_foreground_cache() -> ForegroundCache:
+    global _cache
+    if _cache is None:
+        _cache = ForegroundCache(_default_backend())
+    return _cache
+
+def get_foreground_context() -> Tuple[str, str]:
+    """(lowercased process name, window title) of the foreground window."""
+    return get_foreground_cache().get()
+
+def get_foreground_window_title() -> str:
+    return get_foreground_context()[1]
+
+def get_foreground_process_name() -> str:
+    return get_foreground_context()[0]
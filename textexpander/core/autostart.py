@@ -1,11 +1,19 @@
-import winreg
 from pathlib import Path
 import sys
+try:
+    import winreg
+except ImportError:  # not Windows: autostart is unsupported, everything else still imports
+    winreg = None
 
 RUN_KEY = r"Software\Microsoft\Windows\CurrentVersion\Run"
 APP_NAME = "TextExpanderPy"
 
+def autostart_supported() -> bool:
+    return winreg is not None
+
 def get_autostart_enabled() -> bool:
+    if winreg is None:
+        return False
     try:
         with winreg.OpenKey(winreg.HKEY_CURRENT_USER, RUN_KEY, 0, winreg.KEY_READ) as k:
             val, _ = winreg.QueryValueEx(k, APP_NAME)
@@ -16,9 +24,12 @@ def get_autostart_enabled() -> bool:
         return False
 
 def set_autostart_enabled(enable: bool):
+    if winreg is None:
+        return
     exe = sys.executable
     script = Path(sys.argv[0]).resolve()
-    cmd = f'"{exe}" "{script}"'
+    # straight to the tray at login
+    cmd = f'"{exe}" "{script}" --start-minimized'
     try:
         with winreg.OpenKey(winreg.HKEY_CURRENT_USER, RUN_KEY, 0, winreg.KEY_SET_VALUE) as k:
             if enable:
@@ -0,0 +1,224 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import struct
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+from .config import BACKUPS_DIR
+from .storage import write_json_atomic
+
+# Retention, per backed-up file: the newest KEEP_LAST saves, plus the newest save
+# in each of the most recent N hours / days / ISO weeks (local time) that have one.
+KEEP_LAST = 10
+RETENTION = (("%Y-%m-%d %H", 24), ("%Y-%m-%d", 14), ("%G-W%V", 8))
+
+INDEX_FILE = "index.json"
+OBJECTS_DIR = "objects"
+LEGACY_NAME = re.compile(r"^(?P<name>.+)_(?P<ts>\d{8}_\d{6})\.json$")  # plain copies written before the store
+RECOVERED_NAME = "snippets"  # objects don't record their file; the snippets file is the one backed up
+
+@dataclass(frozen=True)
+class BackupEntry:
+    id: str
+    name: str      # stem of the backed-up file, e.g. "snippets"
+    time: float    # when it was replaced, epoch seconds
+    digest: str    # sha256 of the file's bytes; names the stored object
+    size: int      # bytes before compression
+
+    @property
+    def saved_at(self) -> datetime:
+        return datetime.fromtimestamp(self.time)
+
+@dataclass(frozen=True)
+class BackupDiff:
+    """Triggers that differ going from `old` to `new`."""
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+
+    def summary(self) -> str:
+        parts = [f"{len(v)} {label}" for v, label in
+                 ((self.added, "added"), (self.removed, "removed"), (self.changed, "changed")) if v]
+        return ", ".join(parts) or "no changes"
+
+def diff_snippets(old: Mapping[str, str], new: Mapping[str, str]) -> BackupDiff:
+    added = sorted(k for k in new if k not in old)
+    removed = sorted(k for k in old if k not in new)
+    changed = sorted(k for k, v in new.items() if k in old and old[k] != v)
+    return BackupDiff(added, removed, changed)
+
+class BackupStore:
+    """Content-addressed, gzip-compressed file versions with bounded retention.
+
+    Each distinct file content is stored once, as objects/<sha256>.gz;
+    the index lists which version of which file was replaced when, so
+    identical saves cost nothing and listing never opens an object. A
+    save identical to the newest backup of the same file adds no entry.
+    After every add, retention prunes old entries and deletes objects no
+    entry refers to any more, which keeps the directory bounded however
+    often the user saves.
+    """
+
+    def __init__(self, root: Path = BACKUPS_DIR):
+        self.root = Path(root)
+        self._objects = self.root / OBJECTS_DIR
+        self._index_path = self.root / INDEX_FILE
+        self._lock = threading.Lock()
+        self._objects.mkdir(parents=True, exist_ok=True)
+        self._entries: List[BackupEntry] = self._load_index()
+
+    # ---- Index
+    def _load_index(self) -> List[BackupEntry]:
+        if not self._index_path.exists():
+            return []
+        try:
+            raw = json.loads(self._index_path.read_text(encoding="utf-8"))
+            return [BackupEntry(**e) for e in raw]
+        except (ValueError, TypeError):
+            # unreadable index: the backups themselves are fine, list them again from the objects
+            entries = self._recover()
+            self._entries = entries
+            self._write_index()
+            return entries
+
+    def _recover(self) -> List[BackupEntry]:
+        """One entry per stored object, dated by its mtime."""
+        entries = []
+        for obj in self._objects.glob("*.gz"):
+            try:
+                st = obj.stat()
+                with open(obj, "rb") as f:
+                    f.seek(-4, os.SEEK_END)
+                    size = struct.unpack("<I", f.read(4))[0]  # gzip trailer: length mod 2**32
+            except (OSError, struct.error):
+                continue
+            ms = int(st.st_mtime * 1000)
+            entries.append(BackupEntry(f"{RECOVERED_NAME}-{ms}-{obj.name[:8]}", RECOVERED_NAME,
+                                       st.st_mtime, obj.name[:-3], size))
+        entries.sort(key=lambda e: e.time)
+        return entries
+
+    def _write_index(self):
+        write_json_atomic(self._index_path, [asdict(e) for e in self._entries])
+
+    def _object_path(self, digest: str) -> Path:
+        return self._objects / f"{digest}.gz"
+
+    # ---- Adding and pruning
+    def add_file(self, path: Path, when: Optional[float] = None) -> Optional[BackupEntry]:
+        """Back up the current contents of `path` (typically right before it is overwritten)."""
+        return self.add_bytes(path.stem, path.read_bytes(), when)
+
+    def add_bytes(self, name: str, content: bytes, when: Optional[float] = None) -> Optional[BackupEntry]:
+        """Store one version of `name`; None if it matches the newest backup already."""
+        digest = hashlib.sha256(content).hexdigest()
+        when = time.time() if when is None else when
+        with self._lock:
+            latest = next((e for e in reversed(self._entries) if e.name == name), None)
+            if latest is not None and latest.digest == digest:
+                return None
+            obj = self._object_path(digest)
+            if not obj.exists():
+                tmp = obj.with_name(obj.name + ".tmp")
+                # mtime=0: the same content always compresses to the same bytes
+                tmp.write_bytes(gzip.compress(content, compresslevel=6, mtime=0))
+                os.replace(tmp, obj)
+            ms = int(when * 1000)
+            taken = {e.id for e in self._entries}
+            while f"{name}-{ms}" in taken:
+                ms += 1
+            entry = BackupEntry(f"{name}-{ms}", name, when, digest, len(content))
+            self._entries.append(entry)
+            self._entries.sort(key=lambda e: e.time)
+            self._prune(name)
+            self._write_index()
+            return entry
+
+    def _prune(self, name: str):
+        mine = [e for e in self._entries if e.name == name]
+        keep = _retained(mine)
+        dropped = [e for e in mine if e.id not in keep]
+        if not dropped:
+            return
+        self._entries = [e for e in self._entries if e.name != name or e.id in keep]
+        referenced = {e.digest for e in self._entries}
+        for digest in {e.digest for e in dropped} - referenced:
+            try:
+                self._object_path(digest).unlink()
+            except FileNotFoundError:
+                pass
+
+    # ---- Reading
+    def list(self, name: Optional[str] = None) -> List[BackupEntry]:
+        """Newest first; reads nothing but the in-memory index."""
+        with self._lock:
+            entries = [e for e in self._entries if name is None or e.name == name]
+        entries.reverse()
+        return entries
+
+    def get(self, entry_id: str) -> BackupEntry:
+        with self._lock:
+            for e in self._entries:
+                if e.id == entry_id:
+                    return e
+        raise KeyError(entry_id)
+
+    def read_bytes(self, entry_id: str) -> bytes:
+        return gzip.decompress(self._object_path(self.get(entry_id).digest).read_bytes())
+
+    def read(self, entry_id: str) -> Dict[str, str]:
+        """The backed-up snippets, ready to load back into a repository."""
+        return json.loads(self.read_bytes(entry_id).decode("utf-8"))
+
+    def disk_usage(self) -> int:
+        return sum(obj.stat().st_size for obj in self._objects.glob("*.gz"))
+
+    # ---- Plain copies from before the store
+    def migrate_legacy(self) -> int:
+        """Fold old timestamped copies in BACKUPS_DIR into the store, then delete them."""
+        found = []
+        for path in self.root.glob("*.json"):
+            m = LEGACY_NAME.match(path.name)
+            if m is None:
+                continue
+            try:
+                when = datetime.strptime(m.group("ts"), "%Y%m%d_%H%M%S").timestamp()
+            except ValueError:
+                continue
+            found.append((when, m.group("name"), path))
+        for when, name, path in sorted(found):
+            self.add_bytes(name, path.read_bytes(), when)
+            path.unlink()
+        return len(found)
+
+def _retained(entries: Iterable[BackupEntry]) -> Set[str]:
+    newest_first = sorted(entries, key=lambda e: e.time, reverse=True)
+    keep = {e.id for e in newest_first[:KEEP_LAST]}
+    for fmt, count in RETENTION:
+        buckets: Set[str] = set()
+        for e in newest_first:
+            bucket = e.saved_at.strftime(fmt)
+            if bucket in buckets:
+                continue
+            if len(buckets) >= count:
+                break
+            buckets.add(bucket)
+            keep.add(e.id)
+    return keep
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_backup_store() -> BackupStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BackupStore()
+            _store.migrate_legacy()
+        return _store
@@ -1,17 +1,178 @@
-from contextlib import contextmanager
-import pyperclip
-
-@contextmanager
-def preserve_clipboard():
-    try:
-        original = pyperclip.paste()
-    except Exception:
-        original = None
-    try:
-        yield
-    finally:
-        if original is not None:
+import sys
+import time
+import threading
+import zlib
+from typing import Dict, Optional
+
+class ClipboardBackend:
+    """Text clipboard access; `sequence()` returns None when the OS has no change counter."""
+
+    def paste(self) -> str:
+        raise NotImplementedError
+
+    def copy(self, text: str):
+        raise NotImplementedError
+
+    def sequence(self) -> Optional[int]:
+        return None
+
+class PyperclipBackend(ClipboardBackend):
+    def __init__(self):
+        import pyperclip
+        self._pc = pyperclip
+        self._seq = None
+        if sys.platform == "win32":
+            import ctypes
+            self._seq = ctypes.windll.user32.GetClipboardSequenceNumber
+
+    def paste(self) -> str:
+        return self._pc.paste()
+
+    def copy(self, text: str):
+        self._pc.copy(text)
+
+    def sequence(self) -> Optional[int]:
+        return self._seq() if self._seq else None
+
+class MemoryClipboardBackend(ClipboardBackend):
+    """In-process clipboard with a change counter; for headless runs."""
+
+    def __init__(self, text: str = ""):
+        self.text = text
+        self.seq = 0
+
+    def paste(self) -> str:
+        return self.text
+
+    def copy(self, text: str):
+        self.text = text
+        self.seq += 1
+
+    def sequence(self) -> Optional[int]:
+        return self.seq
+
+class ClipboardGuard:
+    """Keeps the user's clipboard intact across expansions, lazily.
+
+    save() skips reading the clipboard when it provably still holds what
+    we saved last time (unchanged sequence number since our own restore,
+    or a restore that hasn't run yet and whose paste is still on the
+    clipboard). The restore runs on a timer thread
+    after `restore_delay` so the target app can consume the paste first,
+    and it gives up if the user copied something new in the meantime.
+    """
+
+    def __init__(self, backend: Optional[ClipboardBackend] = None, restore_delay: float = 0.3):
+        self.backend = backend or PyperclipBackend()
+        self.restore_delay = restore_delay
+        self._lock = threading.Lock()
+        self._saved: Optional[str] = None
+        self._saved_seq: Optional[int] = None     # sequence right after saving/restoring the user's text
+        self._written_seq: Optional[int] = None   # sequence right after our own copy()
+        self._written_crc: Optional[int] = None
+        self._timer: Optional[threading.Timer] = None
+        self._counters: Dict[str, float] = {
+            "saves": 0, "skipped_saves": 0, "restores": 0, "abandoned_restores": 0,
+            "save_ms": 0.0, "restore_ms": 0.0,
+        }
+
+    def save(self):
+        with self._lock:
+            seq = self.backend.sequence()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+                # the last restore hasn't happened yet: _saved is still the user's text, unless
+                # they copied something over our paste meanwhile, which then is theirs to keep
+                if self._saved is not None and self._still_ours_quietly():
+                    self._counters["skipped_saves"] += 1
+                    return
+            elif seq is not None and seq == self._saved_seq and self._saved is not None:
+                self._counters["skipped_saves"] += 1
+                return
+            started = time.perf_counter()
             try:
-                pyperclip.copy(original)
+                self._saved = self.backend.paste()
             except Exception:
-                pass
\ No newline at end of file
+                self._saved = None
+            self._saved_seq = seq
+            self._counters["saves"] += 1
+            self._counters["save_ms"] += (time.perf_counter() - started) * 1000.0
+
+    def user_text(self) -> str:
+        """The user's clipboard text, even while our pasted text is still on it."""
+        with self._lock:
+            if self._timer is not None and self._saved is not None:
+                return self._saved
+            return self.backend.paste()
+
+    def copy(self, text: str):
+        with self._lock:
+            self.backend.copy(text)
+            self._written_seq = self.backend.sequence()
+            self._written_crc = zlib.crc32(text.encode("utf-8"))
+
+    def schedule_restore(self, delay: Optional[float] = None):
+        delay = self.restore_delay if delay is None else delay
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            if delay <= 0:
+                self._timer = None
+                self._restore_locked()
+                return
+            self._timer = threading.Timer(delay, self._restore_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Run a pending restore now (e.g. on shutdown)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+                self._restore_locked()
+
+    def _restore_from_timer(self):
+        with self._lock:
+            if self._timer is None or threading.current_thread() is not self._timer:
+                return  # cancelled and superseded
+            self._timer = None
+            self._restore_locked()
+
+    def _restore_locked(self):
+        if self._saved is None:
+            return
+        started = time.perf_counter()
+        try:
+            if not self._still_ours():
+                # the user copied something after our paste; theirs wins
+                self._saved = None
+                self._saved_seq = None
+                self._counters["abandoned_restores"] += 1
+                return
+            self.backend.copy(self._saved)
+            self._saved_seq = self.backend.sequence()
+            self._counters["restores"] += 1
+        except Exception:
+            pass
+        finally:
+            self._counters["restore_ms"] += (time.perf_counter() - started) * 1000.0
+
+    def _still_ours(self) -> bool:
+        seq = self.backend.sequence()
+        if seq is not None:
+            return seq == self._written_seq
+        return zlib.crc32(self.backend.paste().encode("utf-8")) == self._written_crc
+
+    def _still_ours_quietly(self) -> bool:
+        try:
+            return self._still_ours()
+        except Exception:
+            return False
+
+    def stats(self) -> Dict[str, float]:
+        c = dict(self._counters)
+        avg_save = c["save_ms"] / c["saves"] if c["saves"] else 0.0
+        c["saved_ms_estimate"] = avg_save * c["skipped_saves"]
+        return c
@@ -0,0 +1,137 @@
+import math
+import time
+from itertools import chain
+from typing import Dict, List, Optional
+
+from .matcher import TriggerTrie
+
+DEFAULT_K = 8
+HALF_LIFE_DAYS = 14.0
+_RATE = math.log(2) / (HALF_LIFE_DAYS * 86400)
+
+class Frecency:
+    """Usage scores that combine how often and how recently a trigger was used.
+
+    Every use adds exp(rate * t) to the trigger's score, kept in log space.
+    Older uses thereby count for less without ever rescoring anything, and
+    scores taken at different times stay comparable.
+    """
+
+    def __init__(self, scores: Optional[Dict[str, float]] = None):
+        self.scores: Dict[str, float] = dict(scores or {})
+
+    def bump(self, trigger: str, when: Optional[float] = None) -> float:
+        x = _RATE * (time.time() if when is None else when)
+        old = self.scores.get(trigger)
+        new = x if old is None else max(old, x) + math.log1p(math.exp(-abs(old - x)))
+        self.scores[trigger] = new
+        return new
+
+    def get(self, trigger: str) -> float:
+        return self.scores.get(trigger, -math.inf)
+
+class CompletionIndex:
+    """Top-k completions for every node of a TriggerTrie.
+
+    Lists are computed once, bottom-up, when the index is built; a node
+    with a single child and no trigger of its own shares its child's list,
+    which keeps long trigger tails from costing a list each. A query is an
+    index into `top`. record_use() re-ranks only the nodes on the used
+    trigger's path, and swaps in new lists rather than mutating old ones,
+    so readers on other threads never see a half-sorted list.
+    """
+
+    def __init__(self, trie: TriggerTrie, frecency: Optional[Frecency] = None, k: int = DEFAULT_K):
+        self.trie = trie
+        self.frecency = frecency or Frecency()
+        self.k = k
+        self.top: List[List[str]] = self._build()
+
+    def _rank(self, trigger: str):
+        return (-self.frecency.get(trigger), len(trigger), trigger)
+
+    def _build(self) -> List[List[str]]:
+        trie = self.trie
+        first, terminal, triggers = trie.first, trie.terminal, trie.triggers
+        # rank every trigger once; nodes then merge small sorted int lists
+        order = sorted({triggers[t] for t in terminal if t >= 0}, key=self._rank)
+        pos = {t: i for i, t in enumerate(order)}
+        k = self.k
+        ranks: List[List[int]] = [[]] * len(trie)
+        # child ids are always larger than their parent's, so a reverse sweep is bottom-up
+        for node in range(len(trie) - 1, -1, -1):
+            lo, hi = first[node], first[node + 1]
+            own = terminal[node]
+            if own < 0 and hi - lo == 1:
+                ranks[node] = ranks[lo]
+                continue
+            merged = sorted(chain((pos[triggers[own]],) if own >= 0 else (), *(ranks[c] for c in range(lo, hi))))
+            if not self.trie.require_prefix:
+                merged = sorted(set(merged))  # a trigger can sit under both its keys
+            ranks[node] = merged[:k]
+        # materialize each distinct list once so shared tails stay shared
+        lists: Dict[int, List[str]] = {}
+        top: List[List[str]] = []
+        for r in ranks:
+            lst = lists.get(id(r))
+            if lst is None:
+                lst = lists[id(r)] = [order[i] for i in r]
+            top.append(lst)
+        return top
+
+    # ---- Queries
+    def complete(self, node: int, limit: Optional[int] = None) -> List[str]:
+        """Best triggers below a trie node (e.g. TriggerMatcher.node)."""
+        top = self.top[node]
+        return top[:limit] if limit is not None else list(top)
+
+    def suggest(self, typed: str, limit: Optional[int] = None) -> List[str]:
+        """Best triggers for a partially typed trigger, prefix included (e.g. "/si")."""
+        node = 0
+        step = self.trie.step
+        for ch in typed:
+            node = step(node, ch)
+            if node is None:
+                return []
+        return self.complete(node, limit)
+
+    # ---- Updates
+    def record_use(self, trigger: str, when: Optional[float] = None):
+        self.frecency.bump(trigger, when)
+        self.rerank(trigger)
+
+    def rerank(self, trigger: str):
+        """Refresh the lists on `trigger`'s path after its frecency score went up."""
+        keys = [self.trie.prefix + trigger]
+        if not self.trie.require_prefix:
+            keys.append(trigger)
+        replaced: Dict[int, tuple] = {}  # id(old list) -> (old, new); holding old keeps ids unique
+        step = self.trie.step
+        path = [0]  # the root's list too: suggest("") completes from it
+        for key in keys:
+            node = 0
+            for ch in key:
+                node = step(node, ch)
+                if node is None:
+                    break
+                path.append(node)
+        for node in path:
+            old = self.top[node]
+            hit = replaced.get(id(old))
+            if hit is None:
+                hit = replaced[id(old)] = (old, self._reranked(old, trigger))
+            new = hit[1]
+            if new is not old:
+                self.top[node] = new
+
+    def _reranked(self, old: List[str], trigger: str) -> List[str]:
+        # scores only grow, so the trigger can enter a list but never push itself out
+        if trigger in old:
+            cands = old
+        elif len(old) < self.k:
+            cands = old + [trigger]
+        elif self._rank(trigger) < self._rank(old[-1]):
+            cands = old[:-1] + [trigger]
+        else:
+            return old
+        return sorted(cands, key=self._rank)
@@ -7,7 +7,11 @@ APP_DATA_DIR = Path(os.environ.get("APPDATA", str(Path.home()))) / APP_NAME
 APP_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 SNIPPETS_FILE = APP_DATA_DIR / "snippets.json"
+SNIPPETS_JOURNAL = APP_DATA_DIR / "snippets.journal"
+SNIPPETS_DB = APP_DATA_DIR / "snippets.db"  # used with the "sqlite" storage backend
+CACHE_DIR = APP_DATA_DIR / "cache"  # packed snippet libraries; safe to delete
 SETTINGS_FILE = APP_DATA_DIR / "settings.json"
+USAGE_FILE = APP_DATA_DIR / "usage.json"
 BACKUPS_DIR = APP_DATA_DIR / "backups"
 BACKUPS_DIR.mkdir(exist_ok=True)
 
@@ -1,196 +1,527 @@
+import copy
 import time
+import queue
+from collections import Counter
+from time import perf_counter_ns
 import threading
-import keyboard  # global hooks
-import pyperclip
-from typing import Optional
+from pathlib import Path
+from dataclasses import fields, replace
+from typing import Callable, List, Optional
+from .config import SETTINGS_FILE, SNIPPETS_FILE, SNIPPETS_JOURNAL, SNIPPETS_DB
 from .settings import Settings
 from .snippets import SnippetRepository
-from .clipboard import preserve_clipboard
-from .app_detector import get_foreground_process_name, get_foreground_window_title
+from .snapshot import EngineSnapshot
+from .library import LayeredLibrary, load_layers
+from .policy import AppPolicy
+from .watcher import FileWatcher
+from .persistence import get_persistence
+from .clipboard import ClipboardGuard
+from .matcher import TriggerMatcher
+from .injector import InjectionPlan, OutputBackend
+from .strategy import ExpansionStrategy, PASTE
+from .usage import UsageStore
+from .metrics import StartupTimer, Metrics, HOOK, POLICY, LOOKUP, QUEUE_WAIT, CLIPBOARD, INJECT, EXPAND
+from .app_detector import ForegroundCache, get_foreground_cache
+from .platforms import ForegroundTracker, KeyboardInput, Platform, get_platform
+
+EXPANSION_QUEUE_SIZE = 64
+COMPLETION_LIMIT = 5
+COMPLETION_MIN_CHARS = 2       # typed chars, prefix included, before suggestions show
+COMPLETION_BUDGET_NS = 200_000  # suggestions that take longer than this are dropped
+MODIFIER_KEYS = frozenset({
+    'shift', 'right shift', 'left shift', 'ctrl', 'right ctrl', 'left ctrl',
+    'alt', 'right alt', 'left alt', 'alt gr', 'windows', 'left windows', 'right windows',
+})
 
 class ExpanderEngine:
-    def __init__(self, settings: Settings, repository: SnippetRepository, logger=None):
-        self.settings = settings
-        self.repo = repository
+    def __init__(self, settings: Settings, repository: SnippetRepository, logger=None,
+                 output: Optional[OutputBackend] = None, clipboard: Optional[ClipboardGuard] = None,
+                 foreground: Optional[ForegroundCache] = None, usage: Optional[UsageStore] = None,
+                 startup: Optional[StartupTimer] = None, platform: Optional[Platform] = None):
+        # Objects shared with the UI/tray: kept in sync on reload, never read by the hook
+        self._shared_settings = settings
+        self._shared_repo = repository
         self.logger = logger
-        self._buffer = ""  # chars since last boundary
-        self._lock = threading.Lock()
+        # OS services not passed in come from the platform (user32 on Windows, X11 on Linux, or fakes)
+        self.platform = platform or get_platform()
+        self.output = output or self.platform.output()
+        self.strategy = ExpansionStrategy()
+        self.clipboard = clipboard or ClipboardGuard(self.platform.clipboard())
+        if foreground is None:
+            foreground = (get_foreground_cache() if platform is None
+                          else ForegroundCache(self.platform.foreground_backend()))
+        self.foreground = foreground
+        self._tracker: Optional[ForegroundTracker] = None
+        self._keyboard: Optional[KeyboardInput] = None
+        self.metrics = Metrics(enabled=settings.metrics_enabled)
+        self.startup = startup or StartupTimer()
+        # Usage counts and the frecency ranking completions use; survive reloads
+        self.usage = usage or UsageStore()
+        self.frecency = self.usage.frecency
+        # Called on the hook thread with the current suggestions; must only hand them off
+        self.completion_listener: Optional[Callable[[List[str]], None]] = None
+        self._suggestions: List[str] = []
+        # The hook reads only this; reloads build a new snapshot and swap the reference
+        self._snapshot = EngineSnapshot.build(copy.deepcopy(settings), repository.detached(),
+                                              frecency=self.frecency, layers=load_layers(settings.libraries))
+        self._matcher = TriggerMatcher(self._snapshot.trie)
+        self._last_decision = None  # policy decision last logged
+        self._report_policy_errors(self._snapshot.policy)
+        self._lock = threading.Lock()  # serializes snapshot publishers, never taken by the hook
+        self._watcher: Optional[FileWatcher] = None
+        self._library_watcher: Optional[FileWatcher] = None
         self._running = True
+        # Hook -> worker handoff; the hook thread never blocks on injection
+        self._jobs: "queue.Queue" = queue.Queue(maxsize=EXPANSION_QUEUE_SIZE)
+        self._outstanding = 0  # jobs queued or running
+        self._outstanding_lock = threading.Lock()
+        self._injecting = threading.Event()
+        self._echoes: Counter = Counter()  # key names our own output is still expected to produce
+        self._worker: Optional[threading.Thread] = None
+        self.startup.mark("engine_ready")
+
+    @property
+    def settings(self) -> Settings:
+        return self._snapshot.settings
+
+    @property
+    def repo(self) -> SnippetRepository:
+        return self._snapshot.repo
+
+    @property
+    def library(self) -> LayeredLibrary:
+        """Shared libraries plus the personal snippets, as the engine resolves them."""
+        return self._snapshot.library
 
     # ---- Public controls
     def run(self):
+        keyboard = self._keyboard = self.platform.keyboard()
+        self.start_worker()
+
+        # Blocking hook: lets us swallow Tab (expand_on_tab) and keys typed while an expansion is pending.
+        # Installed first so expansion works as early as possible; the rest can follow.
+        keyboard.hook(self._on_key_event, suppress=True)
+        self.startup.mark("hook_live")
+
+        # Foreground changes are pushed in from OS events; without a tracker the cache polls per key
+        self.start_foreground_tracking()
+
+        # Hot reload: settings/snippet edits from the manager window or any editor
+        wal = SNIPPETS_DB.with_name(SNIPPETS_DB.name + "-wal")
+        self._watcher = FileWatcher([SETTINGS_FILE, SNIPPETS_FILE, SNIPPETS_JOURNAL, SNIPPETS_DB, wal],
+                                    self.reload_all, logger=self.logger, own_callback=self.publish_shared)
+        self._watcher.start()
+        # Shared libraries (often on a network share) reload on their own, one layer at a time
+        self._library_watcher = FileWatcher(self._library_paths(), self.reload_libraries, logger=self.logger)
+        self._library_watcher.start()
+
         # Hotkeys
         keyboard.add_hotkey('ctrl+alt+e', self.toggle_enabled)
         keyboard.add_hotkey('ctrl+alt+r', self.reload_all)  # Changed to reload both
         keyboard.add_hotkey('ctrl+alt+z', lambda: keyboard.send('ctrl+z'))  # undo
 
-        # Optional: Expand on Tab (suppressed)
-        if self.settings.expand_on_tab:
-            keyboard.add_hotkey('tab', self._on_tab, suppress=True)
-
-        keyboard.hook(self._on_key_event)
         if self.logger and self.settings.logging_enabled:
-            self.logger.info("Expander started")
+            self.logger.info("Expander started (%s)", self.startup.report())
         try:
             while self._running:
                 time.sleep(0.2)
         except KeyboardInterrupt:
             pass
 
+    def start_foreground_tracking(self) -> bool:
+        """Subscribe to foreground changes instead of asking the OS on every key."""
+        if self._tracker is None:
+            tracker = self.platform.foreground_tracker()
+            try:
+                started = tracker is not None and tracker.start(self.foreground.push)
+            except Exception as e:
+                started = False
+                if self.logger:
+                    self.logger.warning("Foreground events unavailable, polling instead: %s", e)
+            if started:
+                self._tracker = tracker
+        return self._tracker is not None
+
+    def start_worker(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._expansion_worker, daemon=True)
+            self._worker.start()
+
+    def wait_idle(self):
+        """Block until every queued expansion/replay job has been emitted."""
+        self._jobs.join()
+
     def stop(self):
         self._running = False
+        for w in (self._watcher, self._library_watcher):
+            if w:
+                w.stop()
+        if self._tracker is not None:
+            self._tracker.stop()
+            self._tracker = None
+            self.foreground.detach()
+        if self._keyboard is not None:
+            self._keyboard.unhook_all()
+        self.clipboard.flush()
+        try:
+            self._jobs.put_nowait(None)
+        except queue.Full:
+            pass
 
     def toggle_enabled(self):
-        self.settings.enabled = not self.settings.enabled
-        self.settings.save()
+        with self._lock:
+            snap = self._snapshot
+            fresh = replace(snap.settings, enabled=not snap.settings.enabled)
+            self._publish(replace(snap, version=snap.version + 1, settings=fresh))
+            self._shared_settings.enabled = fresh.enabled
+        fresh.save()
         if self.logger and self.settings.logging_enabled:
-            self.logger.info(f"enabled={self.settings.enabled}")
+            self.logger.info("enabled=%s", self.settings.enabled)
 
     def reload_all(self):
         """Reload both snippets and settings from disk"""
+        # Saves still queued on the writer are newer than the files; land them before reading
+        writer = get_persistence()
+        writer.flush()
+        # A half-written or hand-broken settings file keeps the current settings; never rewrite it
+        try:
+            settings: Optional[Settings] = Settings.read()
+        except (OSError, ValueError) as e:
+            settings = None
+            if self.logger:
+                self.logger.warning("Keeping current settings, %s is unreadable: %s", SETTINGS_FILE.name, e)
         with self._lock:
-            # Reload settings from disk
-            fresh_settings = Settings.load()
-            self.settings.enabled = fresh_settings.enabled
-            self.settings.expand_on_tab = fresh_settings.expand_on_tab
-            self.settings.trigger_prefix = fresh_settings.trigger_prefix
-            self.settings.blacklist_process_names = fresh_settings.blacklist_process_names
-            self.settings.per_app_overrides = fresh_settings.per_app_overrides
-            self.settings.logging_enabled = fresh_settings.logging_enabled
-            
-            # Reload snippets from disk
-            fresh_repo = SnippetRepository.load_or_create()
-            self.repo.set_all(fresh_repo.all())
-            
+            # Parse and compile off the hook thread, then swap in one assignment
+            # same backend as the UI's repository, whatever the settings file says now
+            snap = EngineSnapshot.load(self._snapshot.version + 1, self.frecency, self._shared_repo.backend,
+                                       previous=self._snapshot, settings=settings or self._snapshot.settings)
+            self._publish(snap)
+
+            # Keep the UI's objects in step with disk, unless the UI saved again meanwhile:
+            # then its object is newer than the file, and its write triggers another reload
+            if settings is not None and not writer.pending(str(SETTINGS_FILE)):
+                for f in fields(Settings):
+                    setattr(self._shared_settings, f.name, copy.deepcopy(getattr(snap.settings, f.name)))
+            self._shared_repo.sync_from(snap.repo)
+            self._prune_usage(snap.library)
+
+        if self.logger and self.settings.logging_enabled:
+            self.logger.info("Settings and snippets reloaded from disk (v%s)", snap.version)
+
+    def publish_shared(self):
+        """Rebuild the snapshot from the UI's settings and snippets, without reading the files.
+
+        For saves made by this process: the shared objects are what was just
+        written, so there is nothing to parse and nothing to sync back.
+        """
+        with self._lock:
+            snap = self._snapshot
+            settings = copy.deepcopy(self._shared_settings)
+            layers = load_layers(settings.libraries, snap.library.layers[:-1])
+            snap = EngineSnapshot.build(settings, self._shared_repo.detached(), snap.version + 1,
+                                        self.frecency, layers, snap)
+            self._publish(snap, personal_seen=False)  # an outside edit may have landed meanwhile
+        if self.logger and self.settings.logging_enabled:
+            self.logger.info("Settings and snippets updated from the manager (v%s)", snap.version)
+
+    def reload_libraries(self):
+        """Re-read the shared library files that changed on disk; the rest of the snapshot is reused."""
+        with self._lock:
+            snap = self._snapshot
+            old = snap.library.layers[:-1]
+            layers = load_layers(snap.settings.libraries, old)
+            if len(layers) == len(old) and all(a is b for a, b in zip(layers, old)):
+                return
+            snap = EngineSnapshot.build(snap.settings, snap.repo, snap.version + 1, self.frecency, layers, snap)
+            self._publish(snap, personal_seen=False)  # settings/snippet files may have changed meanwhile
+            self._prune_usage(snap.library)
         if self.logger and self.settings.logging_enabled:
-            self.logger.info("Settings and snippets reloaded from disk")
+            changed = [layer.name for layer in layers if layer not in old]
+            self.logger.info("Libraries reloaded from disk (v%s): %s", snap.version, ", ".join(changed))
+
+    def _prune_usage(self, library: LayeredLibrary):
+        # an unreadable library (say, an offline share) is empty for now, not emptied: keep its history
+        if not any(layer.error for layer in library.layers):
+            self.usage.prune(library.triggers())
+
+    def _library_paths(self) -> List[Path]:
+        return [layer.path for layer in self._snapshot.library.layers if layer.path is not None]
 
     def reload_snippets(self):
         """Alias for backward compatibility"""
         self.reload_all()
 
-    # ---- Core hook handlers
-    def _on_key_event(self, event):
-        if not self.settings.enabled or event.event_type != 'down':
-            return
+    def _publish(self, snap: EngineSnapshot, personal_seen: bool = True):
+        old, self._snapshot = self._snapshot, snap
+        if snap.policy is not old.policy:
+            self._report_policy_errors(snap.policy)
+        self.metrics.enabled = snap.settings.metrics_enabled
+        if self._watcher and personal_seen:
+            self._watcher.mark_seen()
+        if self._library_watcher:
+            paths = self._library_paths()
+            if paths != self._library_watcher.paths:
+                self._library_watcher.set_paths(paths)
 
-        # Respect per-app settings / blacklists
-        if not self._allowed_in_foreground_app():
-            self._buffer = ""
-            return
+    def diagnostics(self) -> dict:
+        """Everything the Diagnostics tab shows / exports, as plain JSON-able data."""
+        report = self.metrics.snapshot()
+        report["foreground_cache"] = self.foreground.stats()
+        report["clipboard"] = self.clipboard.stats()
+        report["strategy"] = self.strategy.stats()
+        report["snapshot_version"] = self._snapshot.version
+        report["startup_ms"] = dict(self.startup.marks)
+        report["libraries"] = self._snapshot.library.describe()
+        return report
 
-        name = event.name
+    def suggest(self, typed: str, limit: int = COMPLETION_LIMIT) -> List[str]:
+        """Ranked triggers completing `typed` (prefix included), e.g. suggest("/si")."""
+        idx = self._snapshot.completions
+        return idx.suggest(typed, limit) if idx else []
 
-        # boundaries -> attempt expansion then reset
+    # ---- Trigger matching
+    def _current_matcher(self) -> TriggerMatcher:
+        # A new snapshot brings a new trie; typing state restarts with it
+        m = self._matcher
+        trie = self._snapshot.trie
+        if m.trie is not trie:
+            m = self._matcher = TriggerMatcher(trie)
+        return m
+
+    # ---- Core hook handler
+    # Runs inside the global keyboard hook: it only updates matcher state and
+    # queues work for the expansion worker. Returns False to swallow the event.
+    def _on_key_event(self, event) -> bool:
+        m = self.metrics
+        if not m.enabled:
+            return self._handle_key_event(event)
+        t0 = perf_counter_ns()
+        try:
+            return self._handle_key_event(event)
+        finally:
+            m.observe(HOOK, perf_counter_ns() - t0)
+
+    def _handle_key_event(self, event) -> bool:
+        if self._injecting.is_set():
+            # Our own output comes back through the hook: let exactly that through.
+            # Anything else is the user typing over the injection: held and replayed below.
+            # (A user key named like a pending echo passes in its place; both type the same.)
+            if event.event_type != 'down' or event.name in MODIFIER_KEYS:
+                return True
+            echoes = self._echoes
+            name = (event.name or "").lower()
+            n = echoes.get(name)
+            if n:
+                echoes[name] = n - 1
+                return True
+
+        if not self.settings.enabled:
+            return True
+
+        if self._outstanding:
+            # An expansion is queued but not yet typed out: hold user keys and
+            # replay them after it, so they cannot land in the middle of it.
+            if event.event_type != 'down' or event.name in MODIFIER_KEYS:
+                return True
+            if not self._on_key_down(event.name):
+                return False  # started another expansion, which re-emits the key itself
+            return not self._dispatch(("replay", event.name, perf_counter_ns()))
+
+        if event.event_type != 'down':
+            return True
+        return self._on_key_down(event.name)
+
+    def _on_key_down(self, name: str) -> bool:
+        matcher = self._current_matcher()
+
+        # Respect per-app settings / blacklists
+        m = self.metrics
+        if m.enabled:
+            t0 = perf_counter_ns()
+            allowed = self._allowed_in_foreground_app()
+            m.observe(POLICY, perf_counter_ns() - t0)
+        else:
+            allowed = self._allowed_in_foreground_app()
+        if not allowed:
+            matcher.reset()
+            self._update_suggestions(matcher)
+            return True
+
+        # boundaries -> attempt expansion then reset, unless the char continues a trigger
         if name in ('space', 'enter') or (len(name) == 1 and not name.isalnum()):
-            self._try_expand(boundary=True)
-            self._buffer = ""
-            return
+            if len(name) == 1 and matcher.match is None and matcher.can_feed(name):
+                matcher.feed(name)
+                return True
+            expanded = self._try_expand(boundary_key=name)
+            matcher.reset()
+            # a boundary char may itself open the next trigger (e.g. the "/" prefix)
+            if len(name) == 1 and matcher.can_feed(name):
+                matcher.feed(name)
+            self._update_suggestions(matcher)
+            return not expanded
 
         if name == 'tab':
-            # If expand_on_tab is True, _on_tab handles it; here just buffer logic for normal flow
-            self._buffer += '\t'
-            return
+            # Expand on Tab: swallow the Tab when it completes a trigger
+            if self.settings.expand_on_tab and self._try_expand():
+                matcher.reset()
+                return False
+            matcher.feed('\t')
+            return True
 
         if name == 'backspace':
-            self._buffer = self._buffer[:-1]
-            return
+            matcher.backspace()
+            self._update_suggestions(matcher)
+            return True
 
         if len(name) == 1:
-            self._buffer += name
-            # lightweight lazy check (no delete/paste here)
-            self._try_expand(boundary=False)
+            t0 = perf_counter_ns() if m.enabled else 0
+            matcher.feed(name)
+            if m.enabled:
+                m.observe(LOOKUP, perf_counter_ns() - t0)
+            # as-you-type work is just the completion lookup; expansion waits for a boundary
+            self._update_suggestions(matcher)
+        return True
 
-    def _on_tab(self):
-        # Suppressed TAB: if trigger matches, expand and swallow; otherwise pass through a real Tab
-        if not self.settings.enabled:
-            keyboard.send('tab')
-            return
-        if not self._allowed_in_foreground_app():
-            keyboard.send('tab')
+    def _update_suggestions(self, matcher: TriggerMatcher):
+        idx = self._snapshot.completions
+        listener = self.completion_listener
+        if idx is None or listener is None:
             return
+        t0 = perf_counter_ns()
+        node = matcher.node
+        found = idx.complete(node, COMPLETION_LIMIT) if node and matcher.depth >= COMPLETION_MIN_CHARS else []
+        if perf_counter_ns() - t0 > COMPLETION_BUDGET_NS:
+            self.metrics.incr("completions_over_budget")
+            found = []
+        if found != self._suggestions:
+            self._suggestions = found
+            listener(found)
+
+    # ---- Expansion worker
+    def _dispatch(self, job) -> bool:
+        """Queue a job for the worker; False when the queue is full and the job was dropped."""
+        with self._outstanding_lock:
+            try:
+                self._jobs.put_nowait(job)
+            except queue.Full:
+                if self.logger and self.settings.logging_enabled:
+                    self.logger.warning("Expansion queue full, dropped %s", job[0])
+                self.metrics.incr("dropped_jobs")
+                return False
+            self._outstanding += 1
+        return True
 
-        if self._buffer.startswith(self.settings.trigger_prefix):
-            trigger = self._buffer[len(self.settings.trigger_prefix):]
-            if trigger and self.repo.get(trigger) is not None:
-                self._do_expand(trigger, consumed_chars=len(self._buffer))
-                self._buffer = ""
+    def _expansion_worker(self):
+        # Single consumer: jobs run strictly in the order the hook queued them
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                self._jobs.task_done()
                 return
-        # no match -> send a real Tab to compensate for suppression
-        keyboard.send('tab')
+            self._echoes = Counter()  # a fresh one: late decrements can't leak into this job
+            self._injecting.set()
+            m = self.metrics
+            t0 = perf_counter_ns()
+            if m.enabled:
+                m.observe(QUEUE_WAIT, t0 - job[-1])
+            try:
+                if job[0] == "expand":
+                    _, trigger, consumed, boundary_key, _ = job
+                    app = self._do_expand(trigger, consumed, boundary_key)
+                    self._record_use(trigger, app)
+                    if self.startup.mark("first_expansion") and self.logger:
+                        self.logger.info("Startup: %s", self.startup.report())
+                    if m.enabled:
+                        m.observe(EXPAND, perf_counter_ns() - t0)
+                        m.incr("expansions")
+                else:
+                    self._emit(InjectionPlan.for_key(job[1]))
+                    m.incr("replayed_keys")
+            except Exception as e:
+                if self.logger and self.settings.logging_enabled:
+                    self.logger.error("Expansion failed: %s", e)
+            finally:
+                self._injecting.clear()
+                with self._outstanding_lock:
+                    self._outstanding -= 1
+                self._jobs.task_done()
+
+    def _record_use(self, trigger: str, app: str):
+        # memory only; the store writes itself out in the background
+        self.usage.record(trigger, app)
+        idx = self._snapshot.completions
+        if idx is not None:
+            idx.rerank(trigger)
 
     # ---- Expansion helpers
-    def _try_expand(self, boundary: bool):
-        if not self._buffer.startswith(self.settings.trigger_prefix):
-            return
-        trigger = self._buffer[len(self.settings.trigger_prefix):]
-        if not trigger:
-            return
-        text = self.repo.get(trigger)
-        if text is None:
-            return
-        # On boundary or lazy? Only expand on boundary unless expand_on_tab is enabled (handled separately)
-        if boundary:
-            self._do_expand(trigger, consumed_chars=len(self._buffer))
-
-    def _do_expand(self, trigger: str, consumed_chars: int):
-        # Delete the typed trigger first
-        for _ in range(consumed_chars):
-            keyboard.send('backspace')
-
-        expansion = self.repo.get(trigger) or ""
-        # Handle {cursor} placeholder: compute post length (characters to move back)
-        pre, post = _split_cursor(expansion)
+    def _try_expand(self, boundary_key: Optional[str] = None) -> bool:
+        """Queue the expansion of a completed trigger at a boundary (Tab counts when expand_on_tab is on)."""
+        matcher = self._current_matcher()
+        trigger = matcher.match
+        if trigger is None:
+            return False
+        library = self._snapshot.library
+        if library.scoped and library.owner(trigger, self.foreground.get()[0]) is None:
+            return False  # only defined for other apps
+        return self._dispatch(("expand", trigger, matcher.depth, boundary_key, perf_counter_ns()))
+
+    def _emit(self, plan: InjectionPlan):
+        # expected before emitting: the hook may see the first echo before emit() returns
+        self._echoes.update(name.lower() for name in self.output.echoes(plan))
+        self.output.emit(plan)
+
+    def _do_expand(self, trigger: str, consumed_chars: int, boundary_key: Optional[str] = None) -> str:
+        """Inject the expansion; returns the foreground process it went to."""
+        proc = self.foreground.get()[0]
+        # Compiled with the snapshot; rendering walks the plan ({cursor} -> caret moves back len(post))
+        pre, post = self._snapshot.templates_for(proc).render(trigger, self.clipboard.user_text)
         combined = pre + post
-        with preserve_clipboard():
-            pyperclip.copy(combined)
-            keyboard.send('ctrl+v')
-        post_len = len(post)
-        if post_len > 0:
-            # Move caret left N times to land at {cursor} position
-            for _ in range(post_len):
-                keyboard.send('left')
+        # The boundary key itself was swallowed by the hook; re-emit it unless we park the caret
+        tail = InjectionPlan.for_key(boundary_key) if boundary_key and not post else InjectionPlan()
+
+        mode = self.settings.per_app_expansion_modes.get(proc, self.settings.expansion_mode)
+        mode = self.strategy.choose(combined, mode)
+        m = self.metrics
+        started = time.perf_counter()
+        if mode == PASTE:
+            # Delete the typed trigger, paste, move to {cursor}: one batched injection
+            plan = InjectionPlan(deletes=consumed_chars, paste=True, text=tail.text,
+                                 caret_left=len(post), keys=tail.keys)
+            # Save is skipped when the clipboard is unchanged; restore happens later on a timer
+            t0 = perf_counter_ns()
+            self.clipboard.save()
+            self.clipboard.copy(combined)
+            t1 = perf_counter_ns()
+            self._emit(plan)
+            if m.enabled:
+                m.observe(CLIPBOARD, t1 - t0)
+                m.observe(INJECT, perf_counter_ns() - t1)
+                m.incr("pasted")
+            self.clipboard.schedule_restore(self.settings.clipboard_restore_delay_ms / 1000.0)
+        else:
+            # Short text: typing it directly skips the clipboard round trip
+            plan = InjectionPlan(deletes=consumed_chars, text=combined + tail.text,
+                                 caret_left=len(post), keys=tail.keys)
+            t1 = perf_counter_ns()
+            self._emit(plan)
+            if m.enabled:
+                m.observe(INJECT, perf_counter_ns() - t1)
+                m.incr("typed")
+        self.strategy.record(mode, len(combined), time.perf_counter() - started)
+        return proc
 
     # ---- Policy helpers
     def _allowed_in_foreground_app(self) -> bool:
-        proc = get_foreground_process_name()
-        title = get_foreground_window_title().lower()
-        
-        # Debug logging to help troubleshoot
-        if self.logger and self.settings.logging_enabled:
-            self.logger.debug(f"Checking app: process='{proc}', title='{title}'")
-            self.logger.debug(f"Blacklist: {self.settings.blacklist_process_names}")
-            self.logger.debug(f"Per-app overrides: {self.settings.per_app_overrides}")
-        
-        # Blacklist by process (highest priority - always blocks)
-        if proc in (p.lower() for p in self.settings.blacklist_process_names):
-            if self.logger and self.settings.logging_enabled:
-                self.logger.debug(f"Blocked by blacklist: {proc}")
-            return False
-            
-        # Per-app overrides (explicit user choice)
-        if proc in self.settings.per_app_overrides:
-            allowed = bool(self.settings.per_app_overrides[proc])
+        proc, title = self.foreground.get()
+        # compiled with the snapshot and memoized per (process, title): a dict hit per key
+        decision = self._snapshot.policy.decide(proc, title)
+        if decision is not self._last_decision:
+            # log when the decision changes (a new window), not on every key
+            self._last_decision = decision
             if self.logger and self.settings.logging_enabled:
-                self.logger.debug(f"Per-app override for {proc}: {allowed}")
-            return allowed
-            
-        # Auto-block password fields (only if no explicit override)
-        if "password" in title or "signin" in title or "login" in title:
-            if self.logger and self.settings.logging_enabled:
-                self.logger.debug(f"Blocked by title keyword: {title}")
-            return False
-            
-        # Default: allow
-        if self.logger and self.settings.logging_enabled:
-            self.logger.debug(f"Allowed by default: {proc}")
-        return True
+                self.logger.debug("%s in %s: %s", "Allowed" if decision[0] else "Blocked", proc, decision[1])
+        return decision[0]
 
-def _split_cursor(text: str) -> tuple[str, str]:
-    token = "{cursor}"
-    idx = text.find(token)
-    if idx == -1:
-        return text, ""
-    pre = text[:idx]
-    post = text[idx + len(token):]
-    return pre, post
\ No newline at end of file
+    def _report_policy_errors(self, policy: AppPolicy):
+        if policy.errors and self.logger:
+            self.logger.warning("Ignoring invalid title patterns: %s", "; ".join(policy.errors))
@@ -0,0 +1,255 @@
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, IO, Iterator, List, Mapping, Optional, Tuple
+
+Pair = Tuple[str, str]
+ProgressFn = Callable[[int, int], None]  # (bytes read, total bytes)
+
+SKIP = "skip"
+OVERWRITE = "overwrite"
+RENAME = "rename"
+CONFLICT_POLICIES = (SKIP, OVERWRITE, RENAME)
+
+_CHUNK = 64 * 1024
+_TRIGGER_COLUMNS = ("trigger", "abbreviation", "shortcut", "keyword")
+_TEXT_COLUMNS = ("expansion", "content", "replace", "snippet", "text", "phrase")
+
+@dataclass
+class ImportResult:
+    entries: Dict[str, str] = field(default_factory=dict)  # accepted, final trigger names
+    added: int = 0
+    overwritten: int = 0
+    renamed: int = 0
+    skipped: int = 0
+    invalid: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        parts = [f"{self.added} added"]
+        for n, label in ((self.overwritten, "overwritten"), (self.renamed, "renamed"),
+                         (self.skipped, "skipped"), (len(self.invalid), "invalid")):
+            if n:
+                parts.append(f"{n} {label}")
+        return ", ".join(parts)
+
+# ---- Format readers (each yields (trigger, expansion) without loading the whole file)
+def iter_json_pairs(f: IO[str]) -> Iterator[Pair]:
+    """{"trigger": "text", ...} or [{"trigger": ..., "expansion": ...}, ...], parsed incrementally."""
+    dec = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        chunk = f.read(_CHUNK)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf) or not fill():
+                return
+
+    def expect(chars: str) -> str:
+        skip_ws()
+        if pos >= len(buf) or buf[pos] not in chars:
+            raise ValueError(f"Expected one of {chars!r} in JSON import")
+        return buf[pos]
+
+    def value():
+        nonlocal pos
+        skip_ws()
+        while True:
+            try:
+                obj, end = dec.raw_decode(buf, pos)
+                # a value touching the buffer end may be cut short (e.g. a number); read on to be sure
+                if end < len(buf) or eof:
+                    pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+
+    opener = expect("{[")
+    pos += 1
+    closer = "}" if opener == "{" else "]"
+    skip_ws()
+    if pos < len(buf) and buf[pos] == closer:
+        return
+    while True:
+        if opener == "{":
+            key = value()
+            expect(":")
+            pos += 1
+            yield key, value()
+        else:
+            row = value()
+            yield _pair_from_record(row)
+        sep = expect("," + closer)
+        pos += 1
+        if sep == closer:
+            return
+
+def iter_csv_pairs(f: IO[str]) -> Iterator[Pair]:
+    """CSV with a trigger/abbreviation column and a text column (TextExpander exports
+    put abbreviation first and content second, without a header)."""
+    reader = csv.reader(f)
+    ti, xi = 0, 1
+    first = True
+    for row in reader:
+        if not row:
+            continue
+        if first:  # the header, if any, is the first non-empty row
+            first = False
+            cols = [c.strip().lower() for c in row]
+            t = next((i for i, c in enumerate(cols) if c in _TRIGGER_COLUMNS), None)
+            x = next((i for i, c in enumerate(cols) if c in _TEXT_COLUMNS), None)
+            if t is not None and x is not None:
+                ti, xi = t, x
+                continue
+        if len(row) > max(ti, xi):
+            yield row[ti], row[xi]
+        else:
+            yield (row[ti] if len(row) > ti else ""), ""
+
+def iter_espanso_pairs(f: IO[str]) -> Iterator[Pair]:
+    """espanso match files (`- trigger: ...` / `replace: ...`), read line by line.
+
+    Covers plain, quoted and block (| or >) scalars. espanso's leading ":"
+    plays the role of our trigger prefix, so it is stripped.
+    """
+    trigger: Optional[str] = None
+    text: Optional[str] = None
+    block: Optional[List[str]] = None
+    block_indent = -1
+    folded = False
+
+    def flush() -> Optional[Pair]:
+        nonlocal trigger, text
+        out = None
+        if trigger is not None and text is not None:
+            out = (trigger[1:] if trigger.startswith(":") else trigger, text)
+        trigger = text = None
+        return out
+
+    for raw in f:
+        line = raw.rstrip("\r\n")
+        stripped = line.lstrip(" ")
+        indent = len(line) - len(stripped)
+        if block is not None:
+            if not stripped or (block_indent < 0 or indent >= block_indent):
+                if stripped and block_indent < 0:
+                    block_indent = indent
+                block.append(line[block_indent:] if stripped else "")
+                continue
+            while block and block[-1] == "":
+                block.pop()
+            text = (" " if folded else "\n").join(block)
+            block = None
+        if stripped.startswith("- "):
+            pair = flush()
+            if pair:
+                yield pair
+            stripped = stripped[2:].lstrip()
+        if stripped.startswith("trigger:"):
+            trigger = _yaml_scalar(stripped[len("trigger:"):])
+        elif stripped.startswith("replace:"):
+            rest = stripped[len("replace:"):].strip()
+            if rest[:1] in ("|", ">"):
+                block, block_indent, folded = [], -1, rest.startswith(">")
+            else:
+                text = _yaml_scalar(rest)
+    if block is not None:
+        while block and block[-1] == "":
+            block.pop()
+        text = (" " if folded else "\n").join(block)
+    pair = flush()
+    if pair:
+        yield pair
+
+def _yaml_scalar(s: str) -> str:
+    s = s.strip()
+    if s.startswith('"') and s.endswith('"') and len(s) >= 2:
+        return json.loads(s)  # YAML double-quoted escapes are a superset of JSON's common ones
+    if s.startswith("'") and s.endswith("'") and len(s) >= 2:
+        return s[1:-1].replace("''", "'")
+    return s.split(" #", 1)[0].rstrip()
+
+def _pair_from_record(rec) -> Pair:
+    if not isinstance(rec, dict):
+        raise ValueError("Expected objects in a JSON import list")
+    lowered = {str(k).lower(): v for k, v in rec.items()}
+    t = next((lowered[c] for c in _TRIGGER_COLUMNS if c in lowered), "")
+    x = next((lowered[c] for c in _TEXT_COLUMNS if c in lowered), "")
+    return t, x
+
+READERS = {
+    ".json": iter_json_pairs,
+    ".csv": iter_csv_pairs,
+    ".yml": iter_espanso_pairs,
+    ".yaml": iter_espanso_pairs,
+}
+
+# ---- Pipeline
+def iter_pairs(path: Path, progress: Optional[ProgressFn] = None, every: int = 2000) -> Iterator[Pair]:
+    reader = READERS.get(path.suffix.lower())
+    if reader is None:
+        raise ValueError(f"Unsupported import format: {path.suffix}")
+    total = path.stat().st_size
+    with open(path, "rb") as raw:
+        f = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+        for n, pair in enumerate(reader(f), 1):
+            if progress and n % every == 0:
+                progress(raw.tell(), total)
+            yield pair
+    if progress:
+        progress(total, total)
+
+def valid_trigger(trigger) -> bool:
+    return isinstance(trigger, str) and bool(trigger) and not any(c.isspace() for c in trigger)
+
+def import_into(path: Path, existing: Mapping[str, str], policy: str = SKIP,
+                progress: Optional[ProgressFn] = None) -> ImportResult:
+    """Validate and resolve conflicts in one linear pass over the file.
+
+    Conflicts are against `existing` and against earlier rows of the same
+    file. The caller decides what to do with `result.entries`.
+    """
+    if policy not in CONFLICT_POLICIES:
+        raise ValueError(f"Unknown conflict policy: {policy}")
+    res = ImportResult()
+    out = res.entries
+    for trigger, text in iter_pairs(path, progress):
+        if not valid_trigger(trigger) or not isinstance(text, str):
+            res.invalid.append(str(trigger))
+            continue
+        if trigger not in existing and trigger not in out:
+            out[trigger] = text
+            res.added += 1
+        elif policy == OVERWRITE:
+            if trigger not in out:
+                res.overwritten += 1
+            out[trigger] = text
+        elif policy == RENAME:
+            out[_free_name(trigger, existing, out)] = text
+            res.renamed += 1
+        else:
+            res.skipped += 1
+    return res
+
+def _free_name(trigger: str, existing: Mapping[str, str], taken: Mapping[str, str]) -> str:
+    n = 2
+    while f"{trigger}_{n}" in existing or f"{trigger}_{n}" in taken:
+        n += 1
+    return f"{trigger}_{n}"
@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+@dataclass(frozen=True)
+class InjectionPlan:
+    """Everything one expansion types, emitted in this order."""
+    deletes: int = 0            # backspaces over the typed trigger
+    paste: bool = False         # ctrl+v of whatever is on the clipboard
+    text: str = ""              # typed as unicode characters
+    caret_left: int = 0         # left-arrow presses to land on {cursor}
+    keys: Tuple[str, ...] = ()  # named keys pressed last (e.g. "enter")
+
+    @classmethod
+    def for_key(cls, name: str) -> "InjectionPlan":
+        """Plan that re-types one hook key name (as text when it is a single char)."""
+        if len(name) == 1:
+            return cls(text=name)
+        if name == "space":
+            return cls(text=" ")
+        return cls(keys=(name,))
+
+class OutputBackend:
+    def emit(self, plan: InjectionPlan):
+        raise NotImplementedError
+
+    def echoes(self, plan: InjectionPlan) -> List[str]:
+        """Key names the global hook sees while emit(plan) runs (modifiers aside); none by default."""
+        return []
+
+class RecordingBackend(OutputBackend):
+    """Keeps every plan instead of touching the OS; for tests and benchmarks."""
+
+    def __init__(self):
+        self.plans: List[InjectionPlan] = []
+
+    def emit(self, plan: InjectionPlan):
+        self.plans.append(plan)
+
+class KeyboardLibBackend(OutputBackend):
+    """Portable fallback on the `keyboard` package; key runs go out as one send() sequence."""
+
+    def __init__(self):
+        import keyboard
+        self._kb = keyboard
+
+    def emit(self, plan: InjectionPlan):
+        head = ["backspace"] * plan.deletes
+        if plan.paste:
+            head.append("ctrl+v")
+        if head:
+            self._kb.send(", ".join(head))
+        if plan.text:
+            self._kb.write(plan.text)
+        tail = ["left"] * plan.caret_left + list(plan.keys)
+        if tail:
+            self._kb.send(", ".join(tail))
+
+    def echoes(self, plan: InjectionPlan) -> List[str]:
+        # send() and write() press real keys, and the hook sees every one of them
+        names = ["backspace"] * plan.deletes + (["v"] if plan.paste else [])
+        names += [_TEXT_KEY_NAMES.get(ch, ch) for ch in plan.text]
+        return names + ["left"] * plan.caret_left + list(plan.keys)
+
+class SendInputBackend(OutputBackend):
+    """Windows backend: the whole plan becomes one INPUT array and one SendInput call."""
+
+    KEYEVENTF_EXTENDEDKEY = 0x0001
+    KEYEVENTF_KEYUP = 0x0002
+    KEYEVENTF_UNICODE = 0x0004
+    VK_BACK, VK_CONTROL, VK_V, VK_LEFT = 0x08, 0x11, 0x56, 0x25
+    NAMED_KEYS = {
+        "enter": (0x0D, False), "tab": (0x09, False), "space": (0x20, False),
+        "backspace": (0x08, False), "esc": (0x1B, False),
+        "left": (0x25, True), "right": (0x27, True), "up": (0x26, True), "down": (0x28, True),
+        "home": (0x24, True), "end": (0x23, True), "delete": (0x2E, True),
+    }
+
+    def __init__(self):
+        import ctypes
+        import ctypes.wintypes as wt
+
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [("wVk", wt.WORD), ("wScan", wt.WORD), ("dwFlags", wt.DWORD),
+                        ("time", wt.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [("dx", wt.LONG), ("dy", wt.LONG), ("mouseData", wt.DWORD),
+                        ("dwFlags", wt.DWORD), ("time", wt.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+        class _INPUTUNION(ctypes.Union):
+            _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT)]
+
+        class INPUT(ctypes.Structure):
+            _fields_ = [("type", wt.DWORD), ("u", _INPUTUNION)]
+
+        self._ctypes = ctypes
+        self._INPUT = INPUT
+        self._send_input = ctypes.windll.user32.SendInput
+        self._fallback = None
+
+    def _key(self, out: list, vk: int, extended: bool = False):
+        flags = self.KEYEVENTF_EXTENDEDKEY if extended else 0
+        out.append((vk, 0, flags))
+        out.append((vk, 0, flags | self.KEYEVENTF_KEYUP))
+
+    def _unicode(self, out: list, text: str):
+        # Newlines as unicode chars are ignored or misread by many apps; press Enter instead
+        for i, line in enumerate(text.replace("\r\n", "\n").split("\n")):
+            if i:
+                self._key(out, 0x0D)
+            self._unicode_units(out, line)
+
+    def _unicode_units(self, out: list, text: str):
+        data = text.encode("utf-16-le")
+        for i in range(0, len(data), 2):
+            unit = data[i] | (data[i + 1] << 8)  # surrogate pairs go out as two units
+            out.append((0, unit, self.KEYEVENTF_UNICODE))
+            out.append((0, unit, self.KEYEVENTF_UNICODE | self.KEYEVENTF_KEYUP))
+
+    def emit(self, plan: InjectionPlan):
+        events: List[Tuple[int, int, int]] = []
+        for _ in range(plan.deletes):
+            self._key(events, self.VK_BACK)
+        if plan.paste:
+            events.append((self.VK_CONTROL, 0, 0))
+            self._key(events, self.VK_V)
+            events.append((self.VK_CONTROL, 0, self.KEYEVENTF_KEYUP))
+        if plan.text:
+            self._unicode(events, plan.text)
+        for _ in range(plan.caret_left):
+            self._key(events, self.VK_LEFT, extended=True)
+        unmapped = []
+        for name in plan.keys:
+            if name in self.NAMED_KEYS:
+                self._key(events, *self.NAMED_KEYS[name])
+            else:
+                unmapped.append(name)
+
+        if events:
+            arr = (self._INPUT * len(events))()
+            for slot, (vk, scan, flags) in zip(arr, events):
+                slot.type = 1  # INPUT_KEYBOARD
+                slot.u.ki.wVk = vk
+                slot.u.ki.wScan = scan
+                slot.u.ki.dwFlags = flags
+            self._send_input(len(events), arr, self._ctypes.sizeof(self._INPUT))
+        if unmapped:
+            if self._fallback is None:
+                self._fallback = KeyboardLibBackend()
+            self._fallback.emit(InjectionPlan(keys=tuple(unmapped)))
+
+    def echoes(self, plan: InjectionPlan) -> List[str]:
+        # unicode input arrives as VK_PACKET, which the `keyboard` hook never reports; Enter for newlines does
+        names = ["backspace"] * plan.deletes + (["v"] if plan.paste else [])
+        names += ["enter"] * plan.text.replace("\r\n", "\n").count("\n")
+        return names + ["left"] * plan.caret_left + list(plan.keys)
+
+_TEXT_KEY_NAMES = {" ": "space", "\n": "enter", "\t": "tab"}
+
+def default_output_backend() -> OutputBackend:
+    from .platforms import get_platform
+    return get_platform().output()
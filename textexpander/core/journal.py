@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from .storage import read_json, write_json_with_backup
+from .watcher import note_written
+
+# (op, trigger, expansion) with op "set" or "del"; expansion is None for deletes
+Change = Tuple[str, str, Optional[str]]
+
+class SnippetJournal:
+    """Append-only change log next to the snippets snapshot.
+
+    Saves append one JSON line per changed trigger. Once the journal grows
+    past `compact_bytes` it is renamed to `<name>.compacting` and a fresh
+    snapshot is written (temp file + rename); the renamed journal is
+    deleted only after the snapshot is in place. Replay is idempotent, so
+    a crash at any point leaves a loadable state. Appends and compaction
+    both run on the persistence writer, one job at a time.
+
+    Appends don't replace the snapshot, so they don't feed the backup store
+    by themselves: backup() stores the state a save is about to change, at
+    most once every `backup_interval` seconds.
+    """
+
+    def __init__(self, snapshot_path: Path, path: Optional[Path] = None, compact_bytes: int = 256 * 1024,
+                 backup_interval: float = 60.0):
+        self.snapshot_path = snapshot_path
+        self.path = path or snapshot_path.with_suffix(".journal")
+        self.rotated_path = self.path.with_name(self.path.name + ".compacting")
+        self.compact_bytes = compact_bytes
+        self.backup_interval = backup_interval
+        self._backed_up: Optional[float] = None  # monotonic time of the last backup()
+        self._lock = threading.Lock()
+
+    # ---- Loading
+    def load(self) -> Dict[str, str]:
+        data = read_json(self.snapshot_path)
+        # rotated records are older than the live journal, so replay them first
+        for p in (self.rotated_path, self.path):
+            self._replay(p, data)
+        return data
+
+    def _replay(self, path: Path, data: Dict[str, str]):
+        if not path.exists():
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # torn write from a crash mid-append
+                if rec.get("op") == "set":
+                    data[rec["k"]] = rec["v"]
+                elif rec.get("op") == "del":
+                    data.pop(rec["k"], None)
+
+    # ---- Writing
+    def append(self, changes: Iterable[Change]):
+        lines = []
+        for op, k, v in changes:
+            rec = {"op": op, "k": k} if op == "del" else {"op": op, "k": k, "v": v}
+            lines.append(json.dumps(rec, ensure_ascii=False) + "\n")
+        if not lines:
+            return
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            note_written(self.path)
+
+    def backup(self):
+        """Store snapshot + journal as one version, unless one was stored recently."""
+        now = time.monotonic()
+        if self._backed_up is not None and now - self._backed_up < self.backup_interval:
+            return
+        if not self.snapshot_path.exists():
+            return
+        self._backed_up = now
+        from .backups import get_backup_store
+        # serialized like write_json_atomic, so the same content dedups against compaction backups
+        text = json.dumps(self.load(), ensure_ascii=False, indent=2)
+        get_backup_store().add_bytes(self.snapshot_path.stem, text.encode("utf-8"))
+
+    def size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except OSError:
+            return 0
+
+    def needs_compaction(self) -> bool:
+        return self.size() >= self.compact_bytes
+
+    def compact(self):
+        """Fold everything journaled so far into a new snapshot.
+
+        The snapshot is rebuilt from disk (old snapshot + rotated journal),
+        not from memory, so unsaved edits can never leak into it.
+        """
+        with self._lock:
+            # a leftover rotated file (crash mid-compaction) is kept and folded in first
+            if not self.rotated_path.exists() and self.path.exists():
+                os.replace(self.path, self.rotated_path)
+                note_written(self.path)
+        self._write_snapshot()
+
+    def _write_snapshot(self):
+        data = read_json(self.snapshot_path)
+        self._replay(self.rotated_path, data)
+        write_json_with_backup(self.snapshot_path, data)
+        try:
+            self.rotated_path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,217 @@
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+from .config import CACHE_DIR
+from .packed import cached_pack
+from .storage import import_snippets
+
+PERSONAL = "personal"
+
+# Index entry: the winning layer, or candidate layers best first when app-scoped layers hold the trigger
+Entry = Union[int, Tuple[int, ...]]
+
+@dataclass(frozen=True, eq=False)
+class Layer:
+    """One snippet library in the stack; compared by identity, never by content."""
+    name: str
+    snippets: Mapping[str, str]
+    apps: FrozenSet[str] = frozenset()  # lowercase process names; empty means every app
+    path: Optional[Path] = None
+    stamp: Optional[Tuple[int, int]] = None  # (mtime_ns, size) of `path` when it was read
+    error: str = ""  # why the file could not be read; the layer is then empty
+
+class LayeredLibrary:
+    """Snippet layers merged by precedence: later layers win.
+
+    The usual stack is defaults, then shared team libraries, then the
+    personal snippets on top. A layer with `apps` only counts while one of
+    those apps is in the foreground. Nothing is copied: `_index` maps each
+    trigger to the layer that supplies it (or, when app-scoped layers hold
+    it, the candidates best first), so a lookup is one dict probe plus one
+    read from that layer. A single unscoped layer needs no index at all.
+    """
+
+    def __init__(self, layers: Sequence[Layer], _index: Optional[Dict[str, Entry]] = None):
+        self.layers: Tuple[Layer, ...] = tuple(layers)
+        self.scoped = any(layer.apps for layer in self.layers)
+        self.triggers_changed = True  # vs. the library this one was updated from
+        self._direct: Optional[Mapping[str, str]] = None
+        self._index: Optional[Dict[str, Entry]] = None
+        self._scopes: Dict[str, Tuple[int, ...]] = {}
+        if len(self.layers) == 1 and not self.scoped:
+            self._direct = self.layers[0].snippets
+        else:
+            self._index = _index if _index is not None else self._build_index()
+
+    def _build_index(self) -> Dict[str, Entry]:
+        index: Dict[str, Entry] = {}
+        for i, layer in enumerate(self.layers):  # lowest precedence first
+            if not layer.apps:
+                for t in layer.snippets:
+                    index[t] = i  # an unscoped layer overrides everything below, in every app
+                continue
+            for t in layer.snippets:
+                below = index.get(t)
+                if below is None:
+                    index[t] = (i,)
+                elif below.__class__ is int:
+                    index[t] = (i, below)
+                else:
+                    index[t] = (i,) + below
+        return index
+
+    def _entry(self, trigger: str) -> Optional[Entry]:
+        found: List[int] = []
+        for i in range(len(self.layers) - 1, -1, -1):
+            layer = self.layers[i]
+            if trigger in layer.snippets:
+                if not layer.apps:
+                    return tuple(found) + (i,) if found else i
+                found.append(i)
+        return tuple(found) if found else None
+
+    # ---- Updating
+    def updated(self, layers: Sequence[Layer]) -> "LayeredLibrary":
+        """The library with some layers replaced; only triggers of the replaced layers are re-indexed."""
+        layers = tuple(layers)
+        if self._index is None or len(layers) != len(self.layers):
+            return LayeredLibrary(layers)
+        touched = set()
+        for before, after in zip(self.layers, layers):
+            if after is before or (after.snippets is before.snippets and after.apps == before.apps):
+                continue
+            old, new = before.snippets, after.snippets
+            if after.apps != before.apps:
+                touched.update(old)
+                touched.update(new)
+            else:
+                # only membership decides an entry; edited expansions need no re-indexing
+                touched.update(t for t in old if t not in new)
+                touched.update(t for t in new if t not in old)
+        # the index is shared with this library unless an entry actually moves
+        lib = LayeredLibrary(layers, _index=dict(self._index) if touched else self._index)
+        lib.triggers_changed = False
+        index = lib._index
+        for t in touched:
+            entry = lib._entry(t)
+            if entry is None:
+                if index.pop(t, None) is not None:
+                    lib.triggers_changed = True
+            else:
+                if t not in index:
+                    lib.triggers_changed = True
+                index[t] = entry
+        return lib
+
+    # ---- Lookups
+    def owner(self, trigger: str, app: str = "") -> Optional[int]:
+        """Index of the layer that supplies `trigger` in `app`, or None."""
+        if self._direct is not None:
+            return 0 if trigger in self._direct else None
+        entry = self._index.get(trigger)
+        if entry is None or entry.__class__ is int:
+            return entry
+        for i in entry:
+            apps = self.layers[i].apps
+            if not apps or app in apps:
+                return i
+        return None
+
+    def get(self, trigger: str, app: str = "") -> Optional[str]:
+        if self._direct is not None:
+            return self._direct.get(trigger)
+        i = self.owner(trigger, app)
+        return None if i is None else self.layers[i].snippets.get(trigger)
+
+    def active_scopes(self, app: str) -> Tuple[int, ...]:
+        """App-scoped layers that apply in `app`; apps with the same scopes see the same library."""
+        scopes = self._scopes.get(app)
+        if scopes is None:
+            scopes = self._scopes[app] = tuple(i for i, layer in enumerate(self.layers)
+                                               if layer.apps and app in layer.apps)
+        return scopes
+
+    def view(self, app: str = "") -> Mapping[str, str]:
+        """Read-only merged mapping as seen from `app` ("" = outside every scoped layer)."""
+        return self._direct if self._direct is not None else _LibraryView(self, app)
+
+    def triggers(self):
+        """Every trigger any layer supplies, in any app."""
+        return self._direct.keys() if self._direct is not None else self._index.keys()
+
+    def __len__(self) -> int:
+        return len(self._direct) if self._direct is not None else len(self._index)
+
+    def describe(self) -> List[Dict[str, Any]]:
+        return [{"name": layer.name, "snippets": len(layer.snippets), "apps": sorted(layer.apps),
+                 "path": str(layer.path) if layer.path else "", "error": layer.error}
+                for layer in self.layers]
+
+class _LibraryView(Mapping):
+    def __init__(self, library: LayeredLibrary, app: str):
+        self._lib = library
+        self._app = app
+
+    def __getitem__(self, trigger: str) -> str:
+        v = self._lib.get(trigger, self._app)
+        if v is None:
+            raise KeyError(trigger)
+        return v
+
+    def get(self, trigger, default=None):
+        v = self._lib.get(trigger, self._app)
+        return default if v is None else v
+
+    def __contains__(self, trigger) -> bool:
+        return self._lib.owner(trigger, self._app) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        owner, app = self._lib.owner, self._app
+        return (t for t in self._lib.triggers() if owner(t, app) is not None)
+
+    def __len__(self) -> int:
+        if not self._lib.scoped:
+            return len(self._lib)
+        return sum(1 for _ in self)
+
+# ---- Loading library files
+def file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def load_layer(spec: Mapping[str, Any], previous: Optional[Layer] = None) -> Layer:
+    """A library from its settings entry {"path", "name"?, "apps"?}; `previous` is reused if unchanged.
+
+    Any format the importer reads works (JSON, CSV, espanso YAML). Large
+    files are packed like the personal library. An unreadable file (say, a
+    share that is offline) gives an empty layer with `error` set.
+    """
+    path = Path(str(spec["path"])).expanduser()
+    name = str(spec.get("name") or path.stem)
+    apps = frozenset(str(a).strip().lower() for a in spec.get("apps") or () if str(a).strip())
+    stamp = file_stamp(path)
+    if (previous is not None and previous.path == path and previous.stamp == stamp
+            and previous.apps == apps and previous.name == name):
+        return previous
+    if stamp is None:
+        return Layer(name, {}, apps, path, None, "file not found")
+    try:
+        snippets = cached_pack([path], CACHE_DIR, lambda: import_snippets(path),
+                               name="lib-%08x" % zlib.crc32(str(path).encode("utf-8")))
+    except (OSError, ValueError) as e:
+        return Layer(name, {}, apps, path, stamp, str(e) or type(e).__name__)
+    return Layer(name, snippets, apps, path, stamp)
+
+def load_layers(specs: Sequence[Mapping[str, Any]], previous: Sequence[Layer] = ()) -> List[Layer]:
+    """Layers for the settings' `libraries` list, lowest precedence first; unchanged files are not re-read."""
+    by_path = {layer.path: layer for layer in previous if layer.path is not None}
+    out = []
+    for spec in specs:
+        if not spec.get("path"):
+            continue
+        out.append(load_layer(spec, by_path.get(Path(str(spec["path"])).expanduser())))
+    return out
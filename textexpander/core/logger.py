@@ -1,17 +1,83 @@
+import atexit
 import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List, Optional
 from .config import LOG_FILE
 
+LOG_MAX_BYTES = 1_000_000
+LOG_BACKUPS = 3
+
 _logger = None
+_listener: Optional[QueueListener] = None
+
+class _DeferredQueueHandler(QueueHandler):
+    """Hands the record over as-is: message formatting happens on the writer thread."""
+
+    def prepare(self, record):
+        return record
+
+class RateLimitFilter(logging.Filter):
+    """Lets at most `burst` records per message template through every `interval` seconds.
+
+    Keyed by the unformatted message (record.msg), so per-keystroke debug lines
+    like "Blocked by blacklist: %s" share one budget. The number of dropped
+    records is reported on the next record that gets through.
+    """
+
+    def __init__(self, burst: int = 20, interval: float = 10.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._windows: Dict[str, List] = {}  # template -> [window start, passed, dropped]
+        self._lock = threading.Lock()
+
+    def filter(self, record) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        key = str(record.msg)
+        with self._lock:
+            w = self._windows.get(key)
+            if w is None or now - w[0] >= self.interval:
+                dropped = w[2] if w else 0
+                self._windows[key] = [now, 1, 0]
+                if dropped:
+                    record.msg = f"{record.msg} (+{dropped} similar suppressed)"
+                return True
+            if w[1] < self.burst:
+                w[1] += 1
+                return True
+            w[2] += 1
+            return False
 
 def get_logger():
-    global _logger
+    global _logger, _listener
     if _logger:
         return _logger
     logger = logging.getLogger("TextExpanderPy")
     logger.setLevel(logging.DEBUG)
-    fh = logging.FileHandler(LOG_FILE, encoding="utf-8")
+    # Callers (incl. the keyboard hook) only enqueue; a listener thread formats and writes
+    fh = RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                             encoding="utf-8", delay=True)
     fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
     fh.setFormatter(fmt)
-    logger.addHandler(fh)
+    q = queue.SimpleQueue()
+    qh = _DeferredQueueHandler(q)
+    qh.addFilter(RateLimitFilter())
+    logger.addHandler(qh)
+    logger.propagate = False
+    _listener = QueueListener(q, fh, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
     _logger = logger
-    return logger
\ No newline at end of file
+    return logger
+
+def stop_logging():
+    """Write out everything still queued and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
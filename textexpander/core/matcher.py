@@ -0,0 +1,220 @@
+import os
+import struct
+import zlib
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+_TRIE_MAGIC = b"TXTRIE01"
+_TRIE_HEADER = struct.Struct("=8sQQQQQQ")  # magic, stamp bytes, max depth, nodes, label chars, triggers, trigger bytes
+
+class TriggerTrie:
+    """Compiled trie over the typed trigger strings; immutable once built.
+
+    Stored as flat arrays rather than a dict per node, which kept hundreds
+    of MB alive for large libraries. Nodes are numbered breadth-first from
+    the sorted keys, so a node's children are the contiguous ids
+    first[node] .. first[node + 1] - 1 and `labels[c]` is the character on
+    the edge into child c: one step is a str.find over that range. About
+    nine bytes per node. Terminals are positions in `triggers`, which for
+    a packed library is its key sequence, so no trigger string is copied.
+    """
+
+    def __init__(self, triggers: Iterable[str], prefix: str = "/", require_prefix: bool = True):
+        self.prefix = prefix
+        self.require_prefix = require_prefix
+        if isinstance(triggers, Mapping) or not hasattr(triggers, "__getitem__"):
+            triggers = list(triggers)  # e.g. dict keys; the strings themselves stay shared
+        self.triggers: Sequence[str] = triggers
+        # typed key -> position in `triggers`; the first writer wins, e.g. "/x" as a prefixed trigger beats a bare "/x"
+        keys: Dict[str, int] = {}
+        for i, trigger in enumerate(triggers):
+            if not trigger:
+                continue
+            keys.setdefault(prefix + trigger, i)
+            if not require_prefix:
+                keys.setdefault(trigger, i)
+        self.first = array("I")        # node -> id of its first child; one extra entry closes the last range
+        self.terminal = array("i")     # node -> position in `triggers`, or -1
+        self.max_depth = max(map(len, keys), default=0)
+        self.labels = self._build(sorted(keys), keys)
+
+    def _build(self, keys: List[str], position: Dict[str, int]) -> str:
+        # one level at a time: the nodes at `depth` are runs of keys sharing their first `depth` chars
+        first, terminal = self.first, self.terminal
+        labels = ["\0"]  # the root has no incoming edge; a placeholder keeps ids and offsets aligned
+        los, his = array("I", [0]), array("I", [len(keys)])
+        depth = 0
+        while los:
+            next_los, next_his = array("I"), array("I")
+            for lo, hi in zip(los, his):
+                first.append(len(labels))
+                if lo < hi and len(keys[lo]) == depth:  # sorted: the run's own key comes first
+                    terminal.append(position[keys[lo]])
+                    lo += 1
+                else:
+                    terminal.append(-1)
+                while lo < hi:
+                    ch = keys[lo][depth]
+                    end = lo + 1
+                    while end < hi and keys[end][depth] == ch:
+                        end += 1
+                    labels.append(ch)
+                    next_los.append(lo)
+                    next_his.append(end)
+                    lo = end
+            los, his = next_los, next_his
+            depth += 1
+        first.append(len(labels))
+        return "".join(labels)
+
+    def __len__(self) -> int:
+        """Number of nodes."""
+        return len(self.terminal)
+
+    # ---- Cache file
+    def to_bytes(self, stamp: str) -> Optional[bytes]:
+        """The arrays plus the trigger strings; None if a trigger can't be stored (holds a NUL)."""
+        names = "\0".join(self.triggers)
+        if names.count("\0") != max(len(self.triggers) - 1, 0):
+            return None
+        sb, nb = stamp.encode("utf-8"), names.encode("utf-8")
+        header = _TRIE_HEADER.pack(_TRIE_MAGIC, len(sb), self.max_depth, len(self.terminal), len(self.labels),
+                                   len(self.triggers), len(nb))
+        return b"".join([header, sb, self.first.tobytes(), self.terminal.tobytes(),
+                         self.labels.encode("utf-32-le"), nb])
+
+    @classmethod
+    def from_bytes(cls, buf: bytes, stamp: str, prefix: str = "/", require_prefix: bool = True) -> "TriggerTrie":
+        """A trie saved by to_bytes() under the same `stamp`; ValueError if it doesn't fit."""
+        if len(buf) < _TRIE_HEADER.size:
+            raise ValueError("truncated trie")
+        magic, n_stamp, max_depth, nodes, n_labels, n_triggers, n_names = _TRIE_HEADER.unpack_from(buf, 0)
+        pos = _TRIE_HEADER.size
+        sizes = (n_stamp, 4 * (nodes + 1), 4 * nodes, 4 * n_labels, n_names)
+        if magic != _TRIE_MAGIC or pos + sum(sizes) != len(buf):
+            raise ValueError("not a trie for this library")
+        parts = []
+        for size in sizes:
+            parts.append(buf[pos:pos + size])
+            pos += size
+        if parts[0] != stamp.encode("utf-8"):
+            raise ValueError("not a trie for this library")
+        trie = cls.__new__(cls)
+        trie.prefix = prefix
+        trie.require_prefix = require_prefix
+        trie.first = array("I")
+        trie.first.frombytes(parts[1])
+        trie.terminal = array("i")
+        trie.terminal.frombytes(parts[2])
+        trie.labels = parts[3].decode("utf-32-le")
+        trie.triggers = parts[4].decode("utf-8").split("\0") if n_triggers else []
+        if len(trie.triggers) != n_triggers:
+            raise ValueError("damaged trie")
+        trie.max_depth = max_depth
+        return trie
+
+    def step(self, node: int, ch: str) -> Optional[int]:
+        """Child of `node` along the one-character `ch`, if any."""
+        i = self.labels.find(ch, self.first[node], self.first[node + 1])
+        return None if i < 0 else i
+
+    def trigger_at(self, node: int) -> Optional[str]:
+        t = self.terminal[node]
+        return None if t < 0 else self.triggers[t]
+
+def cached_trie(cache_dir: Path, stamp: str, build: Callable[[], TriggerTrie],
+                prefix: str = "/", require_prefix: bool = True) -> TriggerTrie:
+    """The trie `build()` returns, saved under `stamp` so the next start with the same library can load it.
+
+    `stamp` must change whenever the triggers, prefix or prefix rule do. Like
+    cached_pack, the file name is derived from the stamp, and damaged or
+    foreign files are rebuilt.
+    """
+    path = cache_dir / f"trie-{zlib.crc32(stamp.encode('utf-8')):08x}.trie"
+    try:
+        return TriggerTrie.from_bytes(path.read_bytes(), stamp, prefix, require_prefix)
+    except (OSError, ValueError, UnicodeDecodeError):
+        pass
+    trie = build()
+    data = trie.to_bytes(stamp)
+    if data is None:
+        return trie
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        for old in cache_dir.glob("trie-*.trie"):
+            if old != path:
+                old.unlink()
+    except OSError:
+        pass
+    return trie
+
+class TriggerMatcher:
+    """Typing state over a TriggerTrie, advanced one state per key.
+
+    The live state is a stack of node ids no deeper than the longest
+    trigger. Characters that fall off the trie only bump a counter, so
+    memory stays constant no matter how long the user types without a
+    boundary.
+    """
+
+    def __init__(self, trie: TriggerTrie):
+        self.trie = trie
+        self._first = trie.first
+        self._labels = trie.labels
+        self._terminal = trie.terminal
+        self._triggers = trie.triggers
+        self._stack: List[int] = [0]
+        self._dead = 0  # chars typed past the last valid trie node
+
+    # ---- State transitions
+    def reset(self):
+        del self._stack[1:]
+        self._dead = 0
+
+    def feed(self, ch: str) -> Optional[str]:
+        if self._dead:
+            self._dead += 1
+            return None
+        node = self._stack[-1]
+        nxt = self._labels.find(ch, self._first[node], self._first[node + 1])
+        if nxt < 0:
+            self._dead = 1
+            return None
+        self._stack.append(nxt)
+        t = self._terminal[nxt]
+        return None if t < 0 else self._triggers[t]
+
+    def can_feed(self, ch: str) -> bool:
+        if self._dead:
+            return False
+        node = self._stack[-1]
+        return self._labels.find(ch, self._first[node], self._first[node + 1]) >= 0
+
+    def backspace(self):
+        if self._dead:
+            self._dead -= 1
+        elif len(self._stack) > 1:
+            self._stack.pop()
+
+    # ---- Current state
+    @property
+    def match(self) -> Optional[str]:
+        """Trigger completed by the chars typed since the last boundary, if any."""
+        if self._dead:
+            return None
+        return self.trie.trigger_at(self._stack[-1])
+
+    @property
+    def node(self) -> Optional[int]:
+        """Current trie node, or None once the typed chars fell off the trie."""
+        return None if self._dead else self._stack[-1]
+
+    @property
+    def depth(self) -> int:
+        """Number of typed chars that make up the current match (prefix included)."""
+        return len(self._stack) - 1 + self._dead
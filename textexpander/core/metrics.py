@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Upper bucket bounds in microseconds; one overflow bucket follows the last bound
+BUCKETS_US = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 2_000, 5_000,
+              10_000, 20_000, 50_000, 100_000, 200_000, 500_000, 1_000_000)
+_BOUNDS_NS = tuple(b * 1000 for b in BUCKETS_US)
+
+# Engine stages, in pipeline order
+HOOK = "hook"            # whole keyboard-hook callback
+POLICY = "policy"        # foreground app / blacklist check
+LOOKUP = "lookup"        # trie step + match check for a typed char
+QUEUE_WAIT = "queue"     # job waiting for the expansion worker
+CLIPBOARD = "clipboard"  # clipboard save + copy before a paste
+INJECT = "inject"        # batched deletes + paste/typing + caret moves
+EXPAND = "expand"        # whole expansion on the worker
+STAGES = (HOOK, POLICY, LOOKUP, QUEUE_WAIT, CLIPBOARD, INJECT, EXPAND)
+
+class Histogram:
+    """Fixed-bucket latency histogram; observe() is a bisect and a few int adds."""
+    __slots__ = ("counts", "n", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.counts = [0] * (len(_BOUNDS_NS) + 1)
+        self.n = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def observe(self, ns: int):
+        self.counts[bisect_left(_BOUNDS_NS, ns)] += 1
+        self.n += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile_us(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile."""
+        if not self.n:
+            return 0.0
+        rank = p / 100.0 * self.n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return float(BUCKETS_US[i]) if i < len(BUCKETS_US) else self.max_ns / 1000.0
+        return self.max_ns / 1000.0
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.n,
+            "mean_us": round(self.total_ns / self.n / 1000.0, 2) if self.n else 0.0,
+            "p50_us": self.percentile_us(50),
+            "p99_us": self.percentile_us(99),
+            "max_us": round(self.max_ns / 1000.0, 2),
+            "buckets": dict(zip([str(b) for b in BUCKETS_US] + ["inf"], self.counts)),
+        }
+
+class Metrics:
+    """In-memory counters and per-stage histograms for the hot path.
+
+    Updates are plain attribute/list increments without a lock: a lost
+    increment under a thread race is acceptable for diagnostics, a lock on
+    the hook path is not.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.histograms: Dict[str, Histogram] = {s: Histogram() for s in STAGES}
+        self.counters: Dict[str, int] = {}
+        self._reset_lock = threading.Lock()
+
+    def observe(self, stage: str, ns: int):
+        self.histograms[stage].observe(ns)
+
+    def incr(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        with self._reset_lock:
+            self.histograms = {s: Histogram() for s in STAGES}
+            self.counters = {}
+
+    def snapshot(self) -> Dict:
+        return {
+            "stages": {s: h.summary() for s, h in self.histograms.items()},
+            "counters": dict(self.counters),
+        }
+
+    def stage_rows(self) -> List[Dict]:
+        return [dict(stage=s, **{k: v for k, v in h.summary().items() if k != "buckets"})
+                for s, h in self.histograms.items()]
+
+class StartupTimer:
+    """Startup milestones in ms since `origin` (a perf_counter() reading, ideally at process start)."""
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.marks: Dict[str, float] = {}
+
+    def mark(self, name: str) -> bool:
+        """Record a milestone once; False if it was already recorded."""
+        if name in self.marks:
+            return False
+        self.marks[name] = round((time.perf_counter() - self.origin) * 1000.0, 1)
+        return True
+
+    def report(self) -> str:
+        return ", ".join(f"{k} {v:.0f} ms" for k, v in self.marks.items())
+
+def export_json(path: Path, report: Dict):
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
@@ -0,0 +1,216 @@
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from collections.abc import ItemsView, KeysView, ValuesView
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+MAGIC = b"TXPACK01"
+_HEADER = struct.Struct("=8sQQ")  # magic, snippet count, hash slots
+PACK_MIN_SNIPPETS = 5000  # smaller libraries stay plain dicts; packing would not pay for itself
+
+class PackedSnippets(Mapping):
+    """Read-only trigger -> expansion mapping packed into one UTF-8 buffer.
+
+    Layout: header, then 2n+1 uint64 offsets, a uint32 open-addressing hash
+    table (crc32 of the trigger's UTF-8 bytes, linear probing, slot = index
+    + 1), then the blob "trigger0 expansion0 trigger1 expansion1 ...".
+    Nothing is decoded up front: a lookup hashes the key and compares bytes,
+    and strings are only created for the entries actually read. Opened from
+    a file the buffer is memory-mapped, so untouched expansions never count
+    against the process's resident memory. Iteration keeps insertion order.
+    """
+
+    def __init__(self, buf):
+        self._buf = buf  # bytes or mmap; the views below keep it alive too
+        size = len(buf)
+        if size < _HEADER.size:
+            raise ValueError("truncated snippet pack")
+        magic, n, slots = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("not a snippet pack")
+        # every section must fit in the file before anything is cast or indexed
+        start = _HEADER.size
+        if slots < 8 or slots & (slots - 1) or start + 8 * (2 * n + 1) + _pad8(4 * slots) > size:
+            raise ValueError("truncated snippet pack")
+        view = memoryview(buf)
+        self._n = n
+        self._mask = slots - 1
+        self._off = view[start:start + 8 * (2 * n + 1)].cast("Q")
+        start += 8 * (2 * n + 1)
+        self._table = view[start:start + 4 * slots].cast("I")
+        start += _pad8(4 * slots)
+        if start + self._off[2 * n] > len(buf):
+            raise ValueError("truncated snippet pack")
+        self._blob = view[start:]
+
+    # ---- Building / opening
+    @staticmethod
+    def pack(items: Iterable[Tuple[str, str]]) -> bytes:
+        offsets = [0]
+        chunks: List[bytes] = []
+        keys: List[bytes] = []
+        pos = 0
+        for k, v in items:
+            kb, vb = k.encode("utf-8"), v.encode("utf-8")
+            keys.append(kb)
+            chunks.append(kb)
+            chunks.append(vb)
+            pos += len(kb)
+            offsets.append(pos)
+            pos += len(vb)
+            offsets.append(pos)
+        n = len(keys)
+        slots = 8
+        while slots < 2 * n:
+            slots *= 2
+        mask = slots - 1
+        table = [0] * slots
+        crc = zlib.crc32
+        for i, kb in enumerate(keys, 1):
+            h = crc(kb) & mask
+            while table[h]:
+                h = (h + 1) & mask
+            table[h] = i
+        # native byte order, like the memoryview casts that read it back (the pack is a local cache)
+        table_bytes = array("I", table).tobytes()
+        return b"".join([_HEADER.pack(MAGIC, n, slots), array("Q", offsets).tobytes(),
+                         table_bytes, b"\0" * (_pad8(len(table_bytes)) - len(table_bytes))] + chunks)
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[str, str]]) -> "PackedSnippets":
+        """An in-memory pack (no file)."""
+        return cls(cls.pack(items))
+
+    @classmethod
+    def write(cls, path: Path, items: Iterable[Tuple[str, str]]) -> "PackedSnippets":
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(cls.pack(items))
+            f.flush()
+            os.fsync(f.fileno())  # never rename a pack into place before its bytes are on disk
+        os.replace(tmp, path)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path: Path) -> "PackedSnippets":
+        with open(path, "rb") as f:
+            # the mapping stays valid after the file object is closed
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    # ---- Mapping
+    def _find(self, key: str) -> int:
+        kb = key.encode("utf-8")
+        off, table, blob, mask = self._off, self._table, self._blob, self._mask
+        h = zlib.crc32(kb) & mask
+        while True:
+            i = table[h]
+            if not i:
+                return -1
+            a, b = off[2 * i - 2], off[2 * i - 1]
+            if b - a == len(kb) and blob[a:b] == kb:
+                return i - 1
+            h = (h + 1) & mask
+
+    def _str(self, a: int, b: int) -> str:
+        return str(self._blob[a:b], "utf-8")
+
+    def __getitem__(self, key: str) -> str:
+        i = self._find(key) if isinstance(key, str) else -1
+        if i < 0:
+            raise KeyError(key)
+        return self._str(self._off[2 * i + 1], self._off[2 * i + 2])
+
+    def get(self, key, default=None):
+        i = self._find(key) if isinstance(key, str) else -1
+        return default if i < 0 else self._str(self._off[2 * i + 1], self._off[2 * i + 2])
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self._find(key) >= 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __iter__(self) -> Iterator[str]:
+        blob, off = self._blob, self._off
+        for i in range(0, 2 * self._n, 2):
+            yield str(blob[off[i]:off[i + 1]], "utf-8")
+
+    def keys(self):
+        return _PackedKeys(self)
+
+    def items(self):
+        return _PackedItems(self)
+
+    def values(self):
+        return _PackedValues(self)
+
+    def _iter_items(self) -> Iterator[Tuple[str, str]]:
+        blob = self._blob
+        offsets = iter(self._off)
+        a = next(offsets)
+        for b in offsets:
+            c = next(offsets)
+            yield str(blob[a:b], "utf-8"), str(blob[b:c], "utf-8")
+            a = c
+
+class _PackedKeys(KeysView):
+    """Also indexable by position, so a trie can point at triggers instead of copying them."""
+
+    def __getitem__(self, i: int) -> str:
+        m = self._mapping
+        if not 0 <= i < m._n:
+            raise IndexError(i)
+        return m._str(m._off[2 * i], m._off[2 * i + 1])
+
+class _PackedItems(ItemsView):
+    def __iter__(self):
+        return self._mapping._iter_items()  # one sequential pass, no per-key lookups
+
+class _PackedValues(ValuesView):
+    def __iter__(self):
+        return (v for _, v in self._mapping._iter_items())
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+def cached_pack(sources: List[Path], cache_dir: Path, load: Callable[[], Dict[str, str]],
+                min_size: Optional[int] = None, name: str = "snippets") -> Mapping[str, str]:
+    """The library in `sources` as a packed mapping, reusing an earlier pack when they are unchanged.
+
+    The pack's file name is derived from the sources' size and mtime, so a
+    stale pack is never opened and a live one is never overwritten (Windows
+    can't replace a mapped file). Libraries under `min_size` (default
+    PACK_MIN_SNIPPETS) are returned as the dict `load()` produced. Each
+    library gets its own `name` in the cache directory.
+    """
+    stamp = []
+    for p in sources:
+        try:
+            st = p.stat()
+            stamp.append(f"{p.name}:{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            stamp.append(f"{p.name}:-")
+    path = cache_dir / f"{name}-{zlib.crc32('|'.join(stamp).encode('utf-8')):08x}.pack"
+    if path.exists():
+        try:
+            return PackedSnippets.open(path)
+        except (OSError, ValueError, TypeError, struct.error):
+            pass  # damaged (e.g. cut short by a crash): rebuild below
+    data = load()
+    if len(data) < (PACK_MIN_SNIPPETS if min_size is None else min_size):
+        return data
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        packed = PackedSnippets.write(path, data.items())
+    except OSError:
+        return data
+    for old in cache_dir.glob(f"{name}-*.pack"):
+        if old != path:
+            try:
+                old.unlink()
+            except OSError:
+                pass  # still mapped by another instance; removed next time
+    return packed
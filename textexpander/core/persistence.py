@@ -0,0 +1,100 @@
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from .storage import write_text_atomic
+
+class PersistenceService:
+    """Background writer that coalesces bursts of saves.
+
+    Jobs are keyed (usually by file path); a job submitted while an older
+    one with the same key is still waiting replaces it, and a job runs
+    once its key has been quiet for `debounce` seconds. Jobs run one at a
+    time on the writer thread, or on the caller's thread in flush(). A job
+    is taken out of the queue and run under the same lock, so a flush can
+    never run a newer job for a key before an older one that was already
+    picked up.
+    """
+
+    def __init__(self, debounce: float = 0.3, logger=None):
+        self.debounce = debounce
+        self.logger = logger
+        self._jobs: Dict[str, Tuple[float, Callable[[], None]]] = {}  # key -> (due time, job)
+        self._cond = threading.Condition()
+        self._run_lock = threading.Lock()  # one job at a time, writer thread or flush()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, key: str, job: Callable[[], None], delay: Optional[float] = None):
+        """Run `job` once `key` has been quiet for `delay` (default: the debounce) seconds."""
+        with self._cond:
+            self._jobs[key] = (time.monotonic() + (self.debounce if delay is None else delay), job)
+            self._cond.notify()
+
+    def write_text(self, path: Path, text: str):
+        """Atomically replace `path` with `text` once writes to it settle."""
+        self.submit(str(path), lambda: write_text_atomic(path, text))
+
+    def pending(self, key: str) -> bool:
+        """True while a job for `key` is waiting to run."""
+        with self._cond:
+            return key in self._jobs
+
+    def flush(self):
+        """Run everything still waiting, now, on the calling thread."""
+        with self._run_lock:
+            with self._cond:
+                jobs = [job for _, job in self._jobs.values()]
+                self._jobs.clear()
+            for job in jobs:
+                self._execute(job)
+
+    def stop(self):
+        self.flush()
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._jobs:
+                        wait = min(due for due, _ in self._jobs.values()) - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                if self._stopped:
+                    return
+                now = time.monotonic()
+                due = [k for k, (t, _) in self._jobs.items() if t <= now]
+            for key in due:
+                with self._run_lock:
+                    with self._cond:
+                        # gone if a flush ran it meanwhile; not due any more if it was submitted again
+                        entry = self._jobs.get(key)
+                        if entry is None or entry[0] > time.monotonic():
+                            continue
+                        del self._jobs[key]
+                    self._execute(entry[1])
+
+    def _execute(self, job: Callable[[], None]):
+        # callers hold _run_lock
+        try:
+            job()
+        except Exception as e:
+            if self.logger:
+                self.logger.error("Background write failed: %s", e)
+
+_service: Optional[PersistenceService] = None
+_service_lock = threading.Lock()
+
+def get_persistence() -> PersistenceService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = PersistenceService()
+        return _service
@@ -0,0 +1,38 @@
+"""OS services behind one interface: keyboard hook, key output, clipboard, foreground window.
+
+Platform modules import their OS libraries lazily, so any of them can be
+imported anywhere; `get_platform()` picks the one for this host.
+"""
+import os
+import sys
+from .base import ForegroundTracker, KeyboardInput, Platform
+
+__all__ = ["ForegroundTracker", "KeyboardInput", "Platform", "get_platform", "set_platform"]
+
+PLATFORM_ENV = "QUICKKEYS_PLATFORM"  # "windows", "linux" or "fake"; overrides detection
+
+_platform = None
+
+def _create(name: str) -> Platform:
+    if name == "windows":
+        from .windows import WindowsPlatform
+        return WindowsPlatform()
+    if name == "fake":
+        from .fake import FakePlatform
+        return FakePlatform()
+    from .linux import LinuxPlatform
+    return LinuxPlatform()
+
+def get_platform() -> Platform:
+    global _platform
+    if _platform is None:
+        name = os.environ.get(PLATFORM_ENV, "").strip().lower()
+        if not name:
+            name = "windows" if sys.platform == "win32" else "linux"
+        _platform = _create(name)
+    return _platform
+
+def set_platform(platform: Platform):
+    """Replace the process-wide platform (before the engine is created)."""
+    global _platform
+    _platform = platform
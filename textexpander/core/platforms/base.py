@@ -0,0 +1,80 @@
+from typing import Callable, Optional
+from ..app_detector import ForegroundBackend
+from ..clipboard import ClipboardBackend
+from ..injector import OutputBackend
+
+KeyCallback = Callable[[object], bool]  # keyboard event -> False to swallow it
+ForegroundListener = Callable[[str, str], None]  # (lowercased process name, window title)
+
+class KeyboardInput:
+    """Global keyboard hook and hotkeys."""
+
+    def hook(self, callback: KeyCallback, suppress: bool = True):
+        raise NotImplementedError
+
+    def add_hotkey(self, combo: str, callback: Callable[[], None]):
+        raise NotImplementedError
+
+    def send(self, combo: str):
+        raise NotImplementedError
+
+    def unhook_all(self):
+        pass
+
+class KeyboardLibInput(KeyboardInput):
+    """The `keyboard` package (Windows; Linux needs root or the input group)."""
+
+    def __init__(self):
+        import keyboard
+        self._kb = keyboard
+
+    def hook(self, callback: KeyCallback, suppress: bool = True):
+        self._kb.hook(callback, suppress=suppress)
+
+    def add_hotkey(self, combo: str, callback: Callable[[], None]):
+        self._kb.add_hotkey(combo, callback)
+
+    def send(self, combo: str):
+        self._kb.send(combo)
+
+    def unhook_all(self):
+        self._kb.unhook_all()
+
+class ForegroundTracker:
+    """Pushes the foreground window to a listener whenever it changes.
+
+    start() reports the current window right away, then one call per
+    change (a new foreground window, or its title changing), on the
+    tracker's own thread. Trackers that can't subscribe to anything
+    return False from start(); the caller keeps polling then.
+    """
+
+    def start(self, listener: ForegroundListener) -> bool:
+        return False
+
+    def stop(self):
+        pass
+
+class Platform:
+    """The OS services the engine uses, one object per platform.
+
+    Each service is created on first request, so importing or choosing a
+    platform never loads an optional dependency it does not use.
+    """
+    name = "base"
+
+    def keyboard(self) -> KeyboardInput:
+        raise NotImplementedError
+
+    def output(self) -> OutputBackend:
+        raise NotImplementedError
+
+    def clipboard(self) -> ClipboardBackend:
+        raise NotImplementedError
+
+    def foreground_backend(self) -> ForegroundBackend:
+        """On-demand foreground queries (used while no tracker is running)."""
+        return ForegroundBackend()
+
+    def foreground_tracker(self) -> Optional[ForegroundTracker]:
+        return None
@@ -0,0 +1,98 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from ..app_detector import ForegroundBackend, StaticForegroundBackend
+from ..clipboard import ClipboardBackend, MemoryClipboardBackend
+from ..injector import OutputBackend, RecordingBackend
+from .base import ForegroundListener, ForegroundTracker, KeyboardInput, KeyCallback, Platform
+
+KEY_NAMES = {" ": "space", "\n": "enter", "\t": "tab", "\b": "backspace"}
+
+class FakeKeyEvent:
+    """The fields the engine reads off a `keyboard` event."""
+
+    def __init__(self, name: str, event_type: str = "down"):
+        self.name = name
+        self.event_type = event_type
+
+class FakeKeyboard(KeyboardInput):
+    """Keys are fed in with press()/type(); what the hook swallowed is counted."""
+
+    def __init__(self):
+        self._hooks: List[KeyCallback] = []
+        self.hotkeys: Dict[str, Callable[[], None]] = {}
+        self.sent: List[str] = []
+        self.swallowed = 0
+
+    def hook(self, callback: KeyCallback, suppress: bool = True):
+        self._hooks.append(callback)
+
+    def add_hotkey(self, combo: str, callback: Callable[[], None]):
+        self.hotkeys[combo] = callback
+
+    def send(self, combo: str):
+        self.sent.append(combo)
+
+    def unhook_all(self):
+        self._hooks.clear()
+        self.hotkeys.clear()
+
+    def press(self, name: str) -> bool:
+        """One key down/up; False if a hook swallowed the down event."""
+        passed = True
+        for event_type in ("down", "up"):
+            event = FakeKeyEvent(name, event_type)
+            for cb in self._hooks:
+                if cb(event) is False:
+                    if event_type == "down":
+                        passed = False
+                        self.swallowed += 1
+                    break
+        return passed
+
+    def type(self, text: str):
+        for ch in text:
+            self.press(KEY_NAMES.get(ch, ch))
+
+class FakeForegroundTracker(ForegroundTracker):
+    """Foreground changes are whatever switch() says, delivered synchronously."""
+
+    def __init__(self, process_name: str = "", title: str = ""):
+        self.current: Tuple[str, str] = (process_name, title)
+        self._listener: Optional[ForegroundListener] = None
+
+    def start(self, listener: ForegroundListener) -> bool:
+        self._listener = listener
+        listener(*self.current)
+        return True
+
+    def stop(self):
+        self._listener = None
+
+    def switch(self, process_name: str, title: str = ""):
+        self.current = (process_name, title)
+        if self._listener is not None:
+            self._listener(process_name, title)
+
+class FakePlatform(Platform):
+    """In-memory services for headless runs and tests; no OS access at all."""
+    name = "fake"
+
+    def __init__(self, process_name: str = "", title: str = ""):
+        self.keys = FakeKeyboard()
+        self.recorder = RecordingBackend()
+        self.memory_clipboard = MemoryClipboardBackend()
+        self.tracker = FakeForegroundTracker(process_name, title)
+
+    def keyboard(self) -> KeyboardInput:
+        return self.keys
+
+    def output(self) -> OutputBackend:
+        return self.recorder
+
+    def clipboard(self) -> ClipboardBackend:
+        return self.memory_clipboard
+
+    def foreground_backend(self) -> ForegroundBackend:
+        return StaticForegroundBackend(*self.tracker.current)
+
+    def foreground_tracker(self) -> Optional[ForegroundTracker]:
+        return self.tracker
@@ -0,0 +1,141 @@
+import threading
+from typing import Optional, Tuple
+from ..app_detector import ForegroundBackend
+from ..clipboard import ClipboardBackend, PyperclipBackend
+from ..injector import KeyboardLibBackend, OutputBackend
+from .base import ForegroundListener, ForegroundTracker, KeyboardInput, KeyboardLibInput, Platform
+
+class X11ForegroundBackend(ForegroundBackend):
+    """_NET_ACTIVE_WINDOW via python-xlib; process names from _NET_WM_PID + psutil."""
+
+    def __init__(self):
+        from Xlib import X, display
+        import psutil
+        self._X = X
+        self._psutil = psutil
+        self.display = display.Display()
+        self.root = self.display.screen().root
+        atom = self.display.intern_atom
+        self.NET_ACTIVE_WINDOW = atom("_NET_ACTIVE_WINDOW")
+        self.NET_WM_NAME = atom("_NET_WM_NAME")
+        self.NET_WM_PID = atom("_NET_WM_PID")
+        self.UTF8_STRING = atom("UTF8_STRING")
+
+    def foreground_window(self) -> int:
+        prop = self.root.get_full_property(self.NET_ACTIVE_WINDOW, self._X.AnyPropertyType)
+        return int(prop.value[0]) if prop is not None and len(prop.value) else 0
+
+    def _window(self, wid: int):
+        return self.display.create_resource_object("window", wid)
+
+    def window_pid(self, hwnd: int) -> int:
+        try:
+            prop = self._window(hwnd).get_full_property(self.NET_WM_PID, self._X.AnyPropertyType)
+            return int(prop.value[0]) if prop is not None and len(prop.value) else 0
+        except Exception:
+            return 0
+
+    def window_title(self, hwnd: int) -> str:
+        try:
+            prop = self._window(hwnd).get_full_property(self.NET_WM_NAME, self.UTF8_STRING)
+            if prop is None:
+                return self._window(hwnd).get_wm_name() or ""
+            value = prop.value
+            return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+        except Exception:
+            return ""
+
+    def process_name(self, pid: int) -> str:
+        if not pid:
+            return ""
+        try:
+            return (self._psutil.Process(pid).name() or "").lower()
+        except Exception:
+            return ""
+
+    def process_started(self, pid: int) -> float:
+        try:
+            return self._psutil.Process(pid).create_time() if pid else 0.0
+        except Exception:
+            return 0.0
+
+class X11ForegroundTracker(ForegroundTracker):
+    """PropertyNotify on the root window's _NET_ACTIVE_WINDOW and the active window's title."""
+
+    def __init__(self, backend: Optional[X11ForegroundBackend] = None):
+        self.backend = backend or X11ForegroundBackend()
+        self._listener: Optional[ForegroundListener] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._active = 0
+        self._last: Tuple[str, str] = ("", "")
+
+    def start(self, listener: ForegroundListener) -> bool:
+        X = self.backend._X
+        self._listener = listener
+        self.backend.root.change_attributes(event_mask=X.PropertyChangeMask)
+        self._refresh()
+        self._thread = threading.Thread(target=self._run, name="foreground-events", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def _refresh(self):
+        b = self.backend
+        wid = b.foreground_window()
+        if wid != self._active:
+            if wid:
+                try:  # title changes arrive as PropertyNotify on the window itself
+                    b._window(wid).change_attributes(event_mask=b._X.PropertyChangeMask)
+                except Exception:
+                    pass
+            self._active = wid
+        context = (b.process_name(b.window_pid(wid)), b.window_title(wid)) if wid else ("", "")
+        if context != self._last:
+            self._last = context
+            self._listener(*context)
+
+    def _run(self):
+        b = self.backend
+        watched = (b.NET_ACTIVE_WINDOW, b.NET_WM_NAME)
+        while not self._stop.is_set():
+            if not b.display.pending_events():
+                self._stop.wait(0.05)
+                continue
+            event = b.display.next_event()
+            if getattr(event, "atom", None) in watched:
+                try:
+                    self._refresh()
+                except Exception:
+                    pass
+
+class LinuxPlatform(Platform):
+    """`keyboard` for input and output, pyperclip, and X11 for the foreground window.
+
+    Without python-xlib or an X display (Wayland, headless) the foreground
+    is unknown: only rules that don't depend on the app apply.
+    """
+    name = "linux"
+
+    def keyboard(self) -> KeyboardInput:
+        return KeyboardLibInput()
+
+    def output(self) -> OutputBackend:
+        return KeyboardLibBackend()
+
+    def clipboard(self) -> ClipboardBackend:
+        return PyperclipBackend()
+
+    def foreground_backend(self) -> ForegroundBackend:
+        try:
+            return X11ForegroundBackend()
+        except Exception:
+            return ForegroundBackend()
+
+    def foreground_tracker(self) -> Optional[ForegroundTracker]:
+        try:
+            return X11ForegroundTracker()
+        except Exception:
+            return None
@@ -0,0 +1,112 @@
+import threading
+from typing import Optional
+from ..app_detector import ForegroundBackend, ProcessNames, Win32ForegroundBackend
+from ..clipboard import ClipboardBackend, PyperclipBackend
+from ..injector import OutputBackend, SendInputBackend
+from .base import ForegroundListener, ForegroundTracker, KeyboardInput, KeyboardLibInput, Platform
+
+EVENT_SYSTEM_FOREGROUND = 0x0003
+EVENT_OBJECT_NAMECHANGE = 0x800C
+WINEVENT_OUTOFCONTEXT = 0x0000
+OBJID_WINDOW = 0
+WM_QUIT = 0x0012
+
+class WinEventForegroundTracker(ForegroundTracker):
+    """Foreground changes from SetWinEventHook instead of polling.
+
+    A dedicated thread registers out-of-context hooks for foreground
+    switches and window title changes and runs the message loop they are
+    delivered through. Title changes of other windows are dropped after
+    one integer compare. Our own windows are reported too, so focusing the
+    manager never leaves the previous app's context in place. Process
+    names come from the same Win32 backend the poller uses, memoized per
+    PID and creation time.
+    """
+
+    def __init__(self, backend: Optional[Win32ForegroundBackend] = None):
+        self.backend = backend or Win32ForegroundBackend()
+        self._listener: Optional[ForegroundListener] = None
+        self._thread: Optional[threading.Thread] = None
+        self._thread_id = 0
+        self._ready = threading.Event()
+        self._ok = False
+        self._hwnd = 0
+        self._name = ""
+        self._names = ProcessNames(self.backend)
+
+    def start(self, listener: ForegroundListener) -> bool:
+        self._listener = listener
+        self._thread = threading.Thread(target=self._run, name="foreground-events", daemon=True)
+        self._thread.start()
+        self._ready.wait(2.0)
+        return self._ok
+
+    def stop(self):
+        if self._thread_id:
+            import ctypes
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+
+    def _run(self):
+        import ctypes
+        import ctypes.wintypes as wt
+        user32 = ctypes.windll.user32
+        WinEventProc = ctypes.WINFUNCTYPE(None, wt.HANDLE, wt.DWORD, wt.HWND, wt.LONG, wt.LONG, wt.DWORD, wt.DWORD)
+        user32.SetWinEventHook.restype = wt.HANDLE
+        user32.SetWinEventHook.argtypes = [wt.DWORD, wt.DWORD, wt.HMODULE, WinEventProc, wt.DWORD, wt.DWORD, wt.DWORD]
+        user32.UnhookWinEvent.argtypes = [wt.HANDLE]
+        proc = WinEventProc(self._on_event)  # referenced until the hooks are gone
+        hooks = [user32.SetWinEventHook(event, event, None, proc, 0, 0, WINEVENT_OUTOFCONTEXT)
+                 for event in (EVENT_SYSTEM_FOREGROUND, EVENT_OBJECT_NAMECHANGE)]
+        self._thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+        self._ok = all(hooks)
+        if self._ok:
+            self._report(self.backend.foreground_window())
+        self._ready.set()
+        try:
+            msg = wt.MSG()
+            while self._ok and user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            for h in hooks:
+                if h:
+                    user32.UnhookWinEvent(h)
+            self._thread_id = 0
+
+    def _on_event(self, hook, event, hwnd, id_object, id_child, thread, when):
+        if event == EVENT_OBJECT_NAMECHANGE and (id_object != OBJID_WINDOW or hwnd != self._hwnd):
+            return  # some other window (or a control inside one) was renamed
+        try:
+            self._report(hwnd or 0)
+        except Exception:
+            pass  # never raise into the OS callback
+
+    def _report(self, hwnd: int):
+        b = self.backend
+        if not hwnd:
+            self._hwnd, self._name = 0, ""
+            self._listener("", "")
+            return
+        if hwnd != self._hwnd:  # a title change keeps the window, and so the process
+            self._name = self._names.get(b.window_pid(hwnd))
+            self._hwnd = hwnd
+        self._listener(self._name, b.window_title(hwnd))
+
+class WindowsPlatform(Platform):
+    """user32 SendInput for output, WinEvent hooks for the foreground window."""
+    name = "windows"
+
+    def keyboard(self) -> KeyboardInput:
+        return KeyboardLibInput()
+
+    def output(self) -> OutputBackend:
+        return SendInputBackend()
+
+    def clipboard(self) -> ClipboardBackend:
+        return PyperclipBackend()
+
+    def foreground_backend(self) -> ForegroundBackend:
+        return Win32ForegroundBackend()
+
+    def foreground_tracker(self) -> Optional[ForegroundTracker]:
+        return WinEventForegroundTracker()
@@ -0,0 +1,128 @@
+import re
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Pattern, Sequence, Tuple
+
+# (allowed, reason); cached per (process, title), so the same tuple comes back while the window stays
+Decision = Tuple[bool, str]
+
+TITLE_FLAGS = re.I | re.S
+MAX_MEMO = 4096  # distinct (process, title) pairs kept; titles churn (browser tabs, unsaved markers)
+
+class AppPolicy:
+    """Where expansion is allowed, compiled once from Settings.
+
+    Decided in this order, first match wins:
+      1. blacklisted process -> blocked
+      2. app rules ({"app": "putty.exe" or "*", "title": regex, "allow": bool}), in list order
+      3. per-app override for the process
+      4. a blocked title pattern -> blocked
+      5. allowed
+    Title patterns are case-insensitive regular expressions, searched
+    anywhere in the title. Each step is a set/dict lookup or one combined
+    regex, and whole decisions are memoized per (process, title).
+    Patterns that don't compile are skipped and listed in `errors`.
+    """
+
+    def __init__(self, blacklist: Sequence[str] = (), overrides: Optional[Mapping[str, bool]] = None,
+                 blocked_titles: Sequence[str] = (), rules: Sequence[Mapping[str, Any]] = ()):
+        self.errors: List[str] = []
+        self._blacklist: FrozenSet[str] = frozenset(p.strip().lower() for p in blacklist if p.strip())
+        self._overrides: Dict[str, bool] = {k.lower(): bool(v) for k, v in (overrides or {}).items()}
+        titles = [p for p in blocked_titles if self._valid(p)]
+        self._blocked = _FirstMatch(titles) if titles else None
+
+        # per app: (first-match finder, [(allow, reason)]); "*" rules apply after the app's own
+        grouped: Dict[str, List[Tuple[str, str, bool]]] = {}
+        for rule in rules:
+            app = str(rule.get("app") or "*").strip().lower()
+            title = str(rule.get("title") or "")
+            if title and not self._valid(title):
+                continue
+            grouped.setdefault(app, []).append((app, title, bool(rule.get("allow", False))))
+        wildcard = grouped.pop("*", [])
+        self._rules: Dict[str, Tuple[_FirstMatch, List[Decision]]] = {
+            app: _compile_rules(app_rules + wildcard) for app, app_rules in grouped.items()}
+        self._any_rules = _compile_rules(wildcard) if wildcard else None
+        self._memo: Dict[Tuple[str, str], Decision] = {}
+
+    @classmethod
+    def from_settings(cls, settings) -> "AppPolicy":
+        return cls(settings.blacklist_process_names, settings.per_app_overrides,
+                   settings.blocked_title_patterns, settings.app_rules)
+
+    def _valid(self, pattern: str) -> bool:
+        try:
+            re.compile(pattern, TITLE_FLAGS)
+            return True
+        except re.error as e:
+            self.errors.append(f"{pattern!r}: {e}")
+            return False
+
+    def decide(self, proc: str, title: str) -> Decision:
+        key = (proc, title)
+        d = self._memo.get(key)
+        if d is None:
+            if len(self._memo) >= MAX_MEMO:
+                self._memo.clear()
+            d = self._memo[key] = self._decide(proc, title)
+        return d
+
+    def allowed(self, proc: str, title: str) -> bool:
+        return self.decide(proc, title)[0]
+
+    def _decide(self, proc: str, title: str) -> Decision:
+        if proc in self._blacklist:
+            return (False, "blacklisted process")
+        compiled = self._rules.get(proc) or self._any_rules
+        if compiled is not None:
+            found = compiled[0].find(title)
+            if found is not None:
+                return compiled[1][found[0]]
+        if proc in self._overrides:
+            return (self._overrides[proc], "per-app override")
+        if self._blocked is not None:
+            found = self._blocked.find(title)
+            if found is not None:
+                return (False, f"title matches {found[1]!r}")
+        return (True, "default")
+
+def _compile_rules(rules: List[Tuple[str, str, bool]]) -> Tuple["_FirstMatch", List[Decision]]:
+    decisions = [(allow, f"rule {app} /{title}/" if title else f"rule {app}") for app, title, allow in rules]
+    return _FirstMatch([title for _, title, _ in rules]), decisions
+
+_LEADING_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+_BACKREF = re.compile(r"\\[1-9]|\(\?P=")
+
+class _FirstMatch:
+    """Index (and matched text) of the first pattern found in a title.
+
+    Patterns are searched case-insensitively and in list order. When they
+    can share one regex, each becomes a lookahead alternative from the
+    start of the title, so one match call finds the first pattern that
+    matches anywhere, as a loop over them would. Patterns that can't be
+    combined (numbered backreferences, clashing group names) are searched
+    one by one instead.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self._each: List[Pattern] = [re.compile(p, TITLE_FLAGS) for p in patterns]
+        self._combined: Optional[Pattern] = None
+        if not any(_BACKREF.search(p) for p in patterns):
+            # leading global flags like (?i) are only legal at the very start; scope them to their pattern
+            scoped = [_LEADING_FLAGS.sub(r"(?\1:", p) + ")" if _LEADING_FLAGS.match(p) else p for p in patterns]
+            alternatives = [f"(?=.*?(?P<r{i}>{p}))" for i, p in enumerate(scoped)]
+            try:
+                self._combined = re.compile("|".join(alternatives), TITLE_FLAGS)
+            except re.error:
+                pass
+
+    def find(self, title: str) -> Optional[Tuple[int, str]]:
+        if self._combined is not None:
+            m = self._combined.match(title)
+            if m is None:
+                return None
+            return int(m.lastgroup[1:]), m.group(m.lastgroup)
+        for i, rx in enumerate(self._each):
+            m = rx.search(title)
+            if m is not None:
+                return i, m.group(0)
+        return None
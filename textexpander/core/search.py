@@ -0,0 +1,144 @@
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+GRAM = 3
+
+class SnippetSearchIndex:
+    """Inverted n-gram index over lowercase triggers and expansion text.
+
+    Each entry gets an integer id; postings are compact `array('I')` lists
+    of ids, ascending. Triggers are short, so all their 1-3 grams are
+    indexed and any trigger query is a postings lookup; expansions get
+    trigrams only, so queries shorter than a trigram match triggers only.
+    Edits are incremental: a changed entry is tombstoned and re-added under
+    a new id, and the index rebuilds itself once tombstones outnumber live
+    entries. Candidates come from the shortest postings list and are
+    verified with a substring check; with a `limit` the expansion pass stops
+    as soon as it has enough.
+    """
+
+    def __init__(self, data: Optional[Dict[str, str]] = None):
+        self._entries: List[Optional[Tuple[str, str, str]]] = []  # (trigger, lower trigger, lower body)
+        self._ids: Dict[str, int] = {}
+        self._trigger_postings: Dict[str, array] = {}
+        self._body_postings: Dict[str, array] = {}
+        self._dead = 0
+        if data:
+            for k, v in data.items():
+                self.add(k, v)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    # ---- Maintenance
+    def add(self, trigger: str, expansion: str):
+        if trigger in self._ids:
+            self.remove(trigger)
+        lt = trigger.lower()
+        lb = expansion.lower()
+        eid = len(self._entries)
+        self._entries.append((trigger, lt, lb))
+        self._ids[trigger] = eid
+        grams = {lt[i:i + n] for n in range(1, GRAM + 1) for i in range(len(lt) - n + 1)}
+        _post(self._trigger_postings, grams, eid)
+        _post(self._body_postings, _trigrams(lb), eid)
+
+    def remove(self, trigger: str):
+        eid = self._ids.pop(trigger, None)
+        if eid is None:
+            return
+        self._entries[eid] = None
+        self._dead += 1
+        if self._dead > max(1024, len(self._ids)):
+            self._rebuild()
+
+    def update(self, old: Dict[str, str], new: Dict[str, str]):
+        """Apply the difference between two versions of the library."""
+        for k in old:
+            if k not in new:
+                self.remove(k)
+        for k, v in new.items():
+            if old.get(k) != v:
+                self.add(k, v)
+
+    def _rebuild(self):
+        live = [e for e in self._entries if e is not None]
+        self._entries, self._ids, self._dead = [], {}, 0
+        self._trigger_postings, self._body_postings = {}, {}
+        for trigger, _, lb in live:
+            self.add(trigger, lb)  # lowering is idempotent, so the stored body is enough
+
+    # ---- Queries
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Matching triggers, best first: trigger prefix, trigger substring, then body."""
+        q = query.strip().lower()
+        if not q:
+            return [e[0] for e in self._entries if e is not None][:limit]
+        entries = self._entries
+
+        starts: List[Tuple[int, str]] = []
+        inside: List[str] = []
+        matched: Set[int] = set()
+        for eid in self._trigger_candidates(q):
+            e = entries[eid]
+            if e is None:
+                continue
+            pos = e[1].find(q)
+            if pos < 0:
+                continue
+            matched.add(eid)
+            if pos == 0:
+                starts.append((len(e[0]), e[0]))
+            else:
+                inside.append(e[0])
+        starts.sort()
+        ranked = [t for _, t in starts] + inside
+        if limit is not None and len(ranked) >= limit:
+            return ranked[:limit]
+
+        if len(q) < GRAM:
+            return ranked  # expansions are only indexed by trigrams
+        candidates = self._body_candidates(q)
+        if limit is None:
+            # one comprehension instead of a loop: a common word can match most of the library
+            if matched:
+                candidates = [eid for eid in candidates if eid not in matched]
+            ranked += [e[0] for e in map(entries.__getitem__, candidates) if e is not None and q in e[2]]
+            return ranked
+        for eid in candidates:
+            e = entries[eid]
+            if e is None or eid in matched or q not in e[2]:
+                continue
+            ranked.append(e[0])
+            if len(ranked) >= limit:
+                break
+        return ranked
+
+    def _trigger_candidates(self, q: str) -> Iterable[int]:
+        if len(q) <= GRAM:
+            return self._trigger_postings.get(q, ())
+        return _shortest([self._trigger_postings.get(g) for g in _trigrams(q)])
+
+    def _body_candidates(self, q: str) -> Iterable[int]:
+        return _shortest([self._body_postings.get(g) for g in _trigrams(q)])
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+def _post(postings: Dict[str, array], grams: Iterable[str], eid: int):
+    for g in grams:
+        p = postings.get(g)
+        if p is None:
+            p = postings[g] = array("I")
+        p.append(eid)
+
+def _shortest(lists: List[Optional[array]]) -> Iterable[int]:
+    """Candidates for a query made of these grams' postings.
+
+    Every candidate is verified with a substring check anyway, and that is
+    cheaper than intersecting the lists first: walking the shortest one, in
+    id order, also lets a limited query stop early.
+    """
+    if not lists or any(p is None for p in lists):
+        return ()
+    return min(lists, key=len)
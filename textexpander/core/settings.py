@@ -1,28 +1,55 @@
 import json
 from dataclasses import dataclass, asdict, field
-from typing import Dict, List
+from typing import Any, Dict, List
 from .config import SETTINGS_FILE
+from .persistence import get_persistence
 
 @dataclass
 class Settings:
     enabled: bool = True
     expand_on_tab: bool = False
     trigger_prefix: str = "/"
+    require_prefix: bool = True  # False also matches bare triggers at a word start
     blacklist_process_names: List[str] = field(default_factory=lambda: ["keepass.exe", "1password.exe"])
     per_app_overrides: Dict[str, bool] = field(default_factory=dict)  # {"notepad.exe": True/False}
+    # Case-insensitive regexes; a matching window title blocks expansion unless a rule/override allows it
+    blocked_title_patterns: List[str] = field(default_factory=lambda: ["password", "signin", "login"])
+    # First match wins, before overrides: [{"app": "putty.exe" or "*", "title": "regex", "allow": False}]
+    app_rules: List[Dict[str, Any]] = field(default_factory=list)
     logging_enabled: bool = False
+    expansion_mode: str = "auto"  # "auto" | "type" | "paste"
+    per_app_expansion_modes: Dict[str, str] = field(default_factory=dict)  # {"putty.exe": "type"}
+    clipboard_restore_delay_ms: int = 300  # wait before putting the user's clipboard back
+    metrics_enabled: bool = True  # in-memory latency histograms (Diagnostics tab)
+    completion_enabled: bool = False  # suggest triggers while one is being typed
+    storage_backend: str = "json"  # "json" | "sqlite" (large libraries); applies on restart
+    # Shared snippet libraries under the personal ones, lowest precedence first:
+    # [{"name": "team", "path": "S:/snippets/team.json", "apps": ["outlook.exe"]}] ("apps" optional)
+    libraries: List[Dict[str, Any]] = field(default_factory=list)
 
     def save(self):
-        SETTINGS_FILE.write_text(json.dumps(asdict(self), indent=2), encoding="utf-8")
+        # Serialized now, written later: bursts of toggles coalesce into one atomic write
+        get_persistence().write_text(SETTINGS_FILE, json.dumps(asdict(self), indent=2))
+
+    @classmethod
+    def read(cls) -> "Settings":
+        """The settings file as it is; OSError if it is missing, ValueError if it can't be parsed."""
+        data = json.loads(SETTINGS_FILE.read_text(encoding="utf-8"))
+        if not isinstance(data, dict):
+            raise ValueError("settings must be a JSON object")
+        try:
+            return cls(**data)
+        except TypeError as e:  # unknown or missing fields
+            raise ValueError(str(e)) from None
 
     @classmethod
     def load(cls) -> "Settings":
-        if SETTINGS_FILE.exists():
-            try:
-                data = json.loads(SETTINGS_FILE.read_text(encoding="utf-8"))
-                return cls(**data)
-            except Exception:
-                pass
-        s = cls()
-        s.save()
-        return s
\ No newline at end of file
+        """For startup: defaults are written only on first run, never over an unreadable file."""
+        if not SETTINGS_FILE.exists():
+            s = cls()
+            s.save()
+            return s
+        try:
+            return cls.read()
+        except (OSError, ValueError):
+            return cls()
\ No newline at end of file
@@ -0,0 +1,101 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence, Tuple
+from .config import CACHE_DIR
+from .settings import Settings
+from .snippets import SnippetRepository, open_repository
+from .matcher import TriggerTrie, cached_trie
+from .templates import TemplateCache
+from .completion import CompletionIndex, Frecency
+from .library import PERSONAL, Layer, LayeredLibrary, load_layers
+from .policy import AppPolicy
+
+@dataclass(frozen=True)
+class EngineSnapshot:
+    """Everything the key handler reads, published as one object.
+
+    Snapshots are built off the hook thread and never mutated afterwards;
+    the engine swaps them in with a single attribute assignment.
+    """
+    version: int
+    settings: Settings
+    repo: SnippetRepository  # the personal library, the top layer of `library`
+    library: LayeredLibrary
+    trie: TriggerTrie
+    templates: TemplateCache  # as seen outside every app-scoped library
+    policy: AppPolicy
+    completions: Optional[CompletionIndex] = None  # only when completion is enabled
+    # compiled per set of active app-scoped libraries, on first use
+    scoped_templates: Dict[Tuple[int, ...], TemplateCache] = field(default_factory=dict, compare=False)
+
+    @classmethod
+    def build(cls, settings: Settings, repo: SnippetRepository, version: int = 0,
+              frecency: Optional[Frecency] = None, layers: Sequence[Layer] = (),
+              previous: Optional["EngineSnapshot"] = None) -> "EngineSnapshot":
+        """`layers` go under the personal library; with `previous`, unchanged parts are reused."""
+        if previous is not None and previous.repo is repo:
+            top = previous.library.layers[-1]
+        else:
+            top = Layer(PERSONAL, repo.mapping())
+        stack = list(layers) + [top]
+        library = previous.library.updated(stack) if previous is not None else LayeredLibrary(stack)
+
+        if (previous is not None and not library.triggers_changed
+                and previous.settings.trigger_prefix == settings.trigger_prefix
+                and previous.settings.require_prefix == settings.require_prefix):
+            # same trigger set: the trie (and ranking over it) still fits
+            trie = previous.trie
+            completions = previous.completions if settings.completion_enabled else None
+        else:
+            prefix, require_prefix = settings.trigger_prefix, settings.require_prefix
+            build = lambda: TriggerTrie(library.triggers(), prefix=prefix, require_prefix=require_prefix)
+            stamp = _trie_stamp(settings, repo, stack)
+            trie = build() if stamp is None else cached_trie(CACHE_DIR, stamp, build, prefix, require_prefix)
+            completions = None
+        if completions is None and settings.completion_enabled:
+            completions = CompletionIndex(trie, frecency)
+        if previous is not None and _policy_settings(previous.settings) == _policy_settings(settings):
+            policy = previous.policy  # keeps its memoized decisions
+        else:
+            policy = AppPolicy.from_settings(settings)
+        return cls(version, settings, repo, library, trie, TemplateCache(library.view()), policy, completions)
+
+    @classmethod
+    def load(cls, version: int, frecency: Optional[Frecency] = None, backend: str = "json",
+             previous: Optional["EngineSnapshot"] = None,
+             settings: Optional[Settings] = None) -> "EngineSnapshot":
+        """Parse settings and snippets from disk; library files unchanged since `previous` are not re-read.
+
+        `settings`, if given, are used instead of reading the settings file.
+        """
+        if settings is None:
+            settings = Settings.load()
+        old_layers = previous.library.layers[:-1] if previous is not None else ()
+        return cls.build(settings, open_repository(backend), version, frecency,
+                         load_layers(settings.libraries, old_layers), previous)
+
+    def templates_for(self, app: str) -> TemplateCache:
+        """Templates as the foreground `app` sees the library."""
+        if not self.library.scoped:
+            return self.templates
+        scopes = self.library.active_scopes(app)
+        if not scopes:
+            return self.templates
+        cache = self.scoped_templates.get(scopes)
+        if cache is None:
+            cache = self.scoped_templates[scopes] = TemplateCache(self.library.view(app))
+        return cache
+
+def _trie_stamp(settings: Settings, repo: SnippetRepository, layers: Sequence[Layer]) -> Optional[str]:
+    """Names the trigger set, so a large library's trie can be loaded instead of rebuilt; None if it can't be named."""
+    personal = repo.stamp()
+    if personal is None:
+        return None
+    parts = [repr(settings.trigger_prefix), str(settings.require_prefix), personal]
+    for layer in layers[:-1]:
+        if layer.path is None or layer.stamp is None or layer.error:
+            return None
+        parts.append(f"{layer.path}:{layer.stamp}:{','.join(sorted(layer.apps))}")
+    return "|".join(parts)
+
+def _policy_settings(s: Settings):
+    return (s.blacklist_process_names, s.per_app_overrides, s.blocked_title_patterns, s.app_rules)
@@ -1,41 +1,175 @@
-from typing import Dict, List, Tuple, Optional
-from .config import SNIPPETS_FILE, DEFAULT_SNIPPETS
-from .storage import read_json, write_json_with_backup
+import threading
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple, Optional
+from .config import SNIPPETS_FILE, SNIPPETS_JOURNAL, CACHE_DIR, DEFAULT_SNIPPETS
+from .storage import write_json_with_backup
+from .journal import Change, SnippetJournal
+from .search import SnippetSearchIndex
+from .importers import valid_trigger
+from .persistence import get_persistence
+from .packed import PackedSnippets, cached_pack
 
 class SnippetRepository:
-    def __init__(self, data: Dict[str, str]):
-        self._data = dict(data)
+    """The snippet library: snippets.json plus its change journal.
+
+    Large libraries are held as a PackedSnippets mapping, shared read-only
+    between the UI's repository and the engine's detached copy; the first
+    edit turns a repository's data into a dict of its own.
+    """
+    backend = "json"
+
+    def __init__(self, data: Mapping[str, str], journal: Optional[SnippetJournal] = None):
+        self._data: Mapping[str, str] = data if isinstance(data, PackedSnippets) else dict(data)
+        self.version = 0  # bumped on every change so compiled matchers can go stale
+        self._journal = journal
+        self._pending: Dict[str, Optional[str]] = {}  # unsaved changes; None marks a delete
+        self._queued: Dict[str, Optional[str]] = {}   # saved, waiting for the background writer
+        self._queue_lock = threading.Lock()
+        self._index: Optional[SnippetSearchIndex] = None  # built on first search
 
     @classmethod
     def load_or_create(cls):
         if not SNIPPETS_FILE.exists():
             write_json_with_backup(SNIPPETS_FILE, DEFAULT_SNIPPETS)
-        return cls(read_json(SNIPPETS_FILE))
+        journal = _snippets_journal()
+        # unchanged since the last run: map the previous pack instead of parsing JSON
+        data = cached_pack([SNIPPETS_FILE, journal.rotated_path, journal.path], CACHE_DIR, journal.load)
+        repo = cls(data, journal)
+        if journal.needs_compaction():
+            # on the writer, like every other journal write, never next to a save's compaction
+            get_persistence().submit(str(journal.rotated_path), repo._compact)
+        return repo
 
     def all(self) -> Dict[str, str]:
-        return dict(self._data)
+        """A full copy; readers should use mapping()."""
+        return dict(self._data.items())
+
+    def mapping(self) -> Mapping[str, str]:
+        """Read-only view of the current data, without copying it."""
+        return self._data if isinstance(self._data, PackedSnippets) else MappingProxyType(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def detached(self) -> "SnippetRepository":
+        """An independent copy (the engine's); a packed library is shared, not copied."""
+        return SnippetRepository(self._data)
+
+    def sync_from(self, other: "SnippetRepository"):
+        """Take over a freshly loaded repository's contents; nothing is left to save."""
+        self.set_all(other._data, track=False)
+
+    def _writable(self) -> Dict[str, str]:
+        if not isinstance(self._data, dict):
+            self._data = dict(self._data.items())  # copy-on-write: leave the shared pack alone
+        return self._data
+
+    def triggers(self):
+        return self._data.keys()
 
-    def set_all(self, data: Dict[str, str]):
-        self._data = dict(data)
+    def stamp(self) -> Optional[str]:
+        """Names the contents for caches built from them; JSON libraries aren't named (their trie is rebuilt)."""
+        return None
+
+    def set_all(self, data: Mapping[str, str], track: bool = True):
+        """Replace the library; with track=False (reload from disk) nothing is left to save."""
+        if track:
+            kept = 0
+            for k, v in self._data.items():  # one sequential pass, also over a pack
+                new = data.get(k)
+                if new is None:
+                    self._pending[k] = None
+                else:
+                    kept += 1
+                    if new != v:
+                        self._pending[k] = new
+            if kept < len(data):
+                old = self._data
+                self._pending.update((k, v) for k, v in data.items() if k not in old)
+        else:
+            self._pending.clear()
+        if self._index is not None:
+            self._index.update(self._data, data)
+        self._data = data if isinstance(data, PackedSnippets) else dict(data)
+        self.version += 1
+
+    def set(self, trigger: str, expansion: str):
+        self._writable()[trigger] = expansion
+        self._pending[trigger] = expansion
+        if self._index is not None:
+            self._index.add(trigger, expansion)
+        self.version += 1
+
+    def delete(self, trigger: str):
+        if trigger in self._data and self._writable().pop(trigger, None) is not None:
+            self._pending[trigger] = None
+            self.version += 1
+            if self._index is not None:
+                self._index.remove(trigger)
 
     def save(self):
-        write_json_with_backup(SNIPPETS_FILE, self._data)
+        """Queue the unsaved changes; the shared background writer persists them."""
+        writer = get_persistence()
+        if self._journal is None:
+            self._pending.clear()
+            data = dict(self._data.items())
+            writer.submit(str(SNIPPETS_FILE), lambda: write_json_with_backup(SNIPPETS_FILE, data))
+            return
+        with self._queue_lock:
+            self._queued.update(self._pending)
+        self._pending.clear()
+        writer.submit(str(self._journal.path), self._write_queued)
+
+    def _write_queued(self):
+        with self._queue_lock:
+            queued, self._queued = self._queued, {}
+        changes: List[Change] = [("del", k, None) if v is None else ("set", k, v)
+                                 for k, v in queued.items()]
+        if changes:
+            self._journal.backup()  # what this save replaces, restorable from the Backups tab
+        self._journal.append(changes)
+        self._compact()
+
+    def _compact(self):
+        # writer thread only: appends and compactions never overlap
+        if self._journal.needs_compaction():
+            self._journal.compact()
 
     def validate(self) -> Tuple[bool, List[str]]:
-        dups = [k for k in self._data.keys() if list(self._data.keys()).count(k) > 1]
-        # (dict can't hold dup keys; guard for UI)
-        bad = [k for k in self._data if " " in k or not k]
+        # (dict can't hold dup keys; duplicates are resolved at import time)
+        bad = [k for k in self._data if not valid_trigger(k)]
         # return "invalid" if any bad keys
         return (len(bad) == 0, bad)
 
-    def search(self, text: str) -> Dict[str, str]:
+    def search(self, text: str, limit: Optional[int] = None) -> Mapping[str, str]:
+        """Matches in rank order: trigger prefix, trigger substring, then expansion text."""
         text = text.strip().lower()
         if not text:
-            return self.all()
-        return {k: v for k, v in self._data.items() if text in k.lower() or text in v.lower()}
+            return self.mapping()
+        if self._index is None:
+            self._index = SnippetSearchIndex(self._data)
+        return {k: self._data[k] for k in self._index.search(text, limit)}
 
     def get(self, trigger: str) -> Optional[str]:
         return self._data.get(trigger)
 
     def contains_trigger(self, trigger: str) -> bool:
-        return trigger in self._data
\ No newline at end of file
+        return trigger in self._data
+
+_journal: Optional[SnippetJournal] = None
+_journal_lock = threading.Lock()
+
+def _snippets_journal() -> SnippetJournal:
+    """The one journal for snippets.json, shared by every repository loaded from it."""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = SnippetJournal(SNIPPETS_FILE, SNIPPETS_JOURNAL)
+        return _journal
+
+def open_repository(backend: str = "json"):
+    """The snippet library for a storage backend: "json" (default) or "sqlite"."""
+    if backend == "sqlite":
+        from .sqlite_repo import SqliteSnippetRepository
+        return SqliteSnippetRepository.open()
+    return SnippetRepository.load_or_create()
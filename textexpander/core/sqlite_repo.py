@@ -0,0 +1,341 @@
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+from .config import SNIPPETS_DB, SNIPPETS_FILE, SNIPPETS_JOURNAL, DEFAULT_SNIPPETS
+from .journal import SnippetJournal
+from .importers import valid_trigger
+from .persistence import get_persistence
+from .watcher import note_written
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snippets (
+    id INTEGER PRIMARY KEY,
+    trigger TEXT NOT NULL UNIQUE,
+    expansion TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# External-content FTS5 table kept in step by triggers; trigram tokens give substring search
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS snippets_fts USING fts5(
+    trigger, expansion, content='snippets', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS snippets_ai AFTER INSERT ON snippets BEGIN
+    INSERT INTO snippets_fts(rowid, trigger, expansion) VALUES (new.id, new.trigger, new.expansion);
+END;
+CREATE TRIGGER IF NOT EXISTS snippets_ad AFTER DELETE ON snippets BEGIN
+    INSERT INTO snippets_fts(snippets_fts, rowid, trigger, expansion)
+    VALUES ('delete', old.id, old.trigger, old.expansion);
+END;
+CREATE TRIGGER IF NOT EXISTS snippets_au AFTER UPDATE ON snippets BEGIN
+    INSERT INTO snippets_fts(snippets_fts, rowid, trigger, expansion)
+    VALUES ('delete', old.id, old.trigger, old.expansion);
+    INSERT INTO snippets_fts(rowid, trigger, expansion) VALUES (new.id, new.trigger, new.expansion);
+END;
+"""
+
+_UPSERT = ("INSERT INTO snippets(trigger, expansion) VALUES (?, ?) "
+           "ON CONFLICT(trigger) DO UPDATE SET expansion = excluded.expansion")
+# bumped in every write transaction, so (id, generation) names the committed contents
+_BUMP_GENERATION = ("INSERT INTO meta(key, value) VALUES ('generation', '1') "
+                    "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1")
+
+# One connection per database file, shared by every repository over it (the UI's, the
+# engine's, each reload's); all use of it is serialized by its lock
+_Connection = Tuple[sqlite3.Connection, threading.Lock, bool]
+_connections: Dict[str, _Connection] = {}
+_connections_lock = threading.Lock()
+
+def _connect(path: Path) -> _Connection:
+    key = str(Path(path).resolve())
+    with _connections_lock:
+        found = _connections.get(key)
+        if found is not None:
+            return found
+        conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        fts = True
+        try:
+            conn.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            fts = False  # SQLite built without FTS5/trigram: search falls back to a scan
+        conn.execute("INSERT OR IGNORE INTO meta(key, value) VALUES ('id', ?)", (uuid.uuid4().hex,))
+        found = _connections[key] = (conn, threading.Lock(), fts)
+        return found
+
+class SqliteSnippetRepository:
+    """SnippetRepository backed by a SQLite database, for very large libraries.
+
+    Opening is constant time: nothing is read until asked for. Lookups use
+    the trigger's unique index, the manager's search goes through an FTS5
+    trigram index, and save() writes only the changed rows in a single
+    transaction on the background writer. Unsaved and queued edits are
+    overlaid on every read, as with the JSON repository.
+    """
+    backend = "sqlite"
+
+    def __init__(self, path: Path = SNIPPETS_DB):
+        self.path = path
+        self.version = 0
+        self._conn, self._db_lock, self._fts = _connect(path)
+        self._pending: Dict[str, Optional[str]] = {}  # unsaved changes; None marks a delete
+        self._queued: Dict[str, Optional[str]] = {}   # saved, waiting for the background writer
+        self._queue_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: Path = SNIPPETS_DB) -> "SqliteSnippetRepository":
+        repo = cls(path)
+        if repo._meta("migrated") is None:
+            repo.migrate_from_json(SNIPPETS_FILE, SNIPPETS_JOURNAL)
+        return repo
+
+    def migrate_from_json(self, snapshot_path: Path, journal_path: Path):
+        """One-time import of snippets.json plus its journal; the JSON files are left in place."""
+        if snapshot_path.exists():
+            data = SnippetJournal(snapshot_path, journal_path).load()
+        else:
+            data = dict(DEFAULT_SNIPPETS)
+        with self._db_lock:
+            self._conn.execute("BEGIN")
+            try:
+                # bulk load without the per-row FTS trigger, then index everything in one pass
+                self._conn.execute("DROP TRIGGER IF EXISTS snippets_ai")
+                self._conn.executemany(_UPSERT, data.items())
+                if self._fts:
+                    self._conn.execute("INSERT INTO snippets_fts(snippets_fts) VALUES ('rebuild')")
+                self._conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('migrated', ?)",
+                                   (str(snapshot_path),))
+                self._conn.execute(_BUMP_GENERATION)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            finally:
+                if self._fts:
+                    self._conn.executescript(FTS_SCHEMA)
+        self.version += 1
+
+    def detached(self) -> "SqliteSnippetRepository":
+        """A repository of its own over the same database (the engine's copy); the connection is shared."""
+        return SqliteSnippetRepository(self.path)
+
+    def sync_from(self, other):
+        """Disk changed (another instance wrote it); drop local edits and re-read lazily."""
+        self._pending.clear()
+        self.version += 1
+
+    # ---- Reads
+    def _meta(self, key: str) -> Optional[str]:
+        with self._db_lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def stamp(self) -> Optional[str]:
+        """Names the committed contents (database id + write generation); None while edits are overlaid."""
+        if self._overlay():
+            return None
+        with self._db_lock:
+            meta = dict(self._conn.execute("SELECT key, value FROM meta WHERE key IN ('id', 'generation')"))
+        return f"sqlite:{meta.get('id')}:{meta.get('generation', '0')}"
+
+    def _overlay(self) -> Dict[str, Optional[str]]:
+        with self._queue_lock:
+            if not self._queued:
+                return self._pending
+            merged = dict(self._queued)
+        merged.update(self._pending)
+        return merged
+
+    def get(self, trigger: str) -> Optional[str]:
+        if trigger in self._pending:
+            return self._pending[trigger]
+        with self._queue_lock:
+            if trigger in self._queued:
+                return self._queued[trigger]
+        with self._db_lock:
+            row = self._conn.execute("SELECT expansion FROM snippets WHERE trigger = ?", (trigger,)).fetchone()
+        return row[0] if row else None
+
+    def contains_trigger(self, trigger: str) -> bool:
+        return self.get(trigger) is not None
+
+    def triggers(self) -> List[str]:
+        with self._db_lock:
+            out = [r[0] for r in self._conn.execute("SELECT trigger FROM snippets ORDER BY id")]
+        overlay = self._overlay()
+        if overlay:
+            have = set(out)
+            out = [t for t in out if overlay.get(t, "") is not None]
+            out.extend(t for t, v in overlay.items() if v is not None and t not in have)
+        return out
+
+    def all(self) -> Dict[str, str]:
+        """A full copy; readers should use mapping()."""
+        with self._db_lock:
+            data = dict(self._conn.execute("SELECT trigger, expansion FROM snippets ORDER BY id"))
+        for t, v in self._overlay().items():
+            if v is None:
+                data.pop(t, None)
+            else:
+                data[t] = v
+        return data
+
+    def mapping(self) -> Mapping[str, str]:
+        """Read-only live view; lookups go to the database, nothing is copied."""
+        return _SqliteView(self)
+
+    def __len__(self) -> int:
+        with self._db_lock:
+            n = self._conn.execute("SELECT count(*) FROM snippets").fetchone()[0]
+        for t, v in self._overlay().items():
+            in_db = self._in_db(t)
+            n += (v is not None) - in_db
+        return n
+
+    def _in_db(self, trigger: str) -> bool:
+        with self._db_lock:
+            return self._conn.execute("SELECT 1 FROM snippets WHERE trigger = ?", (trigger,)).fetchone() is not None
+
+    # ---- Edits
+    def set_all(self, data: Mapping[str, str], track: bool = True):
+        """Replace the library; with track=False (reload from disk) nothing is left to save."""
+        if track:
+            # one pass over the table, comparing as rows stream by; only the trigger set is kept
+            overlay = self._overlay()
+            current = set()
+            changes: Dict[str, Optional[str]] = {}
+            with self._db_lock:
+                for k, v in self._conn.execute("SELECT trigger, expansion FROM snippets"):
+                    v = overlay.get(k, v)
+                    if v is None:
+                        continue  # deleted but not saved yet
+                    current.add(k)
+                    new = data.get(k)
+                    if new != v:
+                        changes[k] = new
+            for k, v in overlay.items():
+                if v is not None and k not in current:
+                    current.add(k)
+                    if data.get(k) != v:
+                        changes[k] = data.get(k)
+            changes.update((k, v) for k, v in data.items() if k not in current)
+            self._pending.update(changes)
+        else:
+            self._pending.clear()
+        self.version += 1
+
+    def set(self, trigger: str, expansion: str):
+        self._pending[trigger] = expansion
+        self.version += 1
+
+    def delete(self, trigger: str):
+        if self.contains_trigger(trigger):
+            self._pending[trigger] = None
+            self.version += 1
+
+    def save(self):
+        """Queue the unsaved changes; the shared background writer commits them in one transaction."""
+        with self._queue_lock:
+            self._queued.update(self._pending)
+        self._pending.clear()
+        get_persistence().submit(str(self.path), self._write_queued)
+
+    def _write_queued(self):
+        with self._queue_lock:
+            queued = dict(self._queued)
+        if not queued:
+            return
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("DELETE FROM snippets WHERE trigger = ?",
+                                       [(k,) for k, v in queued.items() if v is None])
+                self._conn.executemany(_UPSERT, [(k, v) for k, v in queued.items() if v is not None])
+                self._conn.execute(_BUMP_GENERATION)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise  # still queued; the next save retries
+            note_written(self.path, self.path.with_name(self.path.name + "-wal"))
+        with self._queue_lock:
+            # drop what was committed unless it was queued again meanwhile
+            for k, v in queued.items():
+                if self._queued.get(k, v) is v:
+                    self._queued.pop(k, None)
+
+    def validate(self) -> Tuple[bool, List[str]]:
+        with self._db_lock:
+            bad = [r[0] for r in self._conn.execute(
+                "SELECT trigger FROM snippets WHERE trigger = '' OR trigger GLOB ?", ("*[ \t\r\n]*",))]
+        overlay = self._overlay()
+        bad = [k for k in bad if k not in overlay]
+        bad.extend(k for k, v in overlay.items() if v is not None and not valid_trigger(k))
+        return (len(bad) == 0, bad)
+
+    # ---- Search
+    def search(self, text: str, limit: Optional[int] = None) -> Mapping[str, str]:
+        """Matches in rank order: trigger prefix, trigger substring, then expansion text."""
+        q = text.strip().lower()
+        if not q:
+            return self.mapping()
+        if self._fts and len(q) >= 3:
+            # column-filtered trigram queries; the phrase is quoted so any text is literal
+            phrase = '"' + q.replace('"', '""') + '"'
+            base = "SELECT s.trigger, s.expansion FROM snippets_fts JOIN snippets s ON s.id = snippets_fts.rowid "
+            trig_sql, trig_arg = base + "WHERE snippets_fts MATCH ?", "trigger : " + phrase
+            body_sql, body_arg = base + "WHERE snippets_fts MATCH ? ORDER BY snippets_fts.rowid LIMIT ?", "expansion : " + phrase
+        else:
+            like = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            base = "SELECT trigger, expansion FROM snippets "
+            trig_sql, trig_arg = base + "WHERE trigger LIKE ? ESCAPE '\\' ORDER BY id", like
+            body_sql, body_arg = base + "WHERE expansion LIKE ? ESCAPE '\\' ORDER BY id LIMIT ?", like
+        with self._db_lock:
+            trig_rows = self._conn.execute(trig_sql, (trig_arg,)).fetchall()
+        starts = sorted((r for r in trig_rows if r[0].lower().startswith(q)), key=lambda r: (len(r[0]), r[0]))
+        out = dict(starts)
+        out.update(r for r in trig_rows if r[0] not in out)
+        if limit is None or len(out) < limit:
+            # body matches in id order; stop as soon as there are enough
+            with self._db_lock:
+                body_rows = self._conn.execute(body_sql, (body_arg, -1 if limit is None else limit + len(out))).fetchall()
+            for t, v in body_rows:
+                if t not in out:
+                    out[t] = v
+        overlay = self._overlay()
+        if overlay:
+            out = {t: v for t, v in out.items() if t not in overlay}
+            for t, v in overlay.items():
+                if v is not None and (q in t.lower() or q in v.lower()):
+                    out[t] = v
+        return dict(list(out.items())[:limit]) if limit is not None and len(out) > limit else out
+
+class _SqliteView(Mapping):
+    def __init__(self, repo: SqliteSnippetRepository):
+        self._repo = repo
+
+    def __getitem__(self, trigger: str) -> str:
+        v = self._repo.get(trigger)
+        if v is None:
+            raise KeyError(trigger)
+        return v
+
+    def get(self, trigger, default=None):
+        v = self._repo.get(trigger)
+        return default if v is None else v
+
+    def __contains__(self, trigger) -> bool:
+        return self._repo.get(trigger) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._repo.triggers())
+
+    def items(self):
+        """One query for every row, not one per key."""
+        return self._repo.all().items()
+
+    def __len__(self) -> int:
+        return len(self._repo)
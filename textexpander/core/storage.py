@@ -1,8 +1,7 @@
 import json
-import shutil
-from datetime import datetime
+import os
 from typing import Dict
-from .config import SNIPPETS_FILE, BACKUPS_DIR
+from .watcher import note_written
 
 def read_json(path) -> Dict:
     if path.exists():
@@ -10,14 +9,30 @@ def read_json(path) -> Dict:
     return {}
 
 def write_json_with_backup(path, data: Dict):
-    # backup old
+    # the version being replaced goes into the deduplicating backup store
     if path.exists():
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        shutil.copy2(path, BACKUPS_DIR / f"{path.stem}_{ts}{path.suffix}")
-    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        from .backups import get_backup_store
+        get_backup_store().add_file(path)
+    write_json_atomic(path, data)
+
+def write_json_atomic(path, data: Dict, fsync: bool = True):
+    write_text_atomic(path, json.dumps(data, ensure_ascii=False, indent=2), fsync)
+
+def write_text_atomic(path, text: str, fsync: bool = True):
+    # temp file + rename: readers see either the old or the new file, never a partial one
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+    note_written(path)
 
 def import_snippets(file_path) -> Dict:
-    return json.loads(file_path.read_text(encoding="utf-8"))
+    # streamed; accepts every format in importers.READERS
+    from .importers import iter_pairs
+    return dict(iter_pairs(file_path))
 
 def export_snippets(file_path, data: Dict):
     file_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
\ No newline at end of file
@@ -0,0 +1,61 @@
+import threading
+from typing import Dict, Optional
+
+TYPE = "type"
+PASTE = "paste"
+AUTO = "auto"
+MODES = (AUTO, TYPE, PASTE)
+
+class ExpansionStrategy:
+    """Chooses between typing an expansion and pasting it through the clipboard.
+
+    Typing cost grows with length while a paste costs a roughly fixed
+    clipboard round trip, so in "auto" mode short single-line ASCII text is
+    typed and everything else pasted. The length cut-off starts at
+    `threshold` and is re-derived from measured latencies: an EWMA of the
+    paste cost divided by an EWMA of the per-character typing cost.
+
+    Those latencies time the emit call, and SendInput returns once the
+    events are queued, well before the target app has consumed them: the
+    measured per-character cost understates typing. So adaptation stays
+    within a factor of `band` of the default cut-off, where the ratio can
+    still nudge it but never turns auto mode into typing whole paragraphs.
+    """
+
+    ALPHA = 0.2
+
+    def __init__(self, threshold: int = 48, band: float = 2.0):
+        self.threshold = threshold
+        self.min_threshold = max(1, int(threshold / band))
+        self.max_threshold = int(threshold * band)
+        self._lock = threading.Lock()
+        self._paste_ms: Optional[float] = None
+        self._char_ms: Optional[float] = None
+
+    def choose(self, text: str, mode: str = AUTO) -> str:
+        if mode in (TYPE, PASTE):
+            return mode
+        if "\n" in text or not text.isascii():
+            return PASTE  # Enter handling and IME/surrogates vary per app; the clipboard is safe
+        return TYPE if len(text) <= self.threshold else PASTE
+
+    def record(self, mode: str, chars: int, seconds: float):
+        ms = seconds * 1000.0
+        with self._lock:
+            if mode == PASTE:
+                self._paste_ms = _ewma(self._paste_ms, ms, self.ALPHA)
+            elif chars:
+                self._char_ms = _ewma(self._char_ms, ms / chars, self.ALPHA)
+            if self._paste_ms is not None and self._char_ms:
+                t = int(self._paste_ms / self._char_ms)
+                self.threshold = max(self.min_threshold, min(self.max_threshold, t))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "threshold": self.threshold,
+            "paste_ms": self._paste_ms or 0.0,
+            "char_ms": self._char_ms or 0.0,
+        }
+
+def _ewma(prev: Optional[float], value: float, alpha: float) -> float:
+    return value if prev is None else prev + alpha * (value - prev)
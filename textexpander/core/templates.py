@@ -0,0 +1,180 @@
+import re
+from datetime import datetime
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+# Placeholders; anything else in braces is literal text
+#   {cursor}          caret position after the expansion (first one wins)
+#   {date} {date:fmt} current date/time, strftime format (default %Y-%m-%d)
+#   {clipboard}       the user's clipboard text
+#   {snippet:name}    another snippet's expansion, inlined at compile time
+_TOKEN = re.compile(r"\{(cursor|clipboard|date(?::([^{}]*))?|snippet:([^{}\s]+))\}")
+
+CURSOR = "cursor"
+DATE = "date"
+CLIPBOARD = "clipboard"
+DEFAULT_DATE_FORMAT = "%Y-%m-%d"
+_SAMPLE_DATE = datetime(2000, 1, 1)
+
+Part = Union[str, Tuple[str, str]]  # literal text, or (DATE, fmt) / (CLIPBOARD, "")
+
+class Template:
+    """A compiled expansion: literal and dynamic parts split at the {cursor}.
+
+    Templates without dynamic parts keep their final (pre, post) strings, so
+    rendering them is free; the rest walk a short list of parts.
+    """
+    __slots__ = ("pre", "post", "static")
+
+    def __init__(self, pre: List[Part], post: List[Part]):
+        self.pre = _merge(pre)
+        self.post = _merge(post)
+        self.static = all(isinstance(p, str) for p in self.pre + self.post)
+
+    def render(self, clipboard: Optional[Callable[[], str]] = None) -> Tuple[str, str]:
+        """Return (text before caret, text after caret)."""
+        if self.static:
+            # merged, so at most one literal on each side
+            return (self.pre[0] if self.pre else ""), (self.post[0] if self.post else "")
+        ctx: Dict = {}
+        return _render(self.pre, clipboard, ctx), _render(self.post, clipboard, ctx)
+
+def _merge(parts: List[Part]) -> List[Part]:
+    out: List[Part] = []
+    for p in parts:
+        if isinstance(p, str):
+            if not p:
+                continue
+            if out and isinstance(out[-1], str):
+                out[-1] += p
+                continue
+        out.append(p)
+    return out
+
+def _render(parts: List[Part], clipboard: Optional[Callable[[], str]], ctx: Dict) -> str:
+    out = []
+    for p in parts:
+        if isinstance(p, str):
+            out.append(p)
+        elif p[0] == DATE:
+            # one clock reading per expansion, each format rendered once
+            key = DATE + p[1]
+            if key not in ctx:
+                if DATE not in ctx:
+                    ctx[DATE] = datetime.now()
+                ctx[key] = ctx[DATE].strftime(p[1])
+            out.append(ctx[key])
+        else:
+            # read at most once per expansion, and only when a template asks for it
+            if CLIPBOARD not in ctx:
+                try:
+                    ctx[CLIPBOARD] = clipboard() if clipboard else ""
+                except Exception:
+                    ctx[CLIPBOARD] = ""
+            out.append(ctx[CLIPBOARD])
+    return "".join(out)
+
+class TemplateCache:
+    """Compiled templates for one snippet library.
+
+    Built with the engine snapshot, so a reload or edit gets a fresh cache.
+    Each snippet is compiled on first use and kept for the life of the
+    cache; check() compiles everything up front. Includes are resolved
+    while compiling: an included snippet's parts are spliced into the
+    includer's plan. Cyclic or unknown includes, and date formats strftime
+    rejects, are left as literal text and reported in `errors`.
+    """
+
+    def __init__(self, snippets: Mapping[str, str]):
+        self._src = snippets
+        self._parsed: Dict[str, List[Part]] = {}
+        self._flat: Dict[str, List[Part]] = {}  # fully resolved, error-free includes
+        self._compiled: Dict[str, Template] = {}
+        self.errors: Dict[str, str] = {}
+
+    def get(self, trigger: str) -> Optional[Template]:
+        t = self._compiled.get(trigger)
+        if t is None:
+            text = self._src.get(trigger)
+            if text is None:
+                return None
+            # plain text needs no parsing and is cheap to wrap, so only templates are kept
+            if "{" not in text:
+                return Template([text], [])
+            t = self._compiled[trigger] = self._compile(trigger)
+        return t
+
+    def check(self) -> Dict[str, str]:
+        """Compile every snippet; returns trigger -> problem for broken includes or date formats."""
+        for trigger in self._src:
+            self.get(trigger)
+        return self.errors
+
+    def render(self, trigger: str, clipboard: Optional[Callable[[], str]] = None) -> Tuple[str, str]:
+        t = self.get(trigger)
+        return t.render(clipboard) if t else ("", "")
+
+    def _compile(self, trigger: str) -> Template:
+        parts, _ = self._flatten(trigger, [])
+        # split at the first cursor marker; later ones are dropped
+        for i, p in enumerate(parts):
+            if p == (CURSOR, ""):
+                post = [q for q in parts[i + 1:] if q != (CURSOR, "")]
+                return Template(parts[:i], post)
+        return Template(parts, [])
+
+    def _flatten(self, trigger: str, stack: List[str]) -> Tuple[List[Part], bool]:
+        """Parts with includes spliced in, and whether every include resolved."""
+        flat = self._flat.get(trigger)
+        if flat is not None:
+            return flat, True
+        stack.append(trigger)
+        out: List[Part] = []
+        clean = True
+        for p in self._parse(trigger):
+            if isinstance(p, tuple) and p[0] == "snippet":
+                name = p[1]
+                if name in stack:
+                    self.errors[stack[0]] = "include cycle: " + " -> ".join(stack + [name])
+                elif name not in self._src:
+                    self.errors[stack[0]] = f"unknown snippet: {name}"
+                else:
+                    sub, ok = self._flatten(name, stack)
+                    out.extend(sub)
+                    clean = clean and ok
+                    continue
+                out.append("{snippet:" + name + "}")
+                clean = False
+            else:
+                out.append(p)
+        stack.pop()
+        if clean:
+            self._flat[trigger] = out
+        return out, clean
+
+    def _parse(self, trigger: str) -> List[Part]:
+        parts = self._parsed.get(trigger)
+        if parts is not None:
+            return parts
+        text = self._src[trigger]
+        parts = []
+        pos = 0
+        for m in _TOKEN.finditer(text):
+            parts.append(text[pos:m.start()])
+            kind = m.group(1)
+            if kind == CURSOR or kind == CLIPBOARD:
+                parts.append((kind, ""))
+            elif m.group(3) is not None:
+                parts.append(("snippet", m.group(3)))
+            else:
+                fmt = m.group(2) or DEFAULT_DATE_FORMAT
+                try:
+                    _SAMPLE_DATE.strftime(fmt)  # fails here, not in the middle of an expansion
+                except ValueError:
+                    self.errors[trigger] = f"bad date format: {fmt}"
+                    parts.append(m.group(0))
+                else:
+                    parts.append((DATE, fmt))
+            pos = m.end()
+        parts.append(text[pos:])
+        self._parsed[trigger] = parts
+        return parts
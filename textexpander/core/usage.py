@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from .completion import Frecency
+from .persistence import PersistenceService, get_persistence
+from .storage import write_text_atomic
+
+FLUSH_DELAY = 5.0  # seconds between the first unsaved use and the write that covers it
+MAX_APPS_PER_TRIGGER = 8  # per-app counts beyond this fold into the least used app's slot
+
+class UsageStore:
+    """How often, how recently and where each snippet is expanded.
+
+    One small record per used trigger (count, last use, frecency score,
+    per-app counts); individual events are never kept. record() only
+    updates memory; the file is rewritten in one batch on the persistence
+    writer, at most once per FLUSH_DELAY while expansions keep coming.
+    With `path=None` nothing is written (headless runs).
+    """
+
+    def __init__(self, path: Optional[Path] = None, writer: Optional[PersistenceService] = None):
+        self.path = path
+        self._writer = writer
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._last: Dict[str, float] = {}
+        self._apps: Dict[str, Dict[str, int]] = {}
+        self.frecency = Frecency()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: Path, writer: Optional[PersistenceService] = None) -> "UsageStore":
+        store = cls(path, writer)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return store
+        for trigger, rec in data.get("usage", {}).items():
+            try:
+                count, last, score, apps = rec
+                store._counts[trigger] = int(count)
+                store._last[trigger] = float(last)
+                store.frecency.scores[trigger] = float(score)
+                if apps:
+                    store._apps[trigger] = {str(a): int(n) for a, n in apps.items()}
+            except (TypeError, ValueError):
+                continue  # skip a damaged record, keep the rest
+        return store
+
+    # ---- Hot path (expansion worker)
+    def record(self, trigger: str, app: str = "", when: Optional[float] = None):
+        when = time.time() if when is None else when
+        with self._lock:
+            self._counts[trigger] = self._counts.get(trigger, 0) + 1
+            self._last[trigger] = when
+            self.frecency.bump(trigger, when)
+            if app:
+                apps = self._apps.setdefault(trigger, {})
+                if app not in apps and len(apps) >= MAX_APPS_PER_TRIGGER:
+                    # bounded: the new app takes over the least used slot's count
+                    low = min(apps, key=apps.get)
+                    apps[app] = apps.pop(low)
+                apps[app] = apps.get(app, 0) + 1
+            schedule = not self._dirty
+            self._dirty = True
+        if schedule and self.path is not None:
+            (self._writer or get_persistence()).submit(str(self.path), self._flush, delay=FLUSH_DELAY)
+
+    # ---- Queries
+    def count(self, trigger: str) -> int:
+        return self._counts.get(trigger, 0)
+
+    def last_used(self, trigger: str) -> Optional[float]:
+        return self._last.get(trigger)
+
+    def apps(self, trigger: str) -> Dict[str, int]:
+        return dict(self._apps.get(trigger, {}))
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self._counts)
+
+    def unused(self, triggers: Iterable[str]) -> List[str]:
+        """Triggers never expanded since usage tracking started; candidates for pruning."""
+        return [t for t in triggers if t not in self._counts]
+
+    # ---- Maintenance
+    def prune(self, keep: Iterable[str]):
+        """Forget triggers that are no longer in the library."""
+        if not self._counts:
+            return
+        keep = set(keep)
+        with self._lock:
+            gone = [t for t in self._counts if t not in keep]
+            for t in gone:
+                self._counts.pop(t, None)
+                self._last.pop(t, None)
+                self._apps.pop(t, None)
+                self.frecency.scores.pop(t, None)
+            if gone and not self._dirty and self.path is not None:
+                self._dirty = True
+                (self._writer or get_persistence()).submit(str(self.path), self._flush, delay=FLUSH_DELAY)
+
+    def _flush(self):
+        with self._lock:
+            self._dirty = False
+            data = {t: [n, self._last.get(t, 0.0), self.frecency.scores.get(t, 0.0), dict(self._apps.get(t, {}))]
+                    for t, n in self._counts.items()}
+        # statistics: atomic, but not worth an fsync
+        text = json.dumps({"version": 1, "usage": data}, ensure_ascii=False, separators=(",", ":"))
+        write_text_atomic(self.path, text, fsync=False)
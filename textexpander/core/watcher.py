@@ -0,0 +1,93 @@
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+Signature = Optional[Tuple[int, int]]
+
+# (mtime, size) of each file right after this process last wrote it
+_written: Dict[Path, Signature] = {}
+_written_lock = threading.Lock()
+
+def _signature(path: Path) -> Signature:
+    try:
+        st = path.stat()
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def note_written(*paths):
+    """Record our own write to `paths`; watchers don't report a file still in that state."""
+    with _written_lock:
+        for p in paths:
+            p = Path(p)
+            _written[p] = _signature(p)
+
+class FileWatcher:
+    """Polls a few files for changes and calls back once they settle.
+
+    A change is reported only after the files' (mtime, size) signatures
+    have stayed the same for `debounce` seconds, so a burst of writes
+    (journal append + compaction, or an editor's save dance) costs one
+    callback. When every changed file is exactly as this process last
+    wrote it (see note_written), `own_callback` runs instead, if given:
+    our own saves need no re-read from disk. Callbacks run on the
+    watcher thread.
+    """
+
+    def __init__(self, paths: Iterable[Path], callback: Callable[[], None],
+                 interval: float = 0.5, debounce: float = 0.3, logger=None,
+                 own_callback: Optional[Callable[[], None]] = None):
+        self.paths = list(paths)
+        self.callback = callback
+        self.own_callback = own_callback
+        self.interval = interval
+        self.debounce = debounce
+        self.logger = logger
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._seen = self._signatures()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def set_paths(self, paths: Iterable[Path]):
+        """Watch a different set of files from now on; their current state counts as seen."""
+        self.paths = list(paths)
+        self.mark_seen()
+
+    def mark_seen(self):
+        """Accept the current on-disk state without a callback."""
+        self._seen = self._signatures()
+
+    def _signatures(self) -> Dict[Path, Signature]:
+        return {p: _signature(p) for p in self.paths}
+
+    def _external(self, seen: Dict[Path, Signature], current: Dict[Path, Signature]) -> bool:
+        with _written_lock:
+            return any(sig != seen.get(p) and (p not in _written or sig != _written[p])
+                       for p, sig in current.items())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            current = self._signatures()
+            if current == self._seen:
+                continue
+            # wait for the writes to settle
+            while not self._stop.wait(self.debounce):
+                settled = self._signatures()
+                if settled == current:
+                    break
+                current = settled
+            seen, self._seen = self._seen, current
+            callback = self.callback if self._external(seen, current) else self.own_callback
+            if callback is None:
+                continue
+            try:
+                callback()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error("Reload after file change failed: %s", e)
@@ -1,7 +1,9 @@
 from PyQt6 import QtGui, QtWidgets
-from .core.autostart import get_autostart_enabled, set_autostart_enabled
+from .core.metrics import HOOK, EXPAND
+from .core.autostart import autostart_supported, get_autostart_enabled, set_autostart_enabled
 
-def create_tray(app, manager_window, engine, settings):
+def create_tray(app, manager, engine, settings):
+    """`manager` builds the Snippet Manager on first use (app.LazyManager)."""
     tray = QtWidgets.QSystemTrayIcon()
     tray.setToolTip("TextExpanderPy")
     tray.setIcon(app.style().standardIcon(QtWidgets.QStyle.StandardPixmap.SP_ComputerIcon))
@@ -19,19 +21,24 @@ def create_tray(app, manager_window, engine, settings):
     menu.addSeparator()
 
     open_manager = QtGui.QAction("Open Snippet Manager")
-    open_manager.triggered.connect(lambda: (manager_window.reload_models(), manager_window.show(), manager_window.raise_()))
+    open_manager.triggered.connect(manager.open)
     menu.addAction(open_manager)
 
     reload_engine = QtGui.QAction("Reload snippets (Ctrl+Alt+R)")
     reload_engine.triggered.connect(engine.reload_snippets)
     menu.addAction(reload_engine)
 
+    diagnostics_action = QtGui.QAction("Diagnostics…")
+    diagnostics_action.triggered.connect(lambda: manager.get().show_diagnostics())
+    menu.addAction(diagnostics_action)
+
     menu.addSeparator()
 
     # Start with Windows
     startup_action = QtGui.QAction("Start with Windows")
     startup_action.setCheckable(True)
     startup_action.setChecked(get_autostart_enabled())
+    startup_action.setEnabled(autostart_supported())
     def toggle_startup():
         set_autostart_enabled(startup_action.isChecked())
     startup_action.triggered.connect(toggle_startup)
@@ -53,6 +60,14 @@ def create_tray(app, manager_window, engine, settings):
     quit_action.triggered.connect(QtWidgets.QApplication.quit)
     menu.addAction(quit_action)
 
+    # Latency summary in the tooltip, refreshed when the menu opens (no polling)
+    def refresh_tooltip():
+        rows = {r["stage"]: r for r in engine.metrics.stage_rows()}
+        hook, expand = rows[HOOK], rows[EXPAND]
+        tray.setToolTip(f"TextExpanderPy\nKey hook p99: {hook['p99_us']} µs\n"
+                        f"Expansions: {expand['count']} (p99 {expand['p99_us'] / 1000:.1f} ms)")
+    menu.aboutToShow.connect(refresh_tooltip)
+
     tray.setContextMenu(menu)
-    tray.activated.connect(lambda reason: manager_window.show() if reason == QtWidgets.QSystemTrayIcon.ActivationReason.Trigger else None)
+    tray.activated.connect(lambda reason: manager.open() if reason == QtWidgets.QSystemTrayIcon.ActivationReason.Trigger else None)
     return tray
\ No newline at end of file
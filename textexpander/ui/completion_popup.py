@@ -0,0 +1,48 @@
+from typing import List
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+PREVIEW_CHARS = 40
+
+class CompletionPopup(QtWidgets.QLabel):
+    """Small always-on-top list of trigger suggestions near the mouse pointer.
+
+    It never takes focus, so typing continues in the target app. The engine
+    calls `suggestions.emit` from the keyboard hook thread; Qt queues the
+    signal to the GUI thread, so the hook only pays for the emit.
+    """
+    suggestions = QtCore.pyqtSignal(list)
+
+    def __init__(self, engine):
+        super().__init__(None, QtCore.Qt.WindowType.ToolTip | QtCore.Qt.WindowType.FramelessWindowHint |
+                         QtCore.Qt.WindowType.WindowStaysOnTopHint | QtCore.Qt.WindowType.WindowDoesNotAcceptFocus)
+        self.engine = engine
+        self.setAttribute(QtCore.Qt.WidgetAttribute.WA_ShowWithoutActivating)
+        self.setTextFormat(QtCore.Qt.TextFormat.PlainText)
+        self.setMargin(6)
+        self.suggestions.connect(self._show_suggestions)
+
+    def attach(self):
+        self.engine.completion_listener = self.suggestions.emit
+
+    def detach(self):
+        self.engine.completion_listener = None
+        self.hide()
+
+    def _show_suggestions(self, triggers: List[str]):
+        if not triggers:
+            self.hide()
+            return
+        prefix = self.engine.settings.trigger_prefix
+        library = self.engine.library
+        app = self.engine.foreground.get()[0]
+        lines = []
+        for t in triggers:
+            text = (library.get(t, app) or "").replace("\n", " ⏎ ")
+            if len(text) > PREVIEW_CHARS:
+                text = text[:PREVIEW_CHARS - 1] + "…"
+            lines.append(f"{prefix}{t}   {text}")
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        # The caret position of other apps isn't available portably; follow the pointer
+        self.move(QtGui.QCursor.pos() + QtCore.QPoint(16, 20))
+        self.show()
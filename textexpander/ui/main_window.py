@@ -2,12 +2,18 @@ from PyQt6 import QtWidgets, QtCore
 from pathlib import Path
 from ..core.settings import Settings
 from ..core.snippets import SnippetRepository
-from ..core.storage import import_snippets, export_snippets
+from ..core.storage import export_snippets
+from ..core.importers import import_into, SKIP, OVERWRITE, RENAME
 from ..core.config import SNIPPETS_FILE
+from ..core.strategy import MODES
+from ..core.metrics import STAGES, export_json
+from ..core.templates import TemplateCache
 from ..core.app_detector import get_foreground_process_name
-from .models import SnippetTableModel
-import psutil
-import pyperclip
+from ..core.backups import diff_snippets, get_backup_store
+from .models import SnippetTableModel, SnippetFilterProxyModel
+
+STAGE_COLUMNS = [("Count", "count"), ("Mean", "mean_us"), ("p50", "p50_us"),
+                 ("p99", "p99_us"), ("Max", "max_us")]
 
 class SnippetManagerWindow(QtWidgets.QMainWindow):
     def __init__(self, settings: Settings, repo: SnippetRepository, engine, logger):
@@ -21,13 +27,23 @@ class SnippetManagerWindow(QtWidgets.QMainWindow):
 
         tabs = QtWidgets.QTabWidget()
         self.setCentralWidget(tabs)
+        self.tabs = tabs
 
         # --- Snippets Tab
-        self.model = SnippetTableModel(self.repo.all())
+        self.model = SnippetTableModel(self.repo.mapping(), usage=engine.usage)
+        # The view sees a filtered, lazily loaded proxy; edits still land in self.model
+        self.proxy = SnippetFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
 
         self.table = QtWidgets.QTableView()
-        self.table.setModel(self.model)
-        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setModel(self.proxy)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(1, QtWidgets.QHeaderView.ResizeMode.Stretch)
+        # Click a column to sort (source order until the first click)
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(-1, QtCore.Qt.SortOrder.AscendingOrder)
+        header.sortIndicatorChanged.connect(self.proxy.sort)
         self.table.setSelectionBehavior(QtWidgets.QTableView.SelectionBehavior.SelectRows)
         self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.DoubleClicked |
                                    QtWidgets.QAbstractItemView.EditTrigger.SelectedClicked)
@@ -39,7 +55,7 @@ class SnippetManagerWindow(QtWidgets.QMainWindow):
         export_btn = QtWidgets.QPushButton("Export JSON…")
         from_clip_btn = QtWidgets.QPushButton("New from Clipboard")
 
-        add_btn.clicked.connect(lambda: self.model.add_row("", ""))
+        add_btn.clicked.connect(lambda: self._add_row("", ""))
 
         del_btn.clicked.connect(self._delete_selected)
         save_btn.clicked.connect(self._save)
@@ -49,6 +65,11 @@ class SnippetManagerWindow(QtWidgets.QMainWindow):
 
         search = QtWidgets.QLineEdit()
         search.setPlaceholderText("Search triggers or text…")
+        # Debounced: filter once typing pauses instead of on every keystroke
+        self._search_timer = QtCore.QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        self._search_timer.timeout.connect(lambda: self.proxy.set_query(search.text()))
         search.textChanged.connect(self._apply_search)
 
         btn_row = QtWidgets.QHBoxLayout()
@@ -73,6 +94,15 @@ class SnippetManagerWindow(QtWidgets.QMainWindow):
         settings_tab = self._build_settings_tab()
         tabs.addTab(settings_tab, "Settings")
 
+        # --- Diagnostics Tab
+        self.diag_tab = self._build_diagnostics_tab()
+        tabs.addTab(self.diag_tab, "Diagnostics")
+
+        # --- Backups Tab
+        self.backups_tab = self._build_backups_tab()
+        tabs.addTab(self.backups_tab, "Backups")
+        tabs.currentChanged.connect(self._on_tab_changed)
+
         # Status bar
         self.statusBar().showMessage(f"Snippets file: {SNIPPETS_FILE}")
 
@@ -89,17 +119,40 @@ class SnippetManagerWindow(QtWidgets.QMainWindow):
         tab_cb.setChecked(self.settings.expand_on_tab)
         tab_cb.toggled.connect(self._toggle_expand_on_tab)
 
+        complete_cb = QtWidgets.QCheckBox("Suggest matching triggers while typing one")
+        complete_cb.setChecked(self.settings.completion_enabled)
+        complete_cb.toggled.connect(self._toggle_completion)
+
         trigger_label = QtWidgets.QLabel("Trigger prefix:")
         trigger_edit = QtWidgets.QLineEdit(self.settings.trigger_prefix)
         trigger_edit.setMaxLength(3)
         trigger_edit.setFixedWidth(80)
         trigger_edit.editingFinished.connect(lambda: self._set_trigger_prefix(trigger_edit.text().strip() or "/"))
 
+        # Expansion method (auto picks typing for short text, clipboard for the rest)
+        mode_label = QtWidgets.QLabel("Expansion method:")
+        mode_combo = QtWidgets.QComboBox()
+        mode_combo.addItems(list(MODES))
+        mode_combo.setCurrentText(self.settings.expansion_mode)
+        mode_combo.currentTextChanged.connect(self._set_expansion_mode)
+
+        # Storage backend; SQLite suits very large libraries (migrates snippets.json on first start)
+        storage_label = QtWidgets.QLabel("Storage (after restart):")
+        storage_combo = QtWidgets.QComboBox()
+        storage_combo.addItems(["json", "sqlite"])
+        storage_combo.setCurrentText(self.settings.storage_backend)
+        storage_combo.currentTextChanged.connect(self._set_storage_backend)
+
         # Blacklist edit
         bl_label = QtWidgets.QLabel("Blacklist process names (comma-separated, e.g., keepass.exe, 1password.exe)")
         bl_edit = QtWidgets.QLineEdit(", ".join(self.settings.blacklist_process_names))
         bl_edit.editingFinished.connect(lambda: self._save_blacklist(bl_edit.text()))
 
+        # Title patterns that block expansion (password prompts and the like)
+        titles_label = QtWidgets.QLabel("Block in windows whose title matches (comma-separated regular expressions)")
+        titles_edit = QtWidgets.QLineEdit(", ".join(self.settings.blocked_title_patterns))
+        titles_edit.editingFinished.connect(lambda: self._save_blocked_titles(titles_edit.text()))
+
         # Per-app enable/disable
         apps_label = QtWidgets.QLabel("Per-app overrides (checked = enabled, unchecked = disabled)")
         self.apps_list = QtWidgets.QListWidget()
@@ -109,6 +162,15 @@ class SnippetManagerWindow(QtWidgets.QMainWindow):
         save_apps = QtWidgets.QPushButton("Save overrides")
         save_apps.clicked.connect(self._save_per_app_overrides)
 
+        # Shared libraries (team packs) under the personal snippets
+        libs_label = QtWidgets.QLabel("Shared libraries (your snippets override these; later entries override earlier ones)")
+        self.libs_list = QtWidgets.QListWidget()
+        self.libs_list.setMaximumHeight(80)
+        add_lib = QtWidgets.QPushButton("Add library…")
+        add_lib.clicked.connect(self._add_library)
+        remove_lib = QtWidgets.QPushButton("Remove")
+        remove_lib.clicked.connect(self._remove_library)
+
         # Logging toggle
         log_cb = QtWidgets.QCheckBox("Enable logging")
         log_cb.setChecked(self.settings.logging_enabled)
@@ -120,14 +182,23 @@ class SnippetManagerWindow(QtWidgets.QMainWindow):
 
         layout.addWidget(enabled_cb)
         layout.addWidget(tab_cb)
+        layout.addWidget(complete_cb)
         hl = QtWidgets.QHBoxLayout()
         hl.addWidget(trigger_label)
         hl.addWidget(trigger_edit)
+        hl.addSpacing(16)
+        hl.addWidget(mode_label)
+        hl.addWidget(mode_combo)
+        hl.addSpacing(16)
+        hl.addWidget(storage_label)
+        hl.addWidget(storage_combo)
         hl.addStretch()
         layout.addLayout(hl)
 
         layout.addWidget(bl_label)
         layout.addWidget(bl_edit)
+        layout.addWidget(titles_label)
+        layout.addWidget(titles_edit)
 
         layout.addSpacing(8)
         layout.addWidget(apps_label)
@@ -148,23 +219,214 @@ class SnippetManagerWindow(QtWidgets.QMainWindow):
         hl2.addWidget(save_apps)
         layout.addLayout(hl2)
 
+        layout.addSpacing(8)
+        layout.addWidget(libs_label)
+        layout.addWidget(self.libs_list)
+        hl3 = QtWidgets.QHBoxLayout()
+        hl3.addWidget(add_lib)
+        hl3.addWidget(remove_lib)
+        hl3.addStretch()
+        layout.addLayout(hl3)
+
         layout.addSpacing(8)
         layout.addWidget(log_cb)
         layout.addStretch()
         self._populate_per_app_list()
+        self._populate_libraries()
+        return w
+
+    def _build_diagnostics_tab(self):
+        w = QtWidgets.QWidget()
+        layout = QtWidgets.QVBoxLayout(w)
+
+        metrics_cb = QtWidgets.QCheckBox("Collect latency metrics")
+        metrics_cb.setChecked(self.settings.metrics_enabled)
+        metrics_cb.toggled.connect(self._toggle_metrics)
+
+        self.stage_table = QtWidgets.QTableWidget(len(STAGES), len(STAGE_COLUMNS))
+        self.stage_table.setHorizontalHeaderLabels([c for c, _ in STAGE_COLUMNS])
+        self.stage_table.setVerticalHeaderLabels(list(STAGES))
+        self.stage_table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.stage_table.horizontalHeader().setStretchLastSection(True)
+
+        self.counters_label = QtWidgets.QLabel()
+        self.counters_label.setWordWrap(True)
+        self.counters_label.setTextInteractionFlags(QtCore.Qt.TextInteractionFlag.TextSelectableByMouse)
+
+        export_btn = QtWidgets.QPushButton("Export JSON…")
+        export_btn.clicked.connect(self._export_diagnostics)
+        reset_btn = QtWidgets.QPushButton("Reset")
+        reset_btn.clicked.connect(lambda: (self.engine.metrics.reset(), self._refresh_diagnostics()))
+
+        btn_row = QtWidgets.QHBoxLayout()
+        btn_row.addWidget(metrics_cb)
+        btn_row.addStretch()
+        btn_row.addWidget(reset_btn)
+        btn_row.addWidget(export_btn)
+
+        layout.addWidget(QtWidgets.QLabel("Hot-path latency per stage (microseconds, percentiles are bucket upper bounds)"))
+        layout.addWidget(self.stage_table)
+        layout.addWidget(self.counters_label)
+        layout.addLayout(btn_row)
+
+        # Refresh only while the tab is visible
+        self._diag_timer = QtCore.QTimer(self)
+        self._diag_timer.setInterval(1000)
+        self._diag_timer.timeout.connect(self._refresh_diagnostics)
+        return w
+
+    def _build_backups_tab(self):
+        w = QtWidgets.QWidget()
+        layout = QtWidgets.QVBoxLayout(w)
+
+        self.backup_list = QtWidgets.QListWidget()
+        self.backup_list.currentItemChanged.connect(self._show_backup_diff)
+        self.backup_diff = QtWidgets.QPlainTextEdit()
+        self.backup_diff.setReadOnly(True)
+        self.backup_diff.setPlaceholderText("Select a backup to compare it with the snippets in the table.")
+        self.backups_label = QtWidgets.QLabel()
+
+        restore_btn = QtWidgets.QPushButton("Restore")
+        restore_btn.clicked.connect(self._restore_backup)
+        btn_row = QtWidgets.QHBoxLayout()
+        btn_row.addWidget(self.backups_label)
+        btn_row.addStretch()
+        btn_row.addWidget(restore_btn)
+
+        split = QtWidgets.QSplitter(QtCore.Qt.Orientation.Horizontal)
+        split.addWidget(self.backup_list)
+        split.addWidget(self.backup_diff)
+        split.setStretchFactor(1, 2)
+
+        layout.addWidget(QtWidgets.QLabel("Earlier versions of your snippets, saved each time they were replaced"))
+        layout.addWidget(split)
+        layout.addLayout(btn_row)
         return w
 
     # ---- Slots / Handlers
+    def show_diagnostics(self):
+        self.tabs.setCurrentWidget(self.diag_tab)
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def _on_tab_changed(self, _index: int):
+        if self.tabs.currentWidget() is self.diag_tab:
+            self._refresh_diagnostics()
+            self._diag_timer.start()
+        else:
+            self._diag_timer.stop()
+        if self.tabs.currentWidget() is self.backups_tab:
+            self._populate_backups()
+
+    def hideEvent(self, event):
+        self._diag_timer.stop()
+        super().hideEvent(event)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.tabs.currentWidget() is self.diag_tab:
+            self._diag_timer.start()
+
+    def _refresh_diagnostics(self):
+        for r, row in enumerate(self.engine.metrics.stage_rows()):
+            for c, (_, key) in enumerate(STAGE_COLUMNS):
+                self.stage_table.setItem(r, c, QtWidgets.QTableWidgetItem(str(row[key])))
+        d = self.engine.diagnostics()
+        counters = ", ".join(f"{k}: {v}" for k, v in sorted(d["counters"].items())) or "none yet"
+        fg = d["foreground_cache"]
+        clip = d["clipboard"]
+        started = ", ".join(f"{k} {v:.0f} ms" for k, v in d["startup_ms"].items())
+        libraries = ", ".join(f"{lib['name']} {lib['snippets']}" + (f" ({lib['error']})" if lib["error"] else "")
+                              for lib in d["libraries"])
+        self.counters_label.setText(
+            f"Startup – {started}\n"
+            f"Libraries – {libraries}\n"
+            f"Counters – {counters}\n"
+            f"Foreground cache – hit rate {fg['hit_rate']:.0%} ({fg['hits']} hits, {fg['misses']} misses)\n"
+            f"Clipboard – {clip['saves']} saves, {clip['skipped_saves']} skipped "
+            f"(~{clip['saved_ms_estimate']:.0f} ms saved)"
+        )
+
+    def _export_diagnostics(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export diagnostics", "quickkeys_diagnostics.json", "JSON Files (*.json)")
+        if not path:
+            return
+        try:
+            export_json(Path(path), self.engine.diagnostics())
+            self.statusBar().showMessage("Diagnostics exported.", 4000)
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Export failed", str(e))
+
+    def _populate_backups(self):
+        store = get_backup_store()
+        entries = store.list(SNIPPETS_FILE.stem)
+        self.backup_list.clear()
+        for e in entries:
+            item = QtWidgets.QListWidgetItem(f"{e.saved_at:%Y-%m-%d %H:%M:%S}  ({e.size / 1024:.0f} KB)")
+            item.setData(QtCore.Qt.ItemDataRole.UserRole, e.id)
+            self.backup_list.addItem(item)
+        self.backups_label.setText(f"{len(entries)} backups, {store.disk_usage() / 1024:.0f} KB on disk")
+
+    def _selected_backup(self):
+        item = self.backup_list.currentItem()
+        return item.data(QtCore.Qt.ItemDataRole.UserRole) if item is not None else None
+
+    def _show_backup_diff(self, *_):
+        entry_id = self._selected_backup()
+        if entry_id is None:
+            self.backup_diff.clear()
+            return
+        try:
+            old = get_backup_store().read(entry_id)
+        except Exception as e:
+            self.backup_diff.setPlainText(f"Can't read this backup: {e}")
+            return
+        # what restoring would do to the table as it is now
+        diff = diff_snippets(self.model.to_dict(), old)
+        lines = [f"Restoring this backup: {diff.summary()}", ""]
+        limit = 200
+        for mark, triggers in (("+", diff.added), ("-", diff.removed), ("~", diff.changed)):
+            for t in triggers[:limit]:
+                lines.append(f"{mark} {t}")
+            if len(triggers) > limit:
+                lines.append(f"{mark} … {len(triggers) - limit} more")
+        self.backup_diff.setPlainText("\n".join(lines))
+
+    def _restore_backup(self):
+        entry_id = self._selected_backup()
+        if entry_id is None:
+            return
+        try:
+            data = get_backup_store().read(entry_id)
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Restore failed", str(e))
+            return
+        # like an import: nothing is written until Save, which backs up the current version first
+        self.model.set_from_dict(data)
+        self.tabs.setCurrentIndex(0)
+        self.statusBar().showMessage(f"Restored {len(data)} snippets from a backup. Press Save to keep them.", 8000)
+
+    def _toggle_metrics(self, state: bool):
+        self.settings.metrics_enabled = state
+        self.engine.metrics.enabled = state
+        self.settings.save()
+
     def reload_models(self):
-        self.model.set_from_dict(self.repo.all())
+        self.model.set_from_dict(self.repo.mapping())
 
     def _apply_search(self, text: str):
-        filtered = self.repo.search(text)
-        self.model.set_from_dict(filtered)
+        self._search_timer.start()
+
+    def _add_row(self, trigger: str, expansion: str):
+        self.model.add_row(trigger, expansion)
+        # new rows go to the end; load up to them so they can be edited right away
+        self.proxy.fetch_all()
+        self.table.scrollToBottom()
 
     def _delete_selected(self):
         sel = self.table.selectionModel().selectedRows()
-        rows = [i.row() for i in sel]
+        rows = [self.proxy.mapToSource(i).row() for i in sel]
         self.model.remove_rows(rows)
 
     def _save(self):
@@ -175,17 +437,47 @@ class SnippetManagerWindow(QtWidgets.QMainWindow):
             return
         self.repo.set_all(data)
         self.repo.save()
-        self.statusBar().showMessage("\u2713 Saved! Press Ctrl+Alt+R to apply changes to running expander.", 5000)
+        # Broken {snippet:...} includes still save; they expand as literal text
+        problems = TemplateCache(data).check()
+        if problems:
+            trigger, problem = next(iter(problems.items()))
+            more = f" (+{len(problems) - 1} more)" if len(problems) > 1 else ""
+            self.statusBar().showMessage(f"Saved, but /{trigger} has an {problem}{more}", 10000)
+            return
+        self.statusBar().showMessage("\u2713 Saved! The running expander picks up changes automatically.", 5000)
 
     def _import(self):
-        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Import snippets", "", "JSON Files (*.json)")
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Import snippets", "",
+            "Snippet files (*.json *.csv *.yml *.yaml);;JSON (*.json);;CSV / TextExpander (*.csv);;espanso (*.yml *.yaml)")
         if not path:
             return
+        labels = {"Skip existing triggers": SKIP, "Overwrite existing triggers": OVERWRITE,
+                  "Import under a new name (trigger_2)": RENAME}
+        choice, ok = QtWidgets.QInputDialog.getItem(self, "Import snippets", "When a trigger already exists:",
+                                                    list(labels), 0, False)
+        if not ok:
+            return
+
+        progress = QtWidgets.QProgressDialog("Importing snippets…", None, 0, 1000, self)
+        progress.setWindowModality(QtCore.Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+
+        def report(done: int, total: int):
+            progress.setValue(int(1000 * done / total) if total else 1000)
+            QtWidgets.QApplication.processEvents()
+
         try:
-            data = import_snippets(Path(path))
-            self.model.set_from_dict(data)
+            existing = self.model.to_dict()
+            result = import_into(Path(path), existing, labels[choice], progress=report)
         except Exception as e:
+            progress.close()
             QtWidgets.QMessageBox.critical(self, "Import failed", str(e))
+            return
+        progress.close()
+        existing.update(result.entries)
+        self.model.set_from_dict(existing)
+        self.statusBar().showMessage(f"Imported: {result.summary()}. Press Save to keep them.", 8000)
 
     def _export(self):
         path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export snippets", "snippets_export.json", "JSON Files (*.json)")
@@ -199,10 +491,11 @@ class SnippetManagerWindow(QtWidgets.QMainWindow):
 
     def _new_from_clipboard(self):
         try:
-            text = pyperclip.paste() or ""
+            # the user's text, even if an expansion's paste hasn't been restored yet
+            text = self.engine.clipboard.user_text() or ""
         except Exception:
             text = ""
-        self.model.add_row("", text)
+        self._add_row("", text)
 
     def _toggle_enabled(self, state: bool):
         self.settings.enabled = state
@@ -210,8 +503,12 @@ class SnippetManagerWindow(QtWidgets.QMainWindow):
 
     def _toggle_expand_on_tab(self, state: bool):
         self.settings.expand_on_tab = state
+        self.settings.save()  # the hook reads it from the next snapshot; no restart needed
+
+    def _toggle_completion(self, state: bool):
+        # the engine builds (or drops) its completion index on the reload this save triggers
+        self.settings.completion_enabled = state
         self.settings.save()
-        QtWidgets.QMessageBox.information(self, "Restart hook", "Toggle will take effect next launch.")
 
     def _toggle_logging(self, state: bool):
         self.settings.logging_enabled = state
@@ -221,11 +518,56 @@ class SnippetManagerWindow(QtWidgets.QMainWindow):
         self.settings.trigger_prefix = prefix[0] if prefix else "/"
         self.settings.save()
 
+    def _set_expansion_mode(self, mode: str):
+        self.settings.expansion_mode = mode
+        self.settings.save()
+
+    def _set_storage_backend(self, backend: str):
+        self.settings.storage_backend = backend
+        self.settings.save()
+        self.statusBar().showMessage("Storage change applies the next time the app starts.", 6000)
+
     def _save_blacklist(self, txt: str):
         parts = [p.strip().lower() for p in txt.split(",") if p.strip()]
         self.settings.blacklist_process_names = parts
         self.settings.save()
 
+    def _populate_libraries(self):
+        self.libs_list.clear()
+        for spec in self.settings.libraries:
+            text = f"{spec.get('name') or Path(spec['path']).stem} – {spec['path']}"
+            if spec.get("apps"):
+                text += f"  (only in {', '.join(spec['apps'])})"
+            self.libs_list.addItem(text)
+
+    def _add_library(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Add shared library", "",
+            "Snippet files (*.json *.csv *.yml *.yaml);;JSON (*.json);;CSV / TextExpander (*.csv);;espanso (*.yml *.yaml)")
+        if not path:
+            return
+        apps, ok = QtWidgets.QInputDialog.getText(
+            self, "Add shared library", "Only in these apps (comma-separated process names; empty = everywhere):")
+        if not ok:
+            return
+        spec = {"name": Path(path).stem, "path": path,
+                "apps": [a.strip().lower() for a in apps.split(",") if a.strip()]}
+        self.settings.libraries = self.settings.libraries + [spec]
+        self.settings.save()  # the engine picks it up with the settings file
+        self._populate_libraries()
+
+    def _remove_library(self):
+        row = self.libs_list.currentRow()
+        if row < 0:
+            return
+        self.settings.libraries = [s for i, s in enumerate(self.settings.libraries) if i != row]
+        self.settings.save()
+        self._populate_libraries()
+
+    def _save_blocked_titles(self, txt: str):
+        self.settings.blocked_title_patterns = [p.strip() for p in txt.split(",") if p.strip()]
+        self.settings.save()
+
     def _populate_per_app_list(self):
         self.apps_list.clear()
         # Load existing overrides
@@ -236,6 +578,7 @@ class SnippetManagerWindow(QtWidgets.QMainWindow):
             self.apps_list.addItem(item)
 
     def _load_running_apps(self):
+        import psutil  # deferred: only needed here
         names = set()
         for p in psutil.process_iter(attrs=['name']):
             try:
@@ -255,7 +598,7 @@ class SnippetManagerWindow(QtWidgets.QMainWindow):
             overrides[item.text()] = item.checkState() == QtCore.Qt.CheckState.Checked
         self.settings.per_app_overrides = overrides
         self.settings.save()
-        self.statusBar().showMessage("\u2713 Per-app settings saved! Press Ctrl+Alt+R to apply.", 5000)
+        self.statusBar().showMessage("\u2713 Per-app settings saved!", 5000)
 
     def _add_current_app(self):
         name = get_foreground_process_name()
@@ -1,21 +1,43 @@
-from typing import Dict
+import time
+from types import MappingProxyType
+from bisect import bisect_left
+from typing import Dict, List, Mapping, Optional, Tuple, Union
 from PyQt6 import QtCore, QtGui
 
+USES_COLUMN = 2
+
 class SnippetTableModel(QtCore.QAbstractTableModel):
-    def __init__(self, data: Dict[str, str]):
+    """Editable rows over a read-only snippet mapping.
+
+    A row is just its trigger while unchanged; the expansion is read from
+    the source mapping when shown, so a packed library is never copied
+    into the model. Edited and added rows hold their own (trigger, text).
+    """
+
+    def __init__(self, data: Mapping[str, str], usage=None):
         super().__init__()
-        self._headers = ["Trigger (no leading /)", "Expansion (supports {cursor})"]
-        self._rows = [(k, v) for k, v in data.items()]
+        self._headers = ["Trigger (no leading /)", "Expansion (supports {cursor})", "Uses"]
+        self._source = data
+        self._rows: List[Union[str, Tuple[str, str]]] = list(data)
+        self._lower: List[Optional[str]] = [None] * len(self._rows)  # lazily lowercased "trigger\0text"
+        self.usage = usage  # UsageStore or None; read live, never copied
+
+    def _row(self, r: int) -> Tuple[str, str]:
+        item = self._rows[r]
+        return item if isinstance(item, tuple) else (item, self._source.get(item, ""))
 
     def rowCount(self, parent=None): return len(self._rows)
-    def columnCount(self, parent=None): return 2
+    def columnCount(self, parent=None): return 3 if self.usage is not None else 2
 
     def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
         if not index.isValid(): return None
         r, c = index.row(), index.column()
-        key, val = self._rows[r]
+        item = self._rows[r]
+        key = item if isinstance(item, str) else item[0]
+        if c == USES_COLUMN:
+            return self._usage_data(key, role)
         if role in (QtCore.Qt.ItemDataRole.DisplayRole, QtCore.Qt.ItemDataRole.EditRole):
-            return key if c == 0 else val
+            return key if c == 0 else self._row(r)[1]
         if role == QtCore.Qt.ItemDataRole.ForegroundRole and " " in key and c == 0:
             return QtGui.QBrush(QtGui.QColor("red"))
         return None
@@ -26,8 +48,24 @@ class SnippetTableModel(QtCore.QAbstractTableModel):
             return self._headers[section]
         return str(section + 1)
 
+    def _usage_data(self, key: str, role):
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return self.usage.count(key)
+        if role == QtCore.Qt.ItemDataRole.ToolTipRole:
+            last = self.usage.last_used(key)
+            if last is None:
+                return "Never expanded"
+            apps = sorted(self.usage.apps(key).items(), key=lambda kv: -kv[1])
+            where = ", ".join(f"{a} ({n})" for a, n in apps[:3])
+            return f"Last used {time.strftime('%Y-%m-%d %H:%M', time.localtime(last))}" + (f"\nIn {where}" if where else "")
+        if role == QtCore.Qt.ItemDataRole.TextAlignmentRole:
+            return QtCore.Qt.AlignmentFlag.AlignRight | QtCore.Qt.AlignmentFlag.AlignVCenter
+        return None
+
     def flags(self, index):
         if not index.isValid(): return QtCore.Qt.ItemFlag.NoItemFlags
+        if index.column() == USES_COLUMN:
+            return QtCore.Qt.ItemFlag.ItemIsEnabled | QtCore.Qt.ItemFlag.ItemIsSelectable
         return (QtCore.Qt.ItemFlag.ItemIsEnabled |
                 QtCore.Qt.ItemFlag.ItemIsSelectable |
                 QtCore.Qt.ItemFlag.ItemIsEditable)
@@ -35,40 +73,258 @@ class SnippetTableModel(QtCore.QAbstractTableModel):
     def setData(self, index, value, role):
         if role != QtCore.Qt.ItemDataRole.EditRole: return False
         r, c = index.row(), index.column()
-        key, val = self._rows[r]
+        key, val = self._row(r)
         if c == 0:
             self._rows[r] = (value.strip(), val)
         else:
             self._rows[r] = (key, value)
+        self._lower[r] = None
         self.dataChanged.emit(index, index)
         return True
 
     def add_row(self, trigger="", expansion=""):
         self.beginInsertRows(QtCore.QModelIndex(), len(self._rows), len(self._rows))
         self._rows.append((trigger, expansion))
+        self._lower.append(None)
         self.endInsertRows()
 
     def remove_rows(self, rows: list):
         for r in sorted(rows, reverse=True):
             self.beginRemoveRows(QtCore.QModelIndex(), r, r)
             self._rows.pop(r)
+            self._lower.pop(r)
             self.endRemoveRows()
 
     def to_dict(self) -> Dict[str, str]:
         out = {}
-        for k, v in self._rows:
+        src = self._source
+        if not isinstance(src, (dict, MappingProxyType)):
+            # read a packed or database-backed source in one pass, not one lookup per row
+            src = dict(src.items())
+        for item in self._rows:
+            if isinstance(item, tuple):
+                k, v = item
+            else:
+                k, v = item, src.get(item)
+                if v is None:
+                    continue  # unedited and gone from a live source (deleted elsewhere)
             k = k.strip()
             if k:
                 out[k] = v
         return out
 
-    def set_from_dict(self, data: Dict[str, str]):
+    def set_from_dict(self, data: Mapping[str, str]):
         self.beginResetModel()
-        self._rows = [(k, v) for k, v in data.items()]
+        self._source = data
+        self._rows = list(data)
+        self._lower = [None] * len(self._rows)
         self.endResetModel()
 
-    def filter(self, query: str):
+    def sort(self, column: int, order=QtCore.Qt.SortOrder.AscendingOrder):
+        """Reorder rows by trigger, expansion or usage (count, then most recent)."""
+        reverse = order == QtCore.Qt.SortOrder.DescendingOrder
+        trigger = lambda item: item if isinstance(item, str) else item[0]
+        if column == USES_COLUMN and self.usage is not None:
+            u = self.usage
+            key = lambda item: (u.count(trigger(item)), u.last_used(trigger(item)) or 0.0)
+        elif column == 0:
+            key = lambda item: trigger(item).lower()
+        else:
+            src = self._source
+            key = lambda item: (item[1] if isinstance(item, tuple) else src.get(item, "")).lower()
+        self.beginResetModel()
+        self._rows.sort(key=key, reverse=reverse)
+        self._lower = [None] * len(self._rows)
+        self.endResetModel()
+
+    def row_matches(self, row: int, query: str) -> bool:
+        """Case-insensitive substring match on trigger or expansion; `query` must be lowercase."""
+        text = self._lower[row]
+        if text is None:
+            k, v = self._row(row)
+            text = self._lower[row] = k.lower() + "\0" + v.lower()
+        return query in text
+
+class SnippetFilterProxyModel(QtCore.QAbstractProxyModel):
+    """Filtered, lazily loaded view over a SnippetTableModel.
+
+    Matching source rows are kept in source order in `_matches`; only the
+    first `_loaded` of them are exposed and the view pulls more through
+    canFetchMore/fetchMore while scrolling. When a query extends the
+    previous one only the current matches are re-checked, and rows that
+    drop out are removed in blocks instead of resetting the view.
+    """
+
+    BATCH = 256
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._query = ""
+        self._matches: List[int] = []
+        self._loaded = 0
+        self._removing: Optional[tuple] = None
+
+    # ---- Source wiring
+    def setSourceModel(self, model: SnippetTableModel):
+        old = self.sourceModel()
+        if old is not None:
+            old.modelReset.disconnect(self._refilter)
+            old.dataChanged.disconnect(self._on_data_changed)
+            old.rowsInserted.disconnect(self._on_rows_inserted)
+            old.rowsAboutToBeRemoved.disconnect(self._on_rows_about_to_be_removed)
+            old.rowsRemoved.disconnect(self._on_rows_removed)
+        super().setSourceModel(model)
+        model.modelReset.connect(self._refilter)
+        model.dataChanged.connect(self._on_data_changed)
+        model.rowsInserted.connect(self._on_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
+        model.rowsRemoved.connect(self._on_rows_removed)
+        self._refilter()
+
+    # ---- Filtering
+    def set_query(self, query: str):
         query = query.strip().lower()
-        if not query:
+        if query == self._query:
             return
-        # This is a UI helper; final filtering is done in window by setting model
\ No newline at end of file
+        narrowing = self._query in query  # every new match is already an old match
+        self._query = query
+        if narrowing:
+            self._narrow()
+        else:
+            self._refilter()
+
+    def _refilter(self):
+        src = self.sourceModel()
+        q = self._query
+        self.beginResetModel()
+        n = src.rowCount()
+        self._matches = list(range(n)) if not q else [r for r in range(n) if src.row_matches(r, q)]
+        self._loaded = min(self.BATCH, len(self._matches))
+        self.endResetModel()
+
+    def _narrow(self):
+        src = self.sourceModel()
+        q = self._query
+        keep = [src.row_matches(r, q) for r in self._matches]
+        # remove dropped rows from the loaded part in contiguous blocks, bottom-up so rows stay valid
+        row = self._loaded - 1
+        while row >= 0:
+            if keep[row]:
+                row -= 1
+                continue
+            end = row
+            while row >= 0 and not keep[row]:
+                row -= 1
+            self.beginRemoveRows(QtCore.QModelIndex(), row + 1, end)
+            del self._matches[row + 1:end + 1]
+            del keep[row + 1:end + 1]
+            self._loaded -= end - row
+            self.endRemoveRows()
+        # the unloaded tail is not visible yet; just drop its non-matches
+        self._matches[self._loaded:] = [r for r, k in zip(self._matches[self._loaded:], keep[self._loaded:]) if k]
+        if self._loaded < self.BATCH and self.canFetchMore(QtCore.QModelIndex()):
+            self.fetchMore(QtCore.QModelIndex())
+
+    # ---- Lazy loading
+    def canFetchMore(self, parent=QtCore.QModelIndex()) -> bool:
+        return not parent.isValid() and self._loaded < len(self._matches)
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return
+        n = min(self.BATCH, len(self._matches) - self._loaded)
+        if n <= 0:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), self._loaded, self._loaded + n - 1)
+        self._loaded += n
+        self.endInsertRows()
+
+    def fetch_all(self):
+        while self.canFetchMore():
+            self.fetchMore()
+
+    # ---- QAbstractProxyModel
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self.sourceModel().columnCount()
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if parent.isValid() or not (0 <= row < self._loaded) or not (0 <= column < self.columnCount()):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        return QtCore.QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid() or proxy_index.row() >= self._loaded:
+            return QtCore.QModelIndex()
+        return self.sourceModel().index(self._matches[proxy_index.row()], proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QtCore.QModelIndex()
+        row = self._proxy_row(source_index.row())
+        if row is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(row, source_index.column())
+
+    def _proxy_row(self, source_row: int) -> Optional[int]:
+        pos = bisect_left(self._matches, source_row)
+        if pos < self._loaded and self._matches[pos] == source_row:
+            return pos
+        return None
+
+    def sort(self, column: int, order=QtCore.Qt.SortOrder.AscendingOrder):
+        # sorting happens in the source; the reset that follows refilters in the new order
+        self.sourceModel().sort(column, order)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if orientation == QtCore.Qt.Orientation.Horizontal:
+            return self.sourceModel().headerData(section, orientation, role)
+        if role != QtCore.Qt.ItemDataRole.DisplayRole:
+            return None
+        return str(section + 1)
+
+    # ---- Source change handlers
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        # edited rows stay visible even if they stop matching, so the user doesn't lose them mid-edit
+        for r in range(top_left.row(), bottom_right.row() + 1):
+            row = self._proxy_row(r)
+            if row is not None:
+                self.dataChanged.emit(self.index(row, top_left.column()),
+                                      self.index(row, bottom_right.column()))
+
+    def _on_rows_inserted(self, parent, first, last):
+        # new rows are always shown (a fresh blank row must be editable whatever the query)
+        count = last - first + 1
+        pos = bisect_left(self._matches, first)
+        for i in range(pos, len(self._matches)):
+            self._matches[i] += count
+        visible = pos <= self._loaded
+        if visible:
+            self.beginInsertRows(QtCore.QModelIndex(), pos, pos + count - 1)
+        self._matches[pos:pos] = range(first, last + 1)
+        if visible:
+            self._loaded += count
+            self.endInsertRows()
+
+    def _on_rows_about_to_be_removed(self, parent, first, last):
+        lo = bisect_left(self._matches, first)
+        hi = bisect_left(self._matches, last + 1)
+        vis_hi = min(hi, self._loaded)
+        if lo < vis_hi:
+            self.beginRemoveRows(QtCore.QModelIndex(), lo, vis_hi - 1)
+        self._removing = (lo, hi, vis_hi, last - first + 1)
+
+    def _on_rows_removed(self, parent, first, last):
+        lo, hi, vis_hi, count = self._removing
+        self._removing = None
+        del self._matches[lo:hi]
+        for i in range(lo, len(self._matches)):
+            self._matches[i] -= count
+        if lo < vis_hi:
+            self._loaded -= vis_hi - lo
+            self.endRemoveRows()